@@ -10,6 +10,7 @@ import sys
 import pytest
 
 ARGS = [#'--run-writes',
+        #'--run-benchmarks',
         #'--skip-slow',
         #'--skip-pandas',
         #'--skip-sqlparse',
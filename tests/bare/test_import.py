@@ -0,0 +1,62 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['sqlalchemy', 'pycountry', 'csv23', 'pytest',
+                 'treedb._globals', 'treedb.backend', 'treedb.models',
+                 'treedb.queries']
+
+IMPORT_TIME_BUDGET = 0.5
+
+
+def run_python(code, /, *args):
+    proc = subprocess.run([sys.executable, *args, '-c', code],
+                          capture_output=True, encoding='utf-8', check=True)
+    return proc.stdout, proc.stderr
+
+
+def iterimporttimes(importtime_log, /):
+    for line in importtime_log.splitlines():
+        if line.startswith('import time:'):
+            _, cumulative_us, name = line.split('|')
+            if cumulative_us.strip().isdigit():
+                yield name.strip(), int(cumulative_us)
+
+
+def test_import_lazy():
+    out, _ = run_python('import sys\n'
+                        f'heavy = {HEAVY_MODULES!r}\n'
+                        'import treedb\n'
+                        'print(*[m for m in heavy if m in sys.modules])\n'
+                        'assert treedb.engine.file is None\n'
+                        'print(*[m for m in heavy if m in sys.modules])')
+
+    before, after = out.splitlines()
+    assert not before
+    assert set(after.split()) >= {'sqlalchemy', 'pycountry',
+                                  'treedb._globals', 'treedb.backend'}
+
+
+@pytest.mark.parametrize('name', ['engine', 'root', 'load', 'Languoid', 'queries'])
+def test_import_attribute(name):
+    out, _ = run_python(f'import treedb; print(treedb.{name} is not None)')
+
+    assert out == 'True\n'
+
+
+def test_import_print_schema():
+    out, _ = run_python('import treedb; treedb.print_schema()')
+
+    assert 'CREATE TABLE languoid (' in out
+
+
+@pytest.mark.benchmark
+def test_import_time_benchmark(record_property):
+    _, err = run_python('import treedb', '-X', 'importtime')
+
+    times = dict(iterimporttimes(err))
+    seconds = times['treedb'] / 1_000_000
+    record_property('import_treedb_seconds', seconds)
+
+    assert seconds < IMPORT_TIME_BUDGET
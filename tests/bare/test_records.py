@@ -27,3 +27,20 @@ def test_dump(bare_treedb, *, n=100):
         assert_nonempty_string(record['core']['name'])
 
         assert record['core']['level'] in ('family', 'language', 'dialect')
+
+
+def test_dumps(tmp_path, bare_treedb, *, n=100):
+    files = bare_treedb.languoids.files
+    target = tmp_path / files.BASENAME
+
+    for i, (_, _, cfg) in enumerate(files.iterfiles(), start=1):
+        raw_record = cfg.to_dict()
+
+        expected = files.ConfigParser()
+        expected.update_config(raw_record, quiet=True)
+        expected.to_file(target)
+
+        assert files.dumps(raw_record) == target.read_bytes()
+
+        if i >= n:
+            break
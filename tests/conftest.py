@@ -9,6 +9,8 @@ DEFAULT_GLOTTOLOG_TAG = 'v5.3'
 
 RUN_WRITES = '--run-writes'
 
+RUN_BENCHMARKS = '--run-benchmarks'
+
 SKIP_SLOW = '--skip-slow'
 
 SKIP_PANDAS = '--skip-pandas'
@@ -24,6 +26,9 @@ def pytest_addoption(parser):
     parser.addoption(RUN_WRITES, action='store_true',
                      help='run tests with pytest.mark.writes')
 
+    parser.addoption(RUN_BENCHMARKS, action='store_true',
+                     help='run wall-clock tests with pytest.mark.benchmark')
+
     parser.addoption(SKIP_SLOW, action='store_true',
                      help='skip tests with pytest.mark.slow')
 
@@ -71,6 +76,7 @@ def pytest_configure(config):
     config.option.file_engine_tag = file_engine_tag
 
     config.addinivalue_line('markers', f'writes: skip unless {RUN_WRITES} is given')
+    config.addinivalue_line('markers', f'benchmark: skip unless {RUN_BENCHMARKS} is given')
     config.addinivalue_line('markers', f'slow: skip if {SKIP_SLOW} flag is given')
     config.addinivalue_line('markers', f'pandas: skip if {SKIP_PANDAS} flag is given')
     config.addinivalue_line('markers', f'sqlparse: skip if {SKIP_SQLPARSE} flag is given')
@@ -87,6 +93,7 @@ def pytest_configure(config):
 def pytest_collection_modifyitems(config, items):
     def itermarkers():
         for keyword, option in {'writes': RUN_WRITES,
+                                'benchmark': RUN_BENCHMARKS,
                                 'slow': SKIP_SLOW,
                                 'pandas': SKIP_PANDAS,
                                 'sqlparse': SKIP_SQLPARSE,
@@ -170,6 +177,15 @@ def treedb(pytestconfig, bare_treedb):
     return treedb
 
 
+@pytest.fixture(scope='session')
+def file_engine(tmp_path_factory, treedb):
+    """Copy of the loaded database in a file (e.g. for worker processes)."""
+    path = tmp_path_factory.mktemp('file_engine') / f'{treedb.__title__}.sqlite3'
+    engine = treedb.backup(path)
+    yield engine
+    engine.dispose()
+
+
 @pytest.fixture(scope='session')
 def treedb_raw(treedb):
     import treedb.raw
@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.mark.parametrize('format_', ['parquet', 'arrow_ipc'])
+def test_write_arrow(tmp_path, treedb, format_, batchsize=1_000):
+    write = getattr(treedb.backend.arrow, f'write_{format_}')
+
+    path = write(None, tmp_path / f'example.{format_}', batchsize=batchsize)
+
+    pyarrow = treedb.backend.arrow.PYARROW
+    if pyarrow is None:
+        assert path is None
+    else:
+        if format_ == 'parquet':
+            table = pyarrow.parquet.read_table(path)
+        else:
+            with pyarrow.ipc.open_file(path) as f:
+                table = f.read_all()
+
+        expected = treedb.get_example_query()
+        assert table.column_names == [c.name for c in expected.selected_columns]
+        assert table.num_rows == sum(1 for _ in treedb.iterrows(expected))
+
+
+def test_write_parquet_model(tmp_path, treedb, batchsize=100):
+    path = treedb.write_parquet(treedb.Languoid, tmp_path / 'languoid.parquet',
+                                batchsize=batchsize)
+
+    pyarrow = treedb.backend.arrow.PYARROW
+    if pyarrow is None:
+        assert path is None
+    else:
+        metadata = pyarrow.parquet.read_metadata(path)
+        assert metadata.num_row_groups == -(-metadata.num_rows // batchsize)
+
+        schema = pyarrow.parquet.read_schema(path)
+        assert schema.field('latitude').type == pyarrow.float64()
+        assert schema.field('id').type == pyarrow.string()
@@ -1,4 +1,5 @@
 import textwrap
+import zipfile
 
 import pytest
 import sqlalchemy as sa
@@ -52,6 +53,37 @@ def test_backup(treedb):
     assert len(engine.file_sha256()) == 64
 
 
+@pytest.mark.slow
+@pytest.mark.parametrize('kwargs', [{'pages': 100},
+                                    {'pages': 100, 'throttle': 0.001},
+                                    {'vacuum': True}],
+                         ids=lambda x: ','.join(map(str, x)))
+def test_backup_kwargs(tmp_path, treedb, kwargs):
+    paths = [tmp_path / 'backup1.sqlite3', tmp_path / 'backup2.sqlite3']
+
+    engines, stats = treedb.backup(paths, with_stats=True, **kwargs)
+
+    assert [e.url.database for e in engines] == list(map(str, paths))
+    assert stats.pages > 0
+    assert stats.steps >= (stats.pages // 100 if 'pages' in kwargs else 1)
+    assert stats.seconds > 0
+
+    query = sa.select(sa.func.count()).select_from(treedb.Languoid)
+    expected = treedb.scalar(query)
+    for e in engines:
+        assert treedb.scalar(query, bind=e) == expected
+
+
+@pytest.mark.parametrize('kwargs', [{'pages': 100}, {'sleep': 0}, {'throttle': 1}])
+def test_backup_vacuum_kwargs(tmp_path, treedb, kwargs):
+    path = tmp_path / 'backup.sqlite3'
+
+    with pytest.raises(ValueError, match=r'vacuum=True cannot be combined'):
+        treedb.backup(path, vacuum=True, **kwargs)
+
+    assert not path.exists()
+
+
 @pytest.mark.slow
 def test_dump_sql(pytestconfig, treedb):
     suffix = '-memory' if treedb.engine.file is None else ''
@@ -63,6 +95,50 @@ def test_dump_sql(pytestconfig, treedb):
     assert_file_size_between(path, 1, 20)
 
 
+@pytest.mark.slow
+def test_dump_sql_fast(tmp_path, treedb):
+    path = treedb.dump_sql(tmp_path / 'treedb.sql.gz', fast=True, compresslevel=1)
+
+    engine = treedb.backend.export.restore_sql(path, tmp_path / 'restored.sqlite3')
+
+    assert engine.url.database == str(tmp_path / 'restored.sqlite3')
+
+    for model in (treedb.Languoid, treedb.Dataset):
+        query = sa.select(sa.func.count()).select_from(model)
+        assert treedb.scalar(query, bind=engine) == treedb.scalar(query)
+
+    expected = treedb.checksum(cache=False)
+    assert treedb.checksum(cache=False, bind=engine) == expected
+
+    with engine.connect() as conn:
+        assert not conn.exec_driver_sql('PRAGMA foreign_key_check').all()
+
+
+def test_dump_sql_fast_virtual_tables(tmp_path, treedb):
+    engine = treedb.backup(tmp_path / 'indexed.sqlite3')
+    with engine.begin() as conn:
+        names = treedb.search.create_name_index(conn=conn)
+        coordinates = treedb.spatial.create_coordinate_index(conn=conn)
+
+    path = treedb.dump_sql(tmp_path / 'indexed.sql.gz', fast=True, engine=engine)
+
+    restored = treedb.backend.export.restore_sql(path, tmp_path / 'restored.sqlite3')
+
+    with restored.connect() as conn:
+        for table, expected in [(treedb.search.NAME_INDEX, names),
+                                (treedb.spatial.COORDINATE_INDEX, coordinates)]:
+            query = sa.select(sa.func.count()).select_from(sa.table(table))
+            assert conn.scalar(query) == expected
+        assert conn.exec_driver_sql('PRAGMA integrity_check').scalar_one() == 'ok'
+
+    name = treedb.scalar(sa.select(treedb.Languoid.name).order_by('id').limit(1))
+    assert (treedb.search_names(name, bind=restored)
+            == treedb.search_names(name, bind=engine))
+
+    restored.dispose()
+    engine.dispose()
+
+
 @pytest.mark.slow
 def test_csv_zipfile(pytestconfig, treedb):
     suffix = '-memory' if treedb.engine.file is None else ''
@@ -74,6 +150,26 @@ def test_csv_zipfile(pytestconfig, treedb):
     assert_file_size_between(path, 1, 20)
 
 
+@pytest.mark.slow
+@pytest.mark.parametrize('compresslevel', [None, 1])
+def test_csv_zipfile_jobs(tmp_path, treedb, file_engine, compresslevel,
+                          date_time=(2000, 1, 1, 0, 0, 0)):
+    kwargs = {'compresslevel': compresslevel, 'date_time': date_time,
+              'engine': file_engine}
+    expected = treedb.csv_zipfile(tmp_path / 'expected.zip', **kwargs)
+
+    path = treedb.csv_zipfile(tmp_path / 'jobs.zip', jobs=2, **kwargs)
+
+    assert path.read_bytes() == expected.read_bytes()
+
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+        names = z.namelist()
+        assert names == sorted(names)
+        assert 'languoid.csv' in names
+        assert '__checksum__.csv' not in names
+
+
 def test_print_rows(capsys, treedb):
     query = (sa.select(treedb.Languoid)
              .where(treedb.Languoid.iso639_3 == 'bsa'))
@@ -121,3 +217,20 @@ def test_hash_csv(pytestconfig, treedb):
         assert len(result) == 64
     else:
         assert result == expected
+
+
+def test_hash_csv_rows_format(treedb, hash_names=['sha256', 'sha1']):
+    query = sa.select(treedb.Languoid).order_by('id')
+
+    result = treedb.hash_csv(query, hash_name=hash_names, format_='rows1')
+
+    assert [len(r) for r in result] == [64, 40]
+    assert result[0] == treedb.hash_csv(query, format_='rows1')
+    assert result[0] != treedb.hash_csv(query)
+
+    with treedb.connect() as conn:
+        rows = conn.execute(query).all()
+
+    expected = treedb.backend.export.hash_rows(rows, header=list(rows[0]._fields),
+                                               format_='rows1')
+    assert result[0] == expected
@@ -1,6 +1,45 @@
+import logging
+
 from helpers import assert_valid_languoids
 
 
 def test_load(treedb, n=100):
     items = treedb.iterlanguoids('tables')
     assert_valid_languoids(items, n=n)
+
+
+def test_without_cache_spill(file_engine):
+    from treedb.backend import load
+
+    with file_engine.connect() as conn:
+        cache_spill = conn.exec_driver_sql('PRAGMA cache_spill').scalar_one()
+        items = load._without_cache_spill(iter([1, 2]), conn=conn)
+
+        assert next(items) == 1
+        assert conn.exec_driver_sql('PRAGMA cache_spill').scalar_one() == 0
+
+        assert list(items) == [2]
+        assert conn.exec_driver_sql('PRAGMA cache_spill').scalar_one() == cache_spill
+
+
+def test_get_dataset_missing_tables(caplog, tmp_path, treedb):
+    from treedb.backend import load
+
+    engine = treedb._proxies.SQLiteEngineProxy(treedb.backup(tmp_path / 'stale.sqlite3'),
+                                               future=True)
+    try:
+        exclude_raw = treedb.backend.models.Dataset.get_dataset(bind=engine,
+                                                                strict=True).exclude_raw
+        dataset = load.get_dataset(engine, exclude_raw=exclude_raw, strict=True)
+        assert dataset is not None
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql('DROP TABLE languoidpath')
+
+        with caplog.at_level(logging.WARNING, logger=load.__name__):
+            dataset = load.get_dataset(engine, exclude_raw=exclude_raw, strict=True)
+
+        assert dataset is None
+        assert any('languoidpath' in r.getMessage() for r in caplog.records)
+    finally:
+        engine.dispose()
@@ -30,6 +30,25 @@ def test_pd_read_sql(treedb):
         df.info(**INFO_KWARGS)
 
 
+def test_pd_read_sql_optimize_dtypes(treedb):
+    df = treedb.pd_read_sql(index_col='id', optimize_dtypes=True)
+
+    if treedb.backend.pandas.PANDAS is None:
+        assert df is None
+    else:
+        assert list(df['level'].cat.categories) == list(treedb.LEVEL)
+        assert df['level'].cat.ordered
+        assert df['endangerment_status'].cat.ordered
+        assert df['macroareas'].dtype == 'category'
+        assert df['parent_id'].dtype != 'category'
+
+        raw = treedb.pd_read_sql(index_col='id')
+        assert raw['level'].dtype != 'category'
+        assert raw.index.equals(df.index)
+        assert (df.memory_usage(deep=True).sum()
+                < raw.memory_usage(deep=True).sum())
+
+
 def test_pd_read_json_lines(treedb):
     query = sa.select(sa.func.json_object('id', treedb.Languoid.id,
                                           'name', treedb.Languoid.name))
@@ -44,6 +63,25 @@ def test_pd_read_json_lines(treedb):
         df.info(**INFO_KWARGS)
 
 
+def test_pd_read_json_lines_chunksize(treedb, chunksize=100):
+    query = (sa.select(sa.func.json_object('id', treedb.Languoid.id,
+                                           'name', treedb.Languoid.name))
+             .order_by(treedb.Languoid.id))
+    dfs = treedb.pd_read_json_lines(query, chunksize=chunksize)
+
+    if treedb.backend.pandas.PANDAS is None:
+        assert dfs is None
+    else:
+        dfs = list(dfs)
+        assert len(dfs) > 1
+        assert all(len(df) == chunksize for df in dfs[:-1])
+        assert 0 < len(dfs[-1]) <= chunksize
+
+        df = treedb.pd_read_json_lines(query, buflines=chunksize,
+                                       concat_ignore_index=True)
+        assert df['id'].tolist() == [id_ for d in dfs for id_ in d['id']]
+
+
 @pytest.mark.xfail(reason="broken pd.read_json(orient='index', lines=True)",
                    raises=AttributeError)
 def test_pd_read_json_lines_orient_index(treedb):
@@ -0,0 +1,121 @@
+import pytest
+import sqlalchemy as sa
+
+PREFIX = 'languoid_tree:sha256:'
+
+
+def test_tree_checksum(treedb):
+    result = treedb.tree_checksum()
+
+    assert result.startswith(PREFIX)
+    assert len(result) - len(PREFIX) == 64
+
+
+def test_compare_hashes_same(treedb):
+    assert treedb.compare_hashes(treedb.engine, treedb.engine) == []
+
+
+@pytest.mark.parametrize(
+    'source',
+    ['files',
+     pytest.param('raw', marks=pytest.mark.raw),
+     'tables'],
+    ids=lambda x: f'source={x}')
+def test_compare_hashes(treedb, source):
+    assert treedb.compare_hashes(treedb.engine, source) == []
+
+
+def select_derived(treedb):
+    from treedb import search, spatial
+    from treedb.models import LanguoidPath, LanguoidJson, LanguoidHash, languoid_closure
+
+    fts = sa.table(search.NAME_INDEX, *map(sa.column, ['name', 'languoid_id',
+                                                       'provider', 'lang']))
+    rtree = spatial.rtree
+    return {'languoidhash': sa.select(LanguoidHash),
+            'languoidjson': sa.select(LanguoidJson),
+            'languoidpath': sa.select(LanguoidPath),
+            'languoid_closure': sa.select(languoid_closure),
+            'name_index': sa.select(fts.c.name, fts.c.languoid_id,
+                                    fts.c.provider, fts.c.lang),
+            'coordinate_index': sa.select(rtree.c.languoid_id,
+                                          rtree.c.min_lat, rtree.c.max_lat,
+                                          rtree.c.min_lon, rtree.c.max_lon)}
+
+
+def fetch_derived(conn, queries):
+    return {name: sorted(map(tuple, conn.execute(query)), key=repr)
+            for name, query in queries.items()}
+
+
+def rebuild_derived(conn):
+    from treedb import checksums, import_models, search, spatial
+    from treedb.models import LanguoidPath, LanguoidJson, LanguoidHash, languoid_closure
+
+    for model in (LanguoidHash, LanguoidJson, languoid_closure, LanguoidPath):
+        conn.execute(sa.delete(model))
+    import_models.insert_languoid_tree(conn)
+    import_models.insert_languoid_json(conn)
+    search.create_name_index(conn=conn)
+    spatial.create_coordinate_index(conn=conn)
+    checksums.write_languoid_hashes(conn=conn)
+
+
+def delete_languoid(conn, languoid_id, /, *, metadata):
+    for table in reversed(metadata.sorted_tables):
+        for fk in table.foreign_keys:
+            if fk.column.table.name == 'languoid' and table.name != 'languoid':
+                conn.execute(sa.delete(table).where(fk.parent == languoid_id))
+    conn.execute(sa.delete(metadata.tables['languoid'])
+                 .where(metadata.tables['languoid'].c.id == languoid_id))
+
+
+def test_update_languoids(tmp_path, treedb):
+    from treedb import _globals, import_models
+
+    Languoid = treedb.Languoid  # noqa: N806
+
+    engine = treedb.backup(tmp_path / 'update.sqlite3')
+    with engine.begin() as conn:
+        rebuild_derived(conn)
+
+    child = sa.orm.aliased(Languoid)
+    has_children = sa.exists().where(child.parent_id == Languoid.id)
+    select_leaves = (sa.select(Languoid.id, Languoid.parent_id)
+                     .where(Languoid.level == 'dialect',
+                            Languoid.latitude != sa.null(), ~has_children)
+                     .order_by(Languoid.id).limit(2))
+    select_family = (sa.select(Languoid.id)
+                     .filter_by(level='family', parent_id=None).order_by('id').limit(1))
+    select_language = (sa.select(Languoid.id, Languoid.parent_id)
+                       .where(Languoid.level == 'language', has_children,
+                              Languoid.parent_id != sa.bindparam('family_id'))
+                       .order_by(Languoid.id).limit(1))
+
+    queries = select_derived(treedb)
+    with engine.begin() as conn:
+        (renamed_id, _), (removed_id, removed_parent) = conn.execute(select_leaves).all()
+        family_id = conn.execute(select_family).scalar_one()
+        moved_id, moved_parent = conn.execute(select_language,
+                                              {'family_id': family_id}).one()
+
+        conn.execute(sa.update(Languoid).filter_by(id=renamed_id)
+                     .values(name='Renamed Languoid'))
+        conn.execute(sa.update(Languoid).filter_by(id=moved_id)
+                     .values(parent_id=family_id))
+        delete_languoid(conn, removed_id, metadata=_globals.REGISTRY.metadata)
+
+        checksum = import_models.update_languoids([renamed_id,
+                                                   moved_id, moved_parent,
+                                                   removed_id, removed_parent],
+                                                  conn=conn)
+        updated = fetch_derived(conn, queries)
+
+        rebuild_derived(conn)
+
+        assert treedb.tree_checksum(bind=conn) == checksum
+        assert fetch_derived(conn, queries) == updated
+        assert removed_id not in {row[0] for row in updated['languoidhash']}
+        assert treedb.search_names('Renamed Languoid', bind=conn) == [renamed_id]
+
+    engine.dispose()
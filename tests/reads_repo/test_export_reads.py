@@ -1,7 +1,9 @@
 import io
 import json
+import logging
 
 import pytest
+import sqlalchemy as sa
 
 from helpers import (pairwise,
                      get_assert_head,
@@ -316,6 +318,134 @@ def test_checksum(pytestconfig, treedb, source):
         assert result == PREFIX + expected
 
 
+@pytest.mark.parametrize('order_by', ['path', 'id'])
+def test_checksum_jobs(caplog, treedb, file_engine, order_by, chunksize=100):
+    kwargs = {'order_by': order_by, 'bind': file_engine}
+
+    expected = treedb.checksum(cache=False, **kwargs)
+
+    with caplog.at_level(logging.INFO, logger='treedb.export'):
+        with io.StringIO() as buf:
+            treedb.export.write_json_lines(buf, jobs=2, chunksize=chunksize, **kwargs)
+            value = buf.getvalue()
+
+    assert any(r.getMessage().startswith(f'fetch chunks of {chunksize:d} with 2 jobs')
+               for r in caplog.records)
+
+    with io.StringIO() as buf:
+        treedb.export.write_json_lines(buf, **kwargs)
+        assert value == buf.getvalue()
+
+    assert value.count('\n') == treedb.scalar(sa.select(sa.func.count())
+                                              .select_from(treedb.Languoid),
+                                              bind=file_engine)
+
+    assert treedb.checksum(jobs=2, cache=False, **kwargs) == expected
+
+
+def test_checksum_cache(treedb, kwargs={'order_by': 'id', 'limit': 11}):
+    from treedb.backend.models import Checksum
+
+    expected = treedb.checksum(cache=False, **kwargs)
+
+    with treedb.engine.connect() as conn:
+        conn.execute(sa.delete(Checksum))
+
+        assert treedb.checksum(bind=conn, **kwargs) == expected
+        assert conn.scalar(sa.select(sa.func.count()).select_from(Checksum)) == 0
+
+        assert treedb.checksum(cache=True, bind=conn, **kwargs) == expected
+        assert conn.scalar(sa.select(sa.func.count()).select_from(Checksum)) == 1
+
+        conn.execute(sa.update(Checksum).values(value='spam'))
+        assert treedb.checksum(cache=True, bind=conn, **kwargs) == 'spam'
+        assert treedb.checksum(bind=conn, **kwargs) == expected
+
+        conn.execute(sa.update(treedb.Dataset).values(version='eggs'))
+        assert treedb.checksum(cache=True, bind=conn, **kwargs) == expected
+        assert conn.scalar(sa.select(Checksum.value)) == expected
+
+        conn.rollback()
+
+
+def test_checksum_cache_readonly(caplog, treedb, file_engine,
+                                 kwargs={'order_by': 'id', 'limit': 11}):
+    expected = treedb.checksum(bind=file_engine, **kwargs)
+
+    readonly = treedb.backend.readonly_engine(treedb.backend.get_database(file_engine))
+
+    with caplog.at_level(logging.WARNING, logger='treedb.backend.models'):
+        assert treedb.checksum(cache=True, bind=readonly, **kwargs) == expected
+
+    assert any(r.getMessage().startswith('cannot cache checksum')
+               for r in caplog.records)
+
+
+@pytest.mark.parametrize('source', ['files', 'tables'])
+def test_checksum_rows_format(treedb, source, kwargs={'limit': 101, 'offset': 3}):
+    expected = treedb.checksum(format_='rows1', cache=False, **kwargs)
+
+    result = treedb.checksum(source, format_='rows1', hash_name=['sha256', 'md5'],
+                             cache=False, **kwargs)
+
+    assert result[0] == expected
+    assert result[1].startswith('path_languoid:path[offset=3,limit=101]:rows1:md5:')
+
+
+@pytest.mark.parametrize('order_by', ['path', 'id'])
+def test_checksum_languoid_json(treedb, order_by, n=501):
+    from treedb import import_models
+
+    kwargs = {'order_by': order_by, 'limit': n, 'offset': 7}
+
+    expected = treedb.checksum(bind=treedb.engine, **kwargs)
+
+    with treedb.engine.connect() as conn:
+        import_models.insert_languoid_json(conn)
+
+        assert treedb.queries.has_languoid_json(bind=conn)
+
+        assert treedb.checksum(cache=False, bind=conn, **kwargs) == expected
+
+        with io.StringIO() as buf:
+            treedb.export.write_json_lines(buf, pretty=True, bind=conn, **kwargs)
+            value = buf.getvalue()
+
+        conn.rollback()
+
+    with io.StringIO() as buf:
+        treedb.export.write_json_lines(buf, pretty=True, bind=treedb.engine, **kwargs)
+        assert value == buf.getvalue()
+
+
+def test_write_json_lines_partial_languoid_json(treedb, n=10):
+    from treedb import import_models
+    from treedb.models import LanguoidJson
+
+    with io.StringIO() as buf:
+        treedb.export.write_json_lines(buf, bind=treedb.engine)
+        expected = buf.getvalue()
+
+    expected_checksum = treedb.checksum(cache=False, bind=treedb.engine)
+
+    with treedb.engine.connect() as conn:
+        import_models.insert_languoid_json(conn)
+        ids = conn.execute(sa.select(LanguoidJson.languoid_id)
+                           .order_by('languoid_id').limit(n)).scalars().all()
+        conn.execute(sa.delete(LanguoidJson).where(LanguoidJson.languoid_id.in_(ids)))
+
+        assert treedb.queries.has_languoid_json(bind=conn)
+        assert not treedb.queries.has_languoid_json(complete=True, bind=conn)
+
+        with io.StringIO() as buf:
+            treedb.export.write_json_lines(buf, bind=conn)
+            assert buf.getvalue() == expected
+
+        assert treedb.checksum(cache=False, bind=conn) == expected_checksum
+
+        conn.rollback()
+
+
 def test_write_json_lines_checksum(pytestconfig, treedb):
     expected = CHECKSUM.get(pytestconfig.option.glottolog_tag)
 
@@ -410,6 +540,28 @@ def test_pd_read_languoids(treedb, source, limit=1_000):
         df.info(memory_usage='deep')
 
 
+@pytest.mark.pandas
+def test_pd_read_tables(treedb):
+    dfs = treedb.pd_read_tables()
+
+    if treedb.backend.pandas.PANDAS is None:
+        assert dfs is None
+    else:
+        assert list(dfs) == list(treedb.queries.get_tables_queries())
+
+        languoids = dfs['languoids']
+        assert languoids.index.name == 'id'
+        assert languoids.index.is_unique
+        assert languoids['latitude'].dtype == 'float64'
+
+        for name, df in dfs.items():
+            if name != 'languoids':
+                assert df.index.name == 'languoid_id'
+                assert df.index.isin(languoids.index).all()
+
+        assert dfs['endangerments']['date'].dtype.kind == 'M'
+
+
 xfail_master_unnormalized = pytest.mark.xfail_glottolog_tag(
     'master', reason='possibly unnormalized master',
     raises=AssertionError)
@@ -70,6 +70,9 @@ def test_languoid_tree(treedb, child_id, parent_id, kwargs, expected):
     [pytest.param(_models.Languoid, _models.Languoid.id == '3adt1234',
                   r"<Languoid id='3adt1234' level='dialect' name='3Ad-Tekles'>",
                   id='model=Languoid(id=3adt1234)'),
+     pytest.param(_models.LanguoidPath, _models.LanguoidPath.languoid_id == BOOK,
+                  rf"<LanguoidPath languoid_id='{BOOK}' path='{BOOK}'>",
+                  id=f'model=LanguoidPath(languoid_id={BOOK})'),
      pytest.param(_models.LanguoidLevel, _models.LanguoidLevel.name == 'language',
                   r"<LanguoidLevel name='language' description='[^']+' ordinal=\d+>",
                   id='model=LanguoidLevel(name=language)'),
@@ -36,6 +36,130 @@ def test_iterdescendants(treedb, kwargs, expected_head):
     assert head == expected_head
 
 
+@pytest.mark.parametrize(
+    'kwargs',
+    [{},
+     {'parent_level': 'top'},
+     {'parent_level': 'family', 'child_level': 'language'}])
+def test_iterdescendants_closure(treedb, kwargs):
+    expected = list(treedb.iterdescendants(**kwargs))
+
+    assert list(treedb.iterdescendants(closure=True, **kwargs)) == expected
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [{'parent_root': True, 'with_steps': True, 'with_terminal': True},
+     {'parent_root': False, 'innerjoin': True},
+     {'from_parent': True, 'child_root': False, 'innerjoin': True},
+     {'from_parent': True, 'parent_root': True, 'with_steps': True}])
+def test_node_relative_closure(treedb, kwargs):
+    def select_tree(**closure_kwargs):
+        _, _, tree, _ = treedb.Languoid.node_relative(**kwargs, **closure_kwargs)
+        return sa.select(tree).order_by(*tree.c)
+
+    with treedb.connect() as conn:
+        expected = conn.execute(select_tree()).all()
+
+        assert expected
+        assert conn.execute(select_tree(closure=True)).all() == expected
+
+
+@pytest.mark.parametrize('closure', [False, True])
+def test_node_relative_from_parent_with_terminal(treedb, closure):
+    with pytest.raises(ValueError, match=r'with_terminal=True requires from_parent=False'):
+        treedb.Languoid.node_relative(from_parent=True, with_terminal=True,
+                                      closure=closure)
+
+
+def test_stats_query_closure(treedb):
+    with treedb.connect() as conn:
+        expected = conn.execute(treedb.queries.get_stats_query()).all()
+
+        assert conn.execute(treedb.queries.get_stats_query(closure=True)).all() == expected
+
+
+def test_cached_queries(treedb):
+    queries = treedb.queries
+
+    assert queries.get_example_query() is queries.get_example_query()
+    assert queries.get_stats_query() is queries.get_stats_query()
+
+    kwargs = {'as_rows': True, 'load_json': False, 'sort_keys': True}
+    first = queries.get_json_query(limit=1, **kwargs)
+    assert queries.get_json_query(limit=1, **kwargs) is first
+
+    second = queries.get_json_query(limit=1, offset=1, **kwargs)
+    assert second is not first
+    assert str(second) == str(queries.get_json_query(limit=2, offset=3, **kwargs))
+
+    with treedb.connect() as conn:
+        (first_path, _), = conn.execute(first)
+        (second_path, _), = conn.execute(second)
+        rows = conn.execute(queries.get_json_query(limit=2, **kwargs)).all()
+
+    assert [first_path, second_path] == [path for path, _ in rows]
+
+
+@pytest.mark.parametrize('level', [None, 'language'])
+def test_subtree_interval(treedb, level):
+    descendants = dict(treedb.iterdescendants('family', level, closure=True))
+    counts = treedb.queries.get_subtree_counts_query(level=level)
+
+    with treedb.connect() as conn:
+        counts = dict(conn.execute(counts).all())
+
+        assert counts.keys() == descendants.keys()
+        for family_id, descendant_ids in itertools.islice(descendants.items(), 100):
+            subtree = treedb.queries.select_subtree(family_id, level=level)
+            assert sorted(conn.execute(subtree).scalars()) == descendant_ids
+            assert counts[family_id] == len(descendant_ids)
+
+            if descendant_ids:
+                assert treedb.queries.is_descendant(descendant_ids[0], family_id, bind=conn)
+                assert not treedb.queries.is_descendant(family_id, descendant_ids[0], bind=conn)
+            assert not treedb.queries.is_descendant(family_id, family_id, bind=conn)
+            assert treedb.queries.is_descendant(family_id, family_id, include_self=True,
+                                                bind=conn)
+
+
+def test_update_languoid_tree(treedb):
+    from treedb import import_models
+
+    Languoid = treedb.Languoid  # noqa: N806
+
+    def select_tree(**kwargs):
+        tree = Languoid.tree(include_self=True, with_steps=True, with_terminal=True,
+                             **kwargs)
+        return sa.select(tree).order_by(*tree.c)
+
+    select_dialect = (sa.select(Languoid.id, Languoid.parent_id)
+                      .filter_by(level='dialect').order_by('id').limit(1))
+    select_family = (sa.select(Languoid.id)
+                     .filter_by(level='family', parent_id=None).order_by('id').limit(1))
+
+    with treedb.engine.connect() as conn:
+        dialect_id, parent_id = conn.execute(select_dialect).one()
+        family_id = conn.execute(select_family).scalar_one()
+
+        conn.execute(sa.update(Languoid).filter_by(id=dialect_id)
+                     .values(parent_id=family_id, level='language'))
+
+        changed = import_models.update_languoid_tree(conn=conn)
+
+        assert dialect_id in changed
+        assert parent_id not in changed
+        assert (conn.execute(select_tree(closure=True)).all()
+                == conn.execute(select_tree()).all())
+
+        descendants = dict(treedb.iterdescendants(closure=True, bind=conn))
+        for languoid_id in (family_id, parent_id):
+            subtree = treedb.queries.select_subtree(languoid_id)
+            assert sorted(conn.execute(subtree).scalars()) == descendants[languoid_id]
+
+        conn.rollback()
+
+
 @pytest.mark.parametrize(
     'as_rows, sort_keys',
     [(True, False),
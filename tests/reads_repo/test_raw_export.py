@@ -76,6 +76,18 @@ def test_checksum(pytestconfig, treedb_raw, weak):
         assert result == expected
 
 
+@pytest.mark.parametrize('weak',
+                         [False, True],
+                         ids=lambda x: f'weak={x}')
+def test_checksum_rows_format(treedb_raw, weak, hash_names=('sha256', 'md5')):
+    result = treedb_raw.raw.checksum(weak=weak, format_='rows1',
+                                     hash_name=hash_names, cache=False)
+
+    assert [r.split(':')[1:3] for r in result] == [['rows1', n] for n in hash_names]
+    assert result[0] == treedb_raw.raw.checksum(weak=weak, format_='rows1', cache=False)
+    assert result[0] != treedb_raw.raw.checksum(weak=weak, cache=False)
+
+
 def test_write_raw_csv(pytestconfig, treedb_raw):
     expected = RAW_CSV_SHA256.get(pytestconfig.option.glottolog_tag)
     suffix = '-memory' if treedb_raw.engine.file is None else ''
@@ -1,6 +1,9 @@
-from helpers import assert_valid_languoids
+import itertools
 
 import pytest
+import sqlalchemy as sa
+
+from helpers import assert_valid_languoids
 
 
 pytestmark = pytest.mark.raw
@@ -9,3 +12,47 @@ pytestmark = pytest.mark.raw
 def test_iterlanguoids_from_raw(treedb, n=501):
     items = treedb.iterlanguoids('raw')
     assert_valid_languoids(items, n=n)
+
+
+@pytest.mark.parametrize('order_by', ['file', 'path', 'id'])
+def test_fetch_records_streamed(treedb, order_by, n=501):
+    windowed = treedb.raw.fetch_records(order_by=order_by, bind=treedb.engine)
+    streamed = treedb.raw.fetch_records(order_by=order_by, windowsize=None,
+                                        bind=treedb.engine)
+
+    for count, (w, s) in enumerate(zip(windowed, streamed), start=1):
+        assert s == w
+        if count >= n:
+            break
+    assert count == n
+
+
+def test_fetch_records_jobs(treedb, file_engine, windowsize=100):
+    serial = list(treedb.raw.fetch_records(windowsize=windowsize, bind=file_engine))
+    parallel = list(treedb.raw.fetch_records(windowsize=windowsize, jobs=2,
+                                             bind=file_engine))
+
+    assert len(serial) == treedb.scalar(sa.select(sa.func.count())
+                                        .select_from(treedb.raw.File))
+    assert parallel == serial
+
+
+def test_fetch_records_compact(treedb_raw, n=501):
+    from treedb.raw import import_models
+
+    expected = list(itertools.islice(treedb_raw.raw.fetch_records(bind=treedb_raw.engine), n))
+
+    with treedb_raw.engine.connect() as conn:
+        values = conn.execute(sa.select(treedb_raw.raw.Value)
+                              .order_by('file_id', 'option_id', 'line')).mappings()
+        conn.execute(sa.insert(treedb_raw.raw.ValueLines),
+                     list(import_models.itervalue_lines(values)))
+        conn.execute(sa.delete(treedb_raw.raw.Value))
+
+        assert treedb_raw.raw.records.is_compact(bind=conn)
+
+        for windowsize in (100, None):
+            records = treedb_raw.raw.fetch_records(windowsize=windowsize, bind=conn)
+            assert list(itertools.islice(records, n)) == expected
+
+        conn.rollback()
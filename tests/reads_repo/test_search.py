@@ -0,0 +1,40 @@
+import pytest
+import sqlalchemy as sa
+
+
+@pytest.fixture(scope='module')
+def name_index_engine(tmp_path_factory, treedb):
+    path = tmp_path_factory.mktemp('search') / 'names.sqlite3'
+    engine = treedb.backup(path)
+    with engine.begin() as conn:
+        assert treedb.search.create_name_index(conn=conn) > 0
+    yield engine
+    engine.dispose()
+
+
+def test_search_names(treedb, name_index_engine):
+    query = (sa.select(treedb.Languoid.id, treedb.Languoid.name)
+             .order_by(treedb.Languoid.id).limit(1))
+    languoid_id, name = treedb.iterrows(query).__next__()
+
+    assert treedb.search.has_name_index(bind=name_index_engine)
+
+    assert languoid_id in treedb.search_names(name, bind=name_index_engine)
+    assert languoid_id in treedb.search_names(name.upper(), limit=None,
+                                              bind=name_index_engine)
+    assert languoid_id in treedb.search_names(name[:3], limit=None,
+                                              bind=name_index_engine)
+
+    assert treedb.search_names(' ', bind=name_index_engine) == []
+
+
+def test_search_names_fallback(treedb):
+    query = (sa.select(treedb.Languoid.id, treedb.Languoid.name)
+             .order_by(treedb.Languoid.id).limit(1))
+    languoid_id, name = treedb.iterrows(query).__next__()
+
+    if treedb.search.has_name_index():  # pragma: no cover
+        pytest.skip('name index present')
+
+    with pytest.warns(UserWarning, match=r'LIKE'):
+        assert languoid_id in treedb.search_names(name, limit=None)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+import sqlalchemy as sa
+
+
+@pytest.fixture(scope='module')
+def coordinate_index_engine(tmp_path_factory, treedb):
+    path = tmp_path_factory.mktemp('spatial') / 'coordinates.sqlite3'
+    engine = treedb.backup(path)
+    with engine.begin() as conn:
+        assert treedb.spatial.create_coordinate_index(conn=conn) > 0
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize('indexed', [False, True],
+                         ids=lambda x: f'indexed={x}')
+def test_spatial_queries(treedb, coordinate_index_engine, indexed):
+    bind = coordinate_index_engine if indexed else treedb.engine
+    assert treedb.spatial.has_coordinate_index(bind=bind) == indexed
+
+    query = (sa.select(treedb.Languoid.id,
+                       treedb.Languoid.latitude, treedb.Languoid.longitude)
+             .where(treedb.Languoid.latitude != sa.null())
+             .order_by(treedb.Languoid.id).limit(1))
+    languoid_id, lat, lon = treedb.iterrows(query).__next__()
+
+    bbox = treedb.spatial.languoids_in_bbox(lat - 1, lon - 1, lat + 1, lon + 1,
+                                            bind=bind)
+    assert (languoid_id, lat, lon) in bbox
+    assert all(lat - 1 <= y <= lat + 1 and lon - 1 <= x <= lon + 1
+               for _, y, x in bbox)
+
+    nearest = treedb.nearest_languoids(lat, lon, 3, bind=bind)
+    assert len(nearest) == 3
+    assert nearest[0] == (languoid_id, 0.0)
+    assert [d for _, d in nearest] == sorted(d for _, d in nearest)
+
+    within = treedb.spatial.languoids_within(lat, lon, nearest[-1][1], bind=bind)
+    assert within[:3] == nearest
+
+    polygon = [(lon - 1, lat - 1), (lon + 1, lat - 1), (lon + 1, lat + 1),
+               (lon - 1, lat + 1)]
+    assert treedb.spatial.languoids_in_polygon(polygon, bind=bind) == bbox
+
+
+def test_write_geojson(tmp_path, treedb):
+    path = tmp_path / 'languoids.geojson'
+
+    result, n = treedb.write_geojson(path)
+
+    assert result == path
+    collection = json.loads(path.read_text(encoding='utf-8'))
+    assert collection['type'] == 'FeatureCollection'
+    assert n == len(collection['features']) + 2
+    feature = collection['features'][0]
+    assert feature['type'] == 'Feature'
+    assert feature['geometry']['type'] == 'Point'
+    assert set(feature['properties']) == {'name', 'level'}
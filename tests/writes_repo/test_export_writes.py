@@ -25,14 +25,70 @@ pytestmark = pytest.mark.writes
      pytest.param('raw', marks=pytest.mark.raw),
      'tables'],
     ids=lambda x: f'source={x}')
-def test_write_files(pytestconfig, treedb, source):
+@pytest.mark.parametrize('jobs', [None, 2], ids=lambda x: f'jobs={x}')
+def test_write_files(pytestconfig, treedb, source, jobs):
     expected = FILES_WRITTEN[source].get(pytestconfig.option.glottolog_tag)
 
     files_written = treedb.write_files(source=source,
                                        dry_run=True,
                                        require_nwritten=expected,
+                                       jobs=jobs,
                                        bind=treedb.engine)
     if expected is not None:
         assert files_written == expected
     else:
         assert 0 <= files_written <= 40_000
+
+
+@pytest.mark.raw
+@pytest.mark.parametrize('source', ['raw_lines', 'tables'],
+                         ids=lambda x: f'source={x}')
+def test_write_files_skip_unchanged(pytestconfig, treedb, source):
+    expected = FILES_WRITTEN[source].get(pytestconfig.option.glottolog_tag)
+
+    files_written = treedb.write_files(source=source,
+                                       dry_run=True,
+                                       require_nwritten=expected,
+                                       skip_unchanged=True,
+                                       bind=treedb.engine)
+    if expected is not None:
+        assert files_written == expected
+    else:
+        assert 0 <= files_written <= 40_000
+
+
+@pytest.mark.raw
+def test_write_files_skip_unchanged_edited(tmp_path, treedb, limit=10):
+    target = tmp_path / 'tree'
+    treedb.write_files(target, source='raw_lines', fresh=True,
+                       limit=limit, bind=treedb.engine)
+
+    paths = sorted(target.rglob('md.ini'))
+    assert len(paths) == limit
+    original = paths[0].read_bytes()
+    name_line = next(line for line in original.splitlines() if line.startswith(b'name = '))
+    edited_line = name_line[:-1] + (b'X' if name_line[-1:] != b'X' else b'Y')
+    edited = original.replace(name_line, edited_line, 1)
+    assert len(edited) == len(original)
+    paths[0].write_bytes(edited)
+
+    files_written = treedb.write_files(target, source='raw_lines',
+                                       skip_unchanged=True,
+                                       limit=limit, bind=treedb.engine)
+
+    assert files_written >= 1
+    assert name_line in paths[0].read_bytes().splitlines()
+
+
+@pytest.mark.slow
+def test_write_files_fresh(tmp_path, treedb, limit=100):
+    target = tmp_path / 'tree'
+
+    files_written = treedb.write_files(target, fresh=True, jobs=2,
+                                       limit=limit, bind=treedb.engine)
+
+    assert files_written == limit
+    assert len(list(target.rglob('md.ini'))) == limit
+
+    with pytest.raises(ValueError, match=r'fresh=True requires empty'):
+        treedb.write_files(target, fresh=True, limit=1, bind=treedb.engine)
@@ -1,41 +1,65 @@
 """Load Glottolog lanuoid tree ``md.ini`` files into SQLite3 database."""
 
-from ._globals import SESSION as Session  # noqa: N811
-from ._tools import sha256sum
-from .backend import (print_versions,
-                      set_engine,
-                      connect,
-                      scalar,
-                      iterrows)
-from .backend.export import (print_dataset,
-                             print_schema,
-                             print_query_sql,
-                             backup,
-                             dump_sql,
-                             csv_zipfile,
-                             print_rows,
-                             write_csv,
-                             hash_csv)
-from .backend.load import main as load
-from .backend.models import Dataset, Producer, Config
-from .backend.pandas import pd_read_sql, pd_read_json_lines
-from .backend.sqlite_master import print_table_sql, select_tables_nrows
-from .backend.views import TABLES as views  # noqa: N811
-from .languoids import set_root, iterfiles
-from .checks import check, compare_languoids
-from .export import (print_languoid_stats,
-                     iterlanguoids,
-                     checksum,
-                     write_json_lines as write_languoids,
-                     pd_read_languoids,
-                     write_files)
-from .glottolog import glottolog_version, checkout_or_clone
-from .logging_ import configure_logging
-from .models import LEVEL, Languoid
-from .queries import (get_example_query,
-                      get_json_query as get_languoids_query,
-                      iterdescendants)
-from .settings import configure, get_default_root
+import importlib
+
+# lazy attributes: name -> (module, attribute), imported on first access
+_ATTRIBUTES = {'Session': ('._globals', 'SESSION'),
+               'sha256sum': ('._tools', 'sha256sum'),
+               **{name: ('.backend', name)
+                  for name in ['print_versions',
+                               'set_engine', 'connect', 'scalar', 'iterrows']},
+               **{name: ('.backend.export', name)
+                  for name in ['print_dataset',
+                               'print_schema', 'print_query_sql',
+                               'backup', 'dump_sql', 'csv_zipfile',
+                               'print_rows', 'write_csv', 'hash_csv']},
+               'load': ('.backend.load', 'main'),
+               **{name: ('.backend.models', name)
+                  for name in ['Dataset', 'Producer', 'Config']},
+               'write_parquet': ('.backend.arrow', 'write_parquet'),
+               'write_arrow_ipc': ('.backend.arrow', 'write_arrow_ipc'),
+               'pd_read_sql': ('.backend.pandas', 'pd_read_sql'),
+               'pd_read_json_lines': ('.backend.pandas', 'pd_read_json_lines'),
+               'print_table_sql': ('.backend.sqlite_master', 'print_table_sql'),
+               'select_tables_nrows': ('.backend.sqlite_master', 'select_tables_nrows'),
+               'views': ('.backend.views', 'TABLES'),
+               'set_root': ('.languoids', 'set_root'),
+               'iterfiles': ('.languoids', 'iterfiles'),
+               'check': ('.checks', 'check'),
+               'compare_languoids': ('.checks', 'compare_languoids'),
+               'tree_checksum': ('.checksums', 'tree_checksum'),
+               'compare_hashes': ('.checksums', 'compare_hashes'),
+               **{name: ('.export', name)
+                  for name in ['print_languoid_stats',
+                               'iterlanguoids',
+                               'checksum',
+                               'pd_read_languoids',
+                               'pd_read_tables',
+                               'write_files']},
+               'write_languoids': ('.export', 'write_json_lines'),
+               'glottolog_version': ('.glottolog', 'glottolog_version'),
+               'checkout_or_clone': ('.glottolog', 'checkout_or_clone'),
+               'configure_logging': ('.logging_', 'configure_logging'),
+               'LEVEL': ('.models', 'LEVEL'),
+               'Languoid': ('.models', 'Languoid'),
+               'get_example_query': ('.queries', 'get_example_query'),
+               'get_languoids_query': ('.queries', 'get_json_query'),
+               'iterdescendants': ('.queries', 'iterdescendants'),
+               'search_names': ('.search', 'search_names'),
+               'configure': ('.settings', 'configure'),
+               'get_default_root': ('.settings', 'get_default_root'),
+               'nearest_languoids': ('.spatial', 'nearest_languoids'),
+               'write_geojson': ('.spatial', 'write_geojson'),
+               # default engine: in-memory database (created on first use)
+               'engine': ('._globals', 'ENGINE'),
+               # default root: GLOTTOLOG_REPO_ROOT, or treedb.ini glottolog:repo_root,
+               # or ./glottolog (resolved on first use)
+               'root': ('._globals', 'ROOT')}
+
+_SUBMODULES = frozenset(['backend', 'checks', 'checksums', 'config',
+                         'export', 'glottolog', 'import_models',
+                         'languoids', 'logging_', 'models', 'queries',
+                         'raw', 'search', 'settings', 'spatial'])
 
 __all__ = ['Session',
            'sha256sum',
@@ -47,16 +71,19 @@ __all__ = ['Session',
            'print_rows', 'write_csv', 'hash_csv',
            'load',
            'Dataset', 'Producer', 'Config',
+           'write_parquet', 'write_arrow_ipc',
            'pd_read_sql', 'pd_read_json_lines',
            'print_table_sql', 'select_tables_nrows',
            'views',
            'set_root', 'iterfiles',
            'check', 'compare_languoids',
+           'tree_checksum', 'compare_hashes',
            'print_languoid_stats',
            'iterlanguoids',
            'checksum',
            'write_languoids',
            'pd_read_languoids',
+           'pd_read_tables',
            'write_files',
            'glottolog_version', 'checkout_or_clone',
            'configure_logging',
@@ -64,7 +91,9 @@ __all__ = ['Session',
            'get_example_query',
            'get_languoids_query',
            'iterdescendants',
+           'search_names',
            'configure',
+           'nearest_languoids', 'write_geojson',
            'engine', 'root']
 
 __title__ = 'treedb'
@@ -74,9 +103,17 @@ __license__ = 'MIT, see LICENSE.txt'
 __copyright__ = 'Copyright (c) 2017-2026 Sebastian Bank'
 
 
-# default engine: in-memory database
-engine = set_engine(None)
+def __getattr__(name: str):
+    if name in _ATTRIBUTES:
+        module, attribute = _ATTRIBUTES[name]
+        value = getattr(importlib.import_module(module, __name__), attribute)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
 
 
-# default root: GLOTTOLOG_REPO_ROOT, or treedb.ini glottolog:repo_root, or ./glottolog
-root = set_root(get_default_root(env_var='GLOTTOLOG_REPO_ROOT'))
+def __dir__():
+    return sorted({*globals(), *_ATTRIBUTES, *_SUBMODULES})
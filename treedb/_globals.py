@@ -44,6 +44,27 @@ ENGINE = _proxies.SQLiteEngineProxy(future=_SQLALCHEMY_FUTURE)
 
 ROOT = _proxies.PathProxy()
 
+
+def _set_default_engine() -> None:
+    """Default engine: in-memory database."""
+    from .backend import set_engine
+
+    set_engine(None)
+
+
+def _set_default_root() -> None:
+    """Default root: GLOTTOLOG_REPO_ROOT, or treedb.ini glottolog:repo_root, or ./glottolog."""
+    from .languoids import set_root
+    from .settings import get_default_root
+
+    set_root(get_default_root(env_var='GLOTTOLOG_REPO_ROOT'))
+
+
+ENGINE.set_default_factory(_set_default_engine)
+
+ROOT.set_default_factory(_set_default_root)
+
+
 REGISTRY = _registry()
 
 SESSION = _sessionmaker(bind=ENGINE, future=_SQLALCHEMY_FUTURE)
@@ -17,8 +17,21 @@ class Proxy(object):
 
     _delegate = None
 
+    _default_factory = None
+
+    def set_default_factory(self, factory, /):
+        """Call factory() to set the delegate on first use unless set before."""
+        self._default_factory = factory
+
+    def _get_delegate(self):
+        if self._delegate is None and self._default_factory is not None:
+            factory, self._default_factory = self._default_factory, None
+            log.debug('set default of %s.%s', self.__module__, self.__class__.__name__)
+            factory()
+        return self._delegate
+
     def __getattr__(self, name):
-        return getattr(self._delegate, name)
+        return getattr(self._get_delegate(), name)
 
     def __repr__(self):
         return f'<{self.__module__}.{self.__class__.__name__}>'
@@ -35,25 +48,30 @@ class PathProxy(Proxy):
     <treedb._proxies.PathProxy path='.' inode=...>
     >>> print(PathProxy(pathlib.Path()))
     .
+    >>> proxy = PathProxy()
+    >>> proxy.set_default_factory(lambda: setattr(proxy, 'path', 'spam'))
+    >>> print(proxy)
+    spam
     """
 
     def __init__(self, path=None, /):
         self.path = path
 
     def __fspath__(self):
-        return self._delegate.__fspath__()
+        return self.path.__fspath__()
 
     def __str__(self):
-        if self._delegate is None:
+        if self.path is None:
             raise RuntimeError('str() on empty path proxy')
-        return str(self._delegate)
+        return str(self.path)
 
     @property
     def path(self):
-        return self._delegate
+        return self._get_delegate()
 
     @path.setter
     def path(self, path):
+        self._default_factory = None
         if path is not None:
             path = _tools.path_from_filename(path)
         log.debug('set path of %r to %r', self, path)
@@ -96,10 +114,11 @@ class EngineProxy(Proxy, sa.engine.Engine):
 
     @property
     def engine(self):
-        return self._delegate
+        return self._get_delegate()
 
     @engine.setter
     def engine(self, engine):
+        self._default_factory = None
         if engine is None:
             prefix = ''
         else:
@@ -3,6 +3,7 @@
 from collections.abc import Iterator
 import builtins
 import bz2
+import concurrent.futures
 import configparser
 import contextlib
 import functools
@@ -35,6 +36,7 @@ __all__ = ['uniqued',
            'groupby_itemgetter', 'groupby_attrgetter',
            'islice_limit',
            'iterslices',
+           'pool_map',
            'walk_scandir',
            'pipe_json_lines', 'pipe_json', 'pipe_lines',
            'get_open_module',
@@ -42,7 +44,8 @@ __all__ = ['uniqued',
            'sha256sum',
            'run',
            'Ordering',
-           'ConfigParser']
+           'ConfigParser',
+           'iterconfiglines']
 
 
 log = logging.getLogger(__name__)
@@ -153,6 +156,37 @@ def iterslices(iterable, /, *, size: int):
     return iter(lambda: list(next_slice()), [])
 
 
+def pool_map(func, iterable, /, *, jobs: int | None = None,
+             processes: bool = True,
+             chunksize: int = 1,
+             buffersize: int | None = None) -> Iterator:
+    """Yield func(item) for each item in order, using a worker pool if jobs > 1.
+
+    >>> list(pool_map(abs, [-1, 2, -3]))
+    [1, 2, 3]
+
+    >>> list(pool_map(abs, [-1, 2, -3], jobs=2, processes=False))
+    [1, 2, 3]
+    """
+    if jobs is None or jobs <= 1:
+        yield from map(func, iterable)
+        return
+
+    executor_cls = (concurrent.futures.ProcessPoolExecutor if processes
+                    else concurrent.futures.ThreadPoolExecutor)
+
+    if buffersize is None:
+        buffersize = 4 * jobs * chunksize
+
+    log.debug('%s(max_workers=%d), chunksize=%d, buffersize=%d',
+              executor_cls.__name__, jobs, chunksize, buffersize)
+
+    # bound the number of pending items by submitting in slices
+    with executor_cls(max_workers=jobs) as executor:
+        for items in iterslices(iterable, size=buffersize):
+            yield from executor.map(func, items, chunksize=chunksize)
+
+
 def walk_scandir(top, /, *,
                  verbose: bool = False,
                  sortkey=operator.attrgetter('name')) -> Iterator[os.DirEntry]:
@@ -544,3 +578,18 @@ class ConfigParser(configparser.ConfigParser):
             if self._header is not None:
                 f.write(self._header.format(encoding=encoding))
             self.write(f)
+
+
+def iterconfiglines(sections, /, *, delimiter: str = '=') -> Iterator[str]:
+    r"""Yield ConfigParser.write() lines from (<section>, <(option, value) pairs>).
+
+    >>> list(iterconfiglines([('spam', [('eggs', 'bacon'), ('ham', '\nspam\neggs')])]))
+    ['[spam]\n', 'eggs = bacon\n', 'ham = \n\tspam\n\teggs\n', '\n']
+    """
+    delimiter = f' {delimiter} '
+    for section, options in sections:
+        yield f'[{section}]\n'
+        for option, value in options:
+            value = value.replace('\n', '\n\t')
+            yield f'{option}{delimiter}{value}\n'
+        yield '\n'
@@ -1,5 +1,7 @@
 """SQLite3 database engine."""
 
+import importlib
+
 try:
     import sqlparse
 except ImportError:  # pragma: no cover
@@ -7,6 +9,7 @@ except ImportError:  # pragma: no cover
 
 from ._basics import (print_versions,
                       set_engine, connect,
+                      get_database, readonly_engine,
                       scalar, iterrows,
                       expression_compile,
                       json_object, json_datetime)
@@ -14,7 +17,17 @@ from ._basics import (print_versions,
 __all__ = ['sqlparse',
            'print_versions',
            'set_engine', 'connect',
+           'get_database', 'readonly_engine',
            'scalar', 'iterrows',
            'expression_compile',
            'json_object',
            'json_datetime']
+
+_SUBMODULES = frozenset(['arrow', 'export', 'load', 'models',
+                         'pandas', 'sqlite_master', 'views'])
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
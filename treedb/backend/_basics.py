@@ -1,12 +1,13 @@
 """SQLite3 database sub-module level globals."""
 
 import contextlib
+import functools
 import logging
+import pathlib
 import sqlite3
 
 import csv23
 
-import pycountry
 import sqlalchemy as sa
 import sqlalchemy.ext.compiler
 
@@ -21,6 +22,8 @@ from . import sqlparse
 __all__ = ['print_versions',
            'set_engine',
            'connect',
+           'get_database',
+           'readonly_engine',
            'scalar',
            'iterrows',
            'expression_compile',
@@ -100,6 +103,8 @@ def set_engine(filename, /, *,
 
 def log_versions(*, also_print=False, print_file=None,
                  engine=ENGINE):
+    import pycountry
+
     log.info('pycountry version: %s', pycountry.__version__)
     log.info('sqlalchemy version: %s', sa.__version__)
     log.info('sqlite version: %s', engine.dialect.dbapi.sqlite_version)
@@ -148,6 +153,19 @@ def connect(*, bind=ENGINE,
     return conn
 
 
+def get_database(bind=ENGINE, /) -> str | None:
+    """Return the database filename of bind (None for in-memory databases)."""
+    return getattr(bind, 'engine', bind).url.database or None
+
+
+@functools.cache
+def readonly_engine(database: str, /):
+    """Return a cached engine for read-only (worker) connections to database."""
+    log.debug('create read-only engine for %r', database)
+    uri = pathlib.Path(database).resolve().as_uri()
+    return sa.create_engine(f'sqlite:///{uri}?mode=ro&uri=true')
+
+
 def scalar(statement, /, *args, bind=ENGINE, **kwargs):
     with connect(bind=bind) as conn:
         return conn.scalar(statement, *args, **kwargs)
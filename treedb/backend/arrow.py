@@ -0,0 +1,126 @@
+"""Optional pyarrow dependency Parquet and Arrow IPC export."""
+
+import logging
+import warnings
+
+import sqlalchemy as sa
+
+from .. import _globals
+from .. import _tools
+from .. import backend as _backend
+
+__all__ = ['write_parquet',
+           'write_arrow_ipc']
+
+PYARROW = None
+
+BATCHSIZE = 10_000
+
+
+log = logging.getLogger(__name__)
+
+
+def _import_pyarrow():
+    global PYARROW
+
+    if PYARROW is None:
+        try:
+            import pyarrow as PYARROW  # noqa: N812
+            import pyarrow.ipc  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:  # pragma: no cover
+            warnings.warn(f'failed to import pyarrow: {e}')
+        else:
+            log.info('pyarrow version: %s', PYARROW.__version__)
+
+
+def write_parquet(query=None, /, filename=None, *,
+                  batchsize: int = BATCHSIZE,
+                  compression: str = 'zstd',
+                  bind=_globals.ENGINE):
+    """Write query (table, model, or selectable) to Parquet in batches, return path.
+
+    Write one row group per batch of ``batchsize`` rows.
+    """
+    _import_pyarrow()
+
+    if PYARROW is None:
+        return None
+
+    def open_writer(path, schema):
+        return PYARROW.parquet.ParquetWriter(path, schema, compression=compression)
+
+    return _write_batches(query, filename, open_writer=open_writer,
+                          suffix='.query.parquet',
+                          batchsize=batchsize, bind=bind)
+
+
+def write_arrow_ipc(query=None, /, filename=None, *,
+                    batchsize: int = BATCHSIZE,
+                    bind=_globals.ENGINE):
+    """Write query (table, model, or selectable) to an Arrow IPC file in batches, return path."""
+    _import_pyarrow()
+
+    if PYARROW is None:
+        return None
+
+    return _write_batches(query, filename, open_writer=PYARROW.ipc.new_file,
+                          suffix='.query.arrow',
+                          batchsize=batchsize, bind=bind)
+
+
+def _write_batches(query, filename, /, *, open_writer, suffix: str,
+                   batchsize: int, bind):
+    if query is None:
+        from .. import queries as _queries
+
+        query = _queries.get_example_query()
+    elif hasattr(query, '__table__'):
+        query = sa.select(query.__table__)
+    elif isinstance(query, sa.sql.expression.TableClause):
+        query = sa.select(query)
+
+    if filename is None:
+        filename = bind.file_with_suffix(suffix).name
+    path = _tools.path_from_filename(filename)
+
+    log.info('write %r', path)
+    if path.exists():
+        warnings.warn(f'delete present file: {path!r}')
+        path.unlink()
+
+    schema = PYARROW.schema([(c.name, arrow_type(c.type))
+                             for c in query.selected_columns])
+    log.debug('arrow schema: %r', schema)
+
+    n = 0
+    with (_backend.connect(bind=bind) as conn,
+          open_writer(path, schema) as writer):
+        result = conn.execute(query)
+        for rows in result.partitions(batchsize):
+            columns = zip(*rows)
+            arrays = [PYARROW.array(values, type=field.type)
+                      for values, field in zip(columns, schema)]
+            writer.write_batch(PYARROW.RecordBatch.from_arrays(arrays, schema=schema))
+            n += len(rows)
+            log.debug('%s rows written', f'{n:_d}')
+
+    log.info('%s rows total', f'{n:_d}')
+    return path
+
+
+def arrow_type(sa_type, /):
+    """Return the pyarrow type for the sqlalchemy column type (default: string)."""
+    _import_pyarrow()
+
+    if isinstance(sa_type, sa.Boolean):
+        return PYARROW.bool_()
+    elif isinstance(sa_type, sa.Integer):
+        return PYARROW.int64()
+    elif isinstance(sa_type, sa.Float):
+        return PYARROW.float64()
+    elif isinstance(sa_type, sa.DateTime):
+        return PYARROW.timestamp('us')
+    elif isinstance(sa_type, sa.Date):
+        return PYARROW.date32()
+    return PYARROW.string()
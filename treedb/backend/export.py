@@ -1,14 +1,26 @@
 """SQLite3 database export functions."""
 
+import collections
+from collections.abc import Iterator, Sequence
+import concurrent.futures
 import contextlib
 import datetime
 import functools
 import gzip
 import hashlib
+import io
+import itertools
 import logging
+import os
 import pprint
+import sqlite3
+import struct
+import sys
+import time
+from typing import NamedTuple
 import warnings
 import zipfile
+import zlib
 
 import csv23
 
@@ -18,17 +30,35 @@ from .. import _globals
 from .. import _tools
 from .. import backend as _backend
 
-from .models import Dataset, Producer
+from .models import Dataset, Producer, Checksum
+from .sqlite_master import sqlite_master
 
 __all__ = ['print_dataset',
            'print_schema',
            'print_query_sql',
            'get_query_sql',
            'backup',
-           'dump_sql',
+           'dump_sql', 'restore_sql',
            'csv_zipfile',
            'print_rows',
-           'write_csv', 'hash_csv', 'hash_rows']
+           'write_csv', 'hash_csv', 'hash_rows',
+           'MultiHash', 'iterencode_rows']
+
+BACKUP_SLEEP = 0.250  # sqlite3.Connection.backup() default
+
+DUMP_BATCHSIZE = 500
+
+ROWS_FORMAT = 'rows1'
+
+ROWS_MAGIC = b'treedb-rows:1\n'
+
+DUMP_CHUNKSIZE = 1 << 20
+
+ZIP_CENTRAL_DIR = struct.Struct('<4s4B4HL2L5H2L')
+
+ZIP_END_ARCHIVE = struct.Struct('<4s4H2LH')
+
+ZIP_MAX_SIZE = 0xFFFF_FFFF
 
 
 log = logging.getLogger(__name__)
@@ -50,10 +80,19 @@ def print_dataset(*, ignore_dirty: bool = False,
                           also_print=True, print_file=file)
 
 
+def _register_models() -> None:
+    # import here to register models for the default metadata
+    from .. import models
+
+    assert models is not None
+
+
 def print_schema(metadata=_globals.REGISTRY.metadata, /, *,
                  file=None,
                  engine=_globals.ENGINE):
     """Print the SQL from metadata.create_all() without executing."""
+    _register_models()
+
     def print_sql(sql, *_, **__):
         print(sql.compile(dialect=engine.dialect),
               file=file)
@@ -87,51 +126,127 @@ def get_query_sql(query=None, /, *, literal_binds: bool = True,
     return result
 
 
+class BackupStats(NamedTuple):
+    """Pages copied, backup steps taken, and elapsed seconds."""
+
+    pages: int
+
+    steps: int
+
+    seconds: float
+
+
 def backup(filename=None, /, *, as_new_engine: bool = False,
            pages: int = 0,
+           sleep: float = BACKUP_SLEEP,
+           throttle: float = 0,
+           vacuum: bool = False,
+           with_stats: bool = False,
            engine=_globals.ENGINE):
-    """Write the database into another .sqlite3 file and return its engine."""
+    """Write the database into another .sqlite3 file and return its engine.
+
+    Copy ``pages`` pages per step (all in one step for ``0`` or less),
+    retrying busy steps after ``sleep`` seconds (see ``sqlite3.backup()``)
+    and pausing ``throttle`` seconds between steps so that writers can proceed.
+    With ``vacuum`` write a defragmented copy with ``VACUUM INTO``
+    (cannot be combined with ``pages``, ``sleep``, or ``throttle``).
+
+    With a sequence of filenames copy the source once into the first one
+    and that into the others, return a list of engines.
+    With ``with_stats`` return an (<engine(s)>, <BackupStats>) pair.
+    """
+    if vacuum and (pages or sleep != BACKUP_SLEEP or throttle):
+        raise ValueError('vacuum=True cannot be combined with'
+                         ' pages, sleep, or throttle')
+
     log.info('backup database')
     log.info('source: %r', engine)
 
-    url = 'sqlite://'
-    if filename is not None:
-        path = _tools.path_from_filename(filename)
-        if path.exists():
-            if engine.file is not None and path.samefile(engine.file):
-                raise ValueError(f'backup destination {path!r} same file as'
-                                 f' source {engine.file!r}')
-            warnings.warn(f'delete present file: {path!r}')
-            path.unlink()
-        url += f'/{path}'
-
-    log.info('destination: %r', url)
-    result = sa.create_engine(url, future=engine.future)
+    single = filename is None or isinstance(filename, (str, os.PathLike))
+    filenames = [filename] if single else list(filename)
+    if not filenames:  # pragma: no cover
+        raise ValueError('need at least one backup destination')
+
+    urls = []
+    for filename_ in filenames:
+        url = 'sqlite://'
+        if filename_ is not None:
+            path = _tools.path_from_filename(filename_)
+            if path.exists():
+                if engine.file is not None and path.samefile(engine.file):
+                    raise ValueError(f'backup destination {path!r} same file as'
+                                     f' source {engine.file!r}')
+                warnings.warn(f'delete present file: {path!r}')
+                path.unlink()
+            url += f'/{path}'
+        elif vacuum:
+            raise ValueError('vacuum=True requires a backup destination filename')
+        urls.append(url)
+
+    log.info('destination: %r', urls)
+    results = [sa.create_engine(url, future=engine.future) for url in urls]
+
+    steps = total_pages = 0
 
     def progress(status, remaining, total):
+        nonlocal steps, total_pages
+        steps += 1
+        total_pages = total
         log.info('%d of %d pages copied', total - remaining, total)
+        if remaining and throttle:
+            # sqlite3 only sleeps after busy steps, source is unlocked here
+            time.sleep(throttle)
+
+    start = time.perf_counter()
+    if vacuum:
+        path = results[0].url.database
+        log.info('VACUUM INTO %r', path)
+        with contextlib.closing(engine.raw_connection()) as source_fairy:
+            source_fairy.execute('VACUUM INTO ?', (path,))
+        with _backend.connect(bind=results[0]) as conn:
+            total_pages = conn.exec_driver_sql('PRAGMA page_count').scalar_one()
+        steps = 1
+    else:
+        _backup_pages(engine, results[0], pages=pages, sleep=sleep, progress=progress)
+
+    for result in results[1:]:
+        _backup_pages(results[0], result, pages=0, sleep=sleep)
+    stats = BackupStats(total_pages, steps, time.perf_counter() - start)
+
+    log.info('database backup complete: %r', stats)
+    if as_new_engine:
+        _backend.set_engine(results[0])
 
-    with (contextlib.closing(engine.raw_connection()) as source_fairy,
-          contextlib.closing(result.raw_connection()) as dest_fairy):
+    result = results[0] if single else results
+    return (result, stats) if with_stats else result
+
+
+def _backup_pages(source, dest, /, *, pages: int, sleep: float,
+                  progress=None) -> None:
+    with (contextlib.closing(source.raw_connection()) as source_fairy,
+          contextlib.closing(dest.raw_connection()) as dest_fairy):
         log.debug('sqlite3.backup(%r)', dest_fairy.driver_connection)
 
         dest_fairy.execute('PRAGMA synchronous = OFF')
         dest_fairy.execute('PRAGMA journal_mode = MEMORY')
 
         with dest_fairy.driver_connection as dbapi_conn:
-            source_fairy.backup(dbapi_conn, pages=pages, progress=progress)
-
-    log.info('database backup complete')
-    if as_new_engine:
-        _backend.set_engine(result)
-    return result
+            source_fairy.backup(dbapi_conn, pages=pages, progress=progress,
+                                sleep=sleep)
 
 
 def dump_sql(filename=None, /, *,
+             fast: bool = False,
+             batchsize: int = DUMP_BATCHSIZE,
+             compresslevel: int = 9,
              progress_after: int = 100_000,
              encoding: str = _tools.ENCODING,
              engine=_globals.ENGINE):
-    """Dump the engine database into a plain-text SQL file."""
+    """Dump the engine database into a plain-text SQL file.
+
+    With ``fast`` write multi-row INSERT statements of up to ``batchsize`` rows
+    (tables ordered by name) in large chunks, compressing in a writer thread.
+    """
     if filename is None:
         filename = engine.file_with_suffix('.sql.gz').name
     path = _tools.path_from_filename(filename)
@@ -142,27 +257,184 @@ def dump_sql(filename=None, /, *,
         path.unlink()
 
     if path.suffix == '.gz':
-        open_path = functools.partial(gzip.open, path)
+        open_path = functools.partial(gzip.open, path, compresslevel=compresslevel)
     else:
         open_path = path.open
 
     n = 0
-    with (contextlib.closing(engine.raw_connection()) as dbapi_fairy,
-          open_path('wt', encoding=encoding) as f):
-        for n, line in enumerate(dbapi_fairy.iterdump(), start=1):
-            print(line, file=f)
-            if not (n % progress_after):
-                log.info('%s lines written', f'{n:_d}')
+    if fast:
+        with (_backend.connect(bind=engine) as conn,
+              open_path('wb') as f,
+              _threaded_write(f.write) as write):
+            lines = _iterdump_batches(conn, batchsize=batchsize)
+            for n, chunk in _iterchunks(lines, size=DUMP_CHUNKSIZE):
+                write(chunk.encode(encoding))
+                log.debug('%s lines written', f'{n:_d}')
+    else:
+        with (contextlib.closing(engine.raw_connection()) as dbapi_fairy,
+              open_path('wt', encoding=encoding) as f):
+            for n, line in enumerate(dbapi_fairy.iterdump(), start=1):
+                print(line, file=f)
+                if not (n % progress_after):
+                    log.info('%s lines written', f'{n:_d}')
 
     log.info('%s lines total', f'{n:_d}')
     return path
 
 
+def _iterdump_batches(conn, /, *, batchsize: int) -> Iterator[str]:
+    """Yield SQL statements like sqlite3.Connection.iterdump() with multi-row INSERTs."""
+    def quote(identifier):
+        return '"{}"'.format(identifier.replace('"', '""'))
+
+    dbapi_conn = conn.connection.driver_connection
+
+    for pragma in ('application_id', 'user_version'):
+        value = conn.exec_driver_sql(f'PRAGMA {pragma}').scalar_one()
+        yield f'PRAGMA {pragma} = {value:d};'
+    yield 'PRAGMA foreign_keys = OFF;'
+    yield 'BEGIN TRANSACTION;'
+
+    tables = conn.execute(sa.select(sqlite_master.c.name, sqlite_master.c.sql)
+                          .filter_by(type='table')
+                          .where(sqlite_master.c.sql != sa.null())
+                          .order_by('name')).all()
+
+    # virtual tables are refilled by INSERT, which also fills their shadow tables
+    # (no PRAGMA table_list before SQLite 3.37: match <virtual table>_* names)
+    virtual = [name for name, sql in tables
+               if sql.upper().startswith('CREATE VIRTUAL TABLE')]
+    shadow = {name for name, _ in tables
+              if name not in virtual and any(name.startswith(f'{v}_') for v in virtual)}
+    for name, sql in tables:
+        if name in shadow:
+            continue
+        elif name == 'sqlite_sequence':
+            yield 'DELETE FROM "sqlite_sequence";'
+        elif name == 'sqlite_stat1':
+            yield 'ANALYZE "sqlite_master";'
+        elif name.startswith('sqlite_'):
+            continue
+        else:
+            yield f'{sql};'
+
+        columns = [c for _, c, *_ in conn.exec_driver_sql(f'PRAGMA table_info({quote(name)})')]
+        values = " || ',' || ".join(f'quote({quote(c)})' for c in columns)
+        with contextlib.closing(dbapi_conn.cursor()) as cursor:
+            cursor.execute(f"SELECT '(' || {values} || ')' FROM {quote(name)}")
+            while batch := cursor.fetchmany(batchsize):
+                yield f'INSERT INTO {quote(name)} VALUES{",".join(v for v, in batch)};'
+
+    others = conn.execute(sa.select(sqlite_master.c.sql)
+                          .where(sqlite_master.c.type.in_(['index', 'trigger', 'view']),
+                                 sqlite_master.c.sql != sa.null())
+                          .order_by(sa.literal_column('rowid'))).scalars()
+    for sql in others:
+        yield f'{sql};'
+    yield 'COMMIT;'
+
+
+def _iterchunks(lines, /, *, size: int) -> Iterator[tuple[int, str]]:
+    """Yield (<number of lines so far>, <newline terminated lines>) of about size."""
+    n, chunk, chunk_size = 0, [], 0
+    for n, line in enumerate(lines, start=1):
+        chunk.append(line)
+        chunk_size += len(line) + 1
+        if chunk_size >= size:
+            chunk.append('')
+            yield n, '\n'.join(chunk)
+            chunk, chunk_size = [], 0
+    if chunk:
+        chunk.append('')
+        yield n, '\n'.join(chunk)
+
+
+@contextlib.contextmanager
+def _threaded_write(write, /, *, maxsize: int = 4):
+    """Return a context manager for calling write(data) in a single writer thread."""
+    pending = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        def submit(data):
+            pending.append(executor.submit(write, data))
+            while len(pending) > maxsize:
+                pending.popleft().result()
+
+        yield submit
+
+        while pending:
+            pending.popleft().result()
+
+
+def restore_sql(filename, /, target=None, *, as_new_engine: bool = False,
+                progress_after: int = 100_000,
+                encoding: str = _tools.ENCODING):
+    """Execute a dump_sql() file into another .sqlite3 file and return its engine.
+
+    Execute the statements one by one inside the transaction of the dump
+    (without foreign key checks).
+    """
+    path = _tools.path_from_filename(filename)
+    log.info('restore sql from %r', path)
+
+    url = 'sqlite://'
+    if target is not None:
+        target = _tools.path_from_filename(target)
+        if target.exists():
+            warnings.warn(f'delete present file: {target!r}')
+            target.unlink()
+        url += f'/{target}'
+
+    log.info('destination: %r', url)
+    result = sa.create_engine(url)
+
+    if path.suffix == '.gz':
+        open_path = functools.partial(gzip.open, path)
+    else:
+        open_path = path.open
+
+    n = 0
+    with (contextlib.closing(result.raw_connection()) as dest_fairy,
+          open_path('rt', encoding=encoding) as f):
+        dbapi_conn = dest_fairy.driver_connection
+        # leave transaction control to the BEGIN/COMMIT of the dump
+        dbapi_conn.isolation_level = None
+        # iterdump() orders tables by name, not by foreign key dependencies
+        dbapi_conn.execute('PRAGMA foreign_keys = OFF')
+        dbapi_conn.execute('PRAGMA synchronous = OFF')
+        dbapi_conn.execute('PRAGMA journal_mode = MEMORY')
+
+        statement = ''
+        for line in f:
+            statement += line
+            if sqlite3.complete_statement(statement):
+                dbapi_conn.execute(statement)
+                statement = ''
+                n += 1
+                if not (n % progress_after):
+                    log.info('%s statements executed', f'{n:_d}')
+        if statement.strip():  # pragma: no cover
+            raise ValueError(f'incomplete statement: {statement[:100]!r}')
+
+    log.info('%s statements total', f'{n:_d}')
+    if as_new_engine:
+        _backend.set_engine(result)
+    return result
+
+
 def csv_zipfile(filename=None, /, *, exclude_raw: bool = False,
                 metadata=_globals.REGISTRY.metadata,
                 dialect=csv23.DIALECT, encoding: str = csv23.ENCODING,
+                compresslevel: int | None = None,
+                date_time: tuple[int, int, int, int, int, int] | None = None,
+                jobs: int | None = None,
                 engine=_globals.ENGINE):
-    """Write all tables to <tablename>.csv in <databasename>.zip."""
+    """Write all tables to <tablename>.csv in <databasename>.zip.
+
+    With ``jobs`` write and deflate the tables in worker threads (each with
+    its own read-only connection, buffering up to ``jobs`` compressed tables
+    in memory) and store them in sorted order. Pass ``date_time`` for
+    reproducible archives (the same bytes with and without ``jobs``).
+    """
     log.info('export database')
     log.debug('engine: %r', engine)
 
@@ -176,34 +448,143 @@ def csv_zipfile(filename=None, /, *, exclude_raw: bool = False,
 
     filename = str(path)
 
+    _register_models()
     sorted_tables = sorted(metadata.sorted_tables, key=lambda t: t.name)
 
-    skip = {'_file', '_option', '_value'} if exclude_raw else {}
+    skip = {Checksum.__tablename__}
+    if exclude_raw:
+        skip |= {'_file', '_option', '_value', '_value_lines'}
 
-    log.info('write %r', filename)
-    with (_backend.connect(bind=engine) as conn,
-          zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as z):
-        for table in sorted_tables:
-            if table.name in skip:
-                log.debug('skip table %r', table.name)
-                continue
-
-            log.info('export table %r', table.name)
-            rows = conn.execute(sa.select(table))
-            header = list(rows.keys())
-
-            date_time = datetime.datetime.now().timetuple()[:6]
-            info = zipfile.ZipInfo(f'{table.name}.csv', date_time=date_time)
-            info.compress_type = zipfile.ZIP_DEFLATED
+    sorted_tables = [t for t in sorted_tables if t.name not in skip]
 
-            with z.open(info, 'w') as f:
-                csv23.write_csv(f, rows, header=header,
-                                dialect=dialect, encoding=encoding)
+    if date_time is None:
+        date_time = datetime.datetime.now().timetuple()[:6]
+
+    if jobs is not None and jobs > 1:
+        database = _backend.get_database(engine)
+        if not database:
+            log.warning('ignore jobs=%r for %r', jobs, engine)
+            jobs = None
+
+    log.info('write %r', filename)
+    if jobs is not None and jobs > 1:
+        log.info('export %d tables with %d jobs from %r',
+                 len(sorted_tables), jobs, database)
+        deflate_csv = functools.partial(_deflate_csv,
+                                        dialect=dialect, encoding=encoding,
+                                        compresslevel=compresslevel,
+                                        bind=_backend.readonly_engine(database))
+        members = _tools.pool_map(deflate_csv, sorted_tables,
+                                  jobs=jobs, processes=False, buffersize=jobs)
+        _write_deflated_zip(filename, members, date_time=date_time)
+    else:
+        with (zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as z,
+              _backend.connect(bind=engine) as conn):
+            for table in sorted_tables:
+                log.info('export table %r', table.name)
+                rows = conn.execute(sa.select(table))
+                header = list(rows.keys())
+
+                info = _zipinfo(f'{table.name}.csv', date_time=date_time,
+                                compresslevel=compresslevel)
+                with z.open(info, 'w') as f:
+                    csv23.write_csv(f, rows, header=header,
+                                    dialect=dialect, encoding=encoding)
 
     log.info('database export complete.')
     return _tools.path_from_filename(filename)
 
 
+def _zipinfo(name: str, /, *, date_time,
+             compresslevel: int | None = None) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    if compresslevel is not None:
+        # ZipFile.open() ignores ZipFile.compresslevel for ZipInfo members,
+        # before Python 3.13 the level can only be set via a private attribute
+        if sys.version_info >= (3, 13):
+            info.compress_level = compresslevel
+        else:  # pragma: no cover
+            info._compresslevel = compresslevel
+    return info
+
+
+class _DeflatedMember(NamedTuple):
+    """Raw deflate stream of a zip member with its CRC-32 and size."""
+
+    name: str
+
+    data: bytes
+
+    crc: int
+
+    file_size: int
+
+
+def _deflate_csv(table, /, *, dialect, encoding, compresslevel: int | None,
+                 bind) -> _DeflatedMember:
+    """Return the deflated CSV of table (zlib releases the GIL)."""
+    log.info('export table %r', table.name)
+    with (io.BytesIO() as f,
+          _backend.connect(bind=bind) as conn):
+        rows = conn.execute(sa.select(table))
+        header = list(rows.keys())
+        csv23.write_csv(f, rows, header=header,
+                        dialect=dialect, encoding=encoding)
+        data = f.getvalue()
+
+    if compresslevel is None:
+        compresslevel = zlib.Z_DEFAULT_COMPRESSION
+    # same raw deflate stream as zipfile.ZIP_DEFLATED
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    return _DeflatedMember(f'{table.name}.csv', deflated,
+                           crc=zlib.crc32(data), file_size=len(data))
+
+
+def _write_deflated_zip(filename, members, /, *, date_time) -> None:
+    """Write a zip file of _DeflatedMember items in order (no ZIP64 support)."""
+    infos = []
+    with open(filename, 'wb') as f:
+        for m in members:
+            info = zipfile.ZipInfo(m.name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.CRC = m.crc
+            info.compress_size = len(m.data)
+            info.file_size = m.file_size
+            info.external_attr = 0o600 << 16  # like ZipFile.open(..., 'w')
+            info.header_offset = f.tell()
+            if max(info.file_size, info.compress_size,
+                   info.header_offset) > ZIP_MAX_SIZE:
+                raise zipfile.LargeZipFile(f'{m.name!r} would require'
+                                           ' ZIP64 extensions, use jobs=None')
+
+            f.write(info.FileHeader(zip64=False))
+            f.write(m.data)
+            infos.append(info)
+
+        start_dir = f.tell()
+        for info in infos:
+            name = info.filename.encode('ascii')
+            year, month, day, hour, minute, second = info.date_time
+            dosdate = (year - 1980) << 9 | month << 5 | day
+            dostime = hour << 11 | minute << 5 | second // 2
+            f.write(ZIP_CENTRAL_DIR.pack(b'PK\x01\x02',
+                                         info.create_version, info.create_system,
+                                         info.extract_version, info.reserved,
+                                         info.flag_bits, info.compress_type,
+                                         dostime, dosdate, info.CRC,
+                                         info.compress_size, info.file_size,
+                                         len(name), len(info.extra),
+                                         len(info.comment), 0,
+                                         info.internal_attr, info.external_attr,
+                                         info.header_offset))
+            f.write(name + info.extra + info.comment)
+
+        f.write(ZIP_END_ARCHIVE.pack(b'PK\x05\x06', 0, 0, len(infos), len(infos),
+                                     f.tell() - start_dir, start_dir, 0))
+
+
 def print_rows(query=None, /, *, file=None,
                pretty: bool = False,
                format_: str | None = None,
@@ -278,10 +659,15 @@ def write_csv(query=None, /, filename=None, *,
                                autocompress=True)
 
 
-def hash_csv(query=None, /, *, hash_name: str = _globals.DEFAULT_HASH,
+def hash_csv(query=None, /, *, hash_name: str | Sequence[str] = _globals.DEFAULT_HASH,
              dialect=csv23.DIALECT, encoding: str = csv23.ENCODING,
              raw: bool = False,
+             format_: str = 'csv',
              bind=_globals.ENGINE):
+    """Return hash_rows() over the query result.
+
+    With ``format_=ROWS_FORMAT`` hash the SQLite values without result processing.
+    """
     if query is None:
         from .. import queries as _queries
 
@@ -291,24 +677,105 @@ def hash_csv(query=None, /, *, hash_name: str = _globals.DEFAULT_HASH,
         result = conn.execute(query)
 
         header = list(result.keys())
+        if format_ == ROWS_FORMAT:  # hash the stored values
+            fetchmany = functools.partial(result.cursor.fetchmany, 1_000)
+            result = itertools.chain.from_iterable(iter(fetchmany, []))
         return hash_rows(result, header=header, hash_name=hash_name, raw=raw,
-                         dialect=dialect, encoding=encoding)
+                         dialect=dialect, encoding=encoding, format_=format_)
 
 
-def hash_rows(rows, /, *, hash_name: str = _globals.DEFAULT_HASH,
+def hash_rows(rows, /, *, hash_name: str | Sequence[str] = _globals.DEFAULT_HASH,
               header=None,
               dialect=csv23.DIALECT, encoding=csv23.ENCODING,
-              raw: bool = False):
+              raw: bool = False,
+              format_: str = 'csv'):
+    """Return the hexdigest (hash object if raw) over rows in CSV or ROWS_FORMAT.
+
+    With a sequence of hash names return a list with one result per hash name
+    computed in one pass over the rows.
+    """
     if hash_name is None:
         hash_name = _globals.DEFAULT_HASH
 
-    log.info('hash rows with %r, csv header: %r', hash_name, header)
-    result = hashlib.new(hash_name)
-    assert hasattr(result, 'hexdigest')
-
-    csv23.write_csv(result, rows, header=header,
-                    dialect=dialect, encoding=encoding)
-
-    if not raw:
-        result = result.hexdigest()
-    return result
+    log.info('hash %r rows with %r, header: %r', format_, hash_name, header)
+    if isinstance(hash_name, str):
+        hashobjs = [hashlib.new(hash_name)]
+    else:
+        hashobjs = [hashlib.new(n) for n in hash_name]
+    assert all(hasattr(h, 'hexdigest') for h in hashobjs)
+
+    if format_ == 'csv':
+        target = hashobjs[0] if len(hashobjs) == 1 else MultiHash(hashobjs)
+        csv23.write_csv(target, rows, header=header,
+                        dialect=dialect, encoding=encoding)
+    elif format_ == ROWS_FORMAT:
+        for data in iterencode_rows(rows, header=header):
+            for h in hashobjs:
+                h.update(data)
+    else:  # pragma: no cover
+        raise ValueError(f'unknown format_: {format_!r}')
+
+    result = hashobjs if raw else [h.hexdigest() for h in hashobjs]
+    return result[0] if isinstance(hash_name, str) else result
+
+
+class MultiHash:
+    """Forward update() to several hash objects."""
+
+    def __init__(self, hashobjs, /) -> None:
+        self.hashobjs = hashobjs
+
+    def update(self, data) -> None:
+        for h in self.hashobjs:
+            h.update(data)
+
+    def hexdigest(self) -> list[str]:  # pragma: no cover
+        return [h.hexdigest() for h in self.hashobjs]
+
+
+def _encode_value(value, /) -> bytes:
+    if type(value) is str:
+        data = value.encode('utf-8')
+        return b'S%08x%s' % (len(data), data)
+    elif value is None:
+        return b'N'
+    elif type(value) in (int, bool):
+        data = b'%d' % value
+        return b'I%08x%s' % (len(data), data)
+    elif type(value) is float:
+        data = repr(value).encode('ascii')
+        return b'F%08x%s' % (len(data), data)
+    elif type(value) is bytes:
+        return b'X%08x%s' % (len(value), value)
+    elif isinstance(value, (datetime.date, datetime.datetime)):
+        data = value.isoformat().encode('ascii')
+        return b'T%08x%s' % (len(data), data)
+    raise TypeError(f'cannot encode {value!r}')  # pragma: no cover
+
+
+def iterencode_rows(rows, /, *, header=None,
+                    chunksize: int = 1_000) -> Iterator[bytes]:
+    r"""Yield the canonical ROWS_FORMAT encoding of header and rows in chunks.
+
+    The stream starts with ROWS_MAGIC, each row with ``b'H'`` (header) or ``b'R'``
+    and its number of cells, each cell with a type tag (``NISFXT``)
+    and (except for ``None``) the length of its UTF-8/ASCII representation
+    (all numbers as 8 lowercase hex digits).
+
+    >>> b''.join(iterencode_rows([('spam', 1, None)], header=['a', 'b', 'c']))
+    b'treedb-rows:1\nH00000003S00000001aS00000001bS00000001cR00000003S00000004spamI000000011N'
+    """  # noqa: E501
+    encode_value = _encode_value
+
+    def encode_row(row, kind=b'R'):
+        return b'%s%08x%s' % (kind, len(row), b''.join(map(encode_value, row)))
+
+    chunk = [ROWS_MAGIC]
+    if header is not None:
+        chunk.append(encode_row(header, kind=b'H'))
+    for rows in _tools.iterslices(rows, size=chunksize):
+        chunk.extend(map(encode_row, rows))
+        yield b''.join(chunk)
+        chunk = []
+    if chunk:
+        yield b''.join(chunk)
@@ -16,10 +16,13 @@ from .. import config as _config
 from .. import glottolog as _glottolog
 
 from . import models as _models
+from . import sqlite_master as _sqlite_master
 from . import views as _views
 
 __all__ = ['main']
 
+RAW_TABLES = frozenset({'_file', '_option', '_value', '_value_lines'})
+
 
 log = logging.getLogger(__name__)
 
@@ -53,7 +56,8 @@ def get_engine(filename_or_engine, /, *, require: bool):
     return _backend.set_engine(filename_or_engine, require=require)
 
 
-def get_dataset(engine, /, *, exclude_raw: bool, strict: bool):
+def get_dataset(engine, /, *, exclude_raw: bool, strict: bool,
+                metadata=_globals.REGISTRY.metadata):
     dataset = None
 
     if engine.file is None:
@@ -67,10 +71,29 @@ def get_dataset(engine, /, *, exclude_raw: bool, strict: bool):
         elif dataset.exclude_raw != bool(exclude_raw):  # pragma: no cover
             dataset = None
             log.warning('rebuild needed from exclude_raw mismatch')
+        elif missing := get_missing_tables(metadata, exclude_raw=exclude_raw,
+                                           bind=engine):
+            dataset = None
+            log.warning('rebuild needed from missing tables: %r', missing)
 
     return dataset
 
 
+def get_missing_tables(metadata, /, *, exclude_raw: bool, bind) -> list[str]:
+    """Return the names of metadata tables not in the database (e.g. older schema)."""
+    # import here to register models for the comparison
+    log.debug('import module %s.models', __package__)
+    from .. import models
+
+    assert models is not None
+
+    skip = RAW_TABLES if exclude_raw else frozenset()
+    with _backend.connect(bind=bind) as conn:
+        present = set(conn.execute(_sqlite_master.select_tables()).scalars())
+    return [t.name for t in metadata.sorted_tables
+            if t.name not in present and t.name not in skip]
+
+
 def main(filename=_globals.ENGINE, repo_root=None, /, *,
          treepath=_languoids.TREE_IN_ROOT,
          metadata=_globals.REGISTRY.metadata,
@@ -80,16 +103,27 @@ def main(filename=_globals.ENGINE, repo_root=None, /, *,
          exclude_raw: bool = False,
          exclude_views: bool = False,
          force_rebuild: bool = False,
+         jobs: int | None = None,
+         compact_raw: bool = False,
+         materialize_json: bool = False,
+         index_names: bool = False,
+         index_coordinates: bool = False,
          _only_create_tables: bool = False):
     """Load languoids/tree/**/md.ini into SQLite3 db, return engine."""
     kwargs = {'root': get_root(repo_root, default=_globals.ROOT, treepath=treepath),
-              'from_raw': get_from_raw(from_raw, exclude_raw=exclude_raw)}
+              'from_raw': get_from_raw(from_raw, exclude_raw=exclude_raw),
+              'jobs': jobs,
+              'compact_raw': compact_raw,
+              'materialize_json': materialize_json,
+              'index_names': index_names,
+              'index_coordinates': index_coordinates}
 
     engine = get_engine(filename, require=require)
 
     dataset = get_dataset(engine,
                           exclude_raw=exclude_raw,
-                          strict=not force_rebuild and not _only_create_tables)
+                          strict=not force_rebuild and not _only_create_tables,
+                          metadata=metadata)
 
     if dataset is None or rebuild or _only_create_tables:
         log.info('build new database' if dataset is None else 'rebuild database')
@@ -138,6 +172,12 @@ def create_tables(metadata, /, *, conn,
 
     assert models is not None
 
+    # import here to register views for create_all_views()
+    log.debug('import module %s.queries', __package__)
+    from .. import queries
+
+    assert queries is not None
+
     if not exclude_raw:
         log.debug('import module %s.raw', __package__)
 
@@ -165,7 +205,12 @@ def create_tables(metadata, /, *, conn,
 
 
 def load(metadata, /, *, conn, root,
-         from_raw: bool, exclude_raw: bool):
+         from_raw: bool, exclude_raw: bool,
+         jobs: int | None = None,
+         compact_raw: bool = False,
+         materialize_json: bool = False,
+         index_names: bool = False,
+         index_coordinates: bool = False):
     log.info('record git commit in %r', root)
     # pre-create dataset to added as final item marking completeness
     dataset = make_dataset(root, exclude_raw=exclude_raw)
@@ -184,7 +229,7 @@ def load(metadata, /, *, conn, root,
 
     if not exclude_raw:
         log.info('load raw')
-        import_raw(conn, root=root)
+        import_raw(conn, root=root, compact=compact_raw)
 
         log.info('COMMIT raw: %r', conn)
         conn.commit()
@@ -194,7 +239,11 @@ def load(metadata, /, *, conn, root,
 
     log.info('load languoids')
     import_languoids(conn, root=root,
-                     source='raw' if from_raw else 'files')
+                     source='raw' if from_raw else 'files',
+                     jobs=jobs,
+                     materialize_json=materialize_json,
+                     index_names=index_names,
+                     index_coordinates=index_coordinates)
 
     log.info('COMMIT languoids: %r', conn)
     conn.commit()
@@ -256,17 +305,21 @@ def write_producer(conn, /, *, name: str):
     conn.execute(sa.insert(_models.Producer), params)
 
 
-def import_raw(conn, /, *, root):
+def import_raw(conn, /, *, root, compact: bool = False):
     log.debug('import target module %s.raw.import_models', __package__)
 
     from ..raw import import_models
 
     log.debug('root: %r', root)
 
-    import_models.main(root, conn=conn)
+    import_models.main(root, conn=conn, compact=compact)
 
 
-def import_languoids(conn, /, *, root, source: str):
+def import_languoids(conn, /, *, root, source: str,
+                     jobs: int | None = None,
+                     materialize_json: bool = False,
+                     index_names: bool = False,
+                     index_coordinates: bool = False):
     log.debug('import source module %s.languoids', __package__)
 
     from .. import export
@@ -288,6 +341,25 @@ def import_languoids(conn, /, *, root, source: str):
 
     pairs = export.iterlanguoids(source,
                                  order_by=order_by,
+                                 jobs=jobs,
                                  root=root, bind=conn)
 
-    import_models.main(pairs, conn=conn)
+    if source == 'raw' and jobs is not None and jobs > 1:
+        # keep RESERVED lock (no EXCLUSIVE from cache spill) for reading workers
+        pairs = _without_cache_spill(pairs, conn=conn)
+
+    import_models.main(pairs, conn=conn,
+                       materialize_json=materialize_json,
+                       index_names=index_names,
+                       index_coordinates=index_coordinates)
+
+
+def _without_cache_spill(items, /, *, conn):
+    cache_spill = conn.execute(sa.text('PRAGMA cache_spill')).scalar_one()
+    log.debug('PRAGMA cache_spill = OFF (was %r)', cache_spill)
+    conn.execute(sa.text('PRAGMA cache_spill = OFF'))
+    try:
+        yield from items
+    finally:
+        log.debug('PRAGMA cache_spill = %d', cache_spill)
+        conn.execute(sa.text(f'PRAGMA cache_spill = {cache_spill:d}'))
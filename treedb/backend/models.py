@@ -1,5 +1,7 @@
 """Dataset, producer, and config metadata."""
 
+import hashlib
+import json
 import logging
 import warnings
 
@@ -10,7 +12,7 @@ from .._globals import REGISTRY as registry  # noqa: N811
 from .. import _tools
 from .. import backend as _backend
 
-__all__ = ['Dataset', 'Producer', 'Config']
+__all__ = ['Dataset', 'Producer', 'Config', 'Checksum']
 
 
 log = logging.getLogger(__name__)
@@ -154,3 +156,97 @@ class Config:
         result = _backend.iterrows(select_values, bind=bind)
         return {section: {option: value for _, option, value in grp}
                 for section, grp in _groupby_section(result)}
+
+
+@registry.mapped
+class Checksum:
+    """Cached checksum result for the parameters and __dataset__ it was computed with."""
+
+    __tablename__ = '__checksum__'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+
+    source = sa.Column(sa.Text, sa.CheckConstraint("source != ''"), nullable=False)
+
+    order_by = sa.Column(sa.Text, sa.CheckConstraint("order_by != ''"), nullable=False)
+
+    limit = sa.Column(sa.Integer, sa.CheckConstraint('"limit" >= 0'))
+
+    offset = sa.Column(sa.Integer, sa.CheckConstraint('"offset" >= 0'), nullable=False)
+
+    hash_name = sa.Column(sa.Text, sa.CheckConstraint("hash_name != ''"), nullable=False)
+
+    dataset = sa.Column(sa.String(64), sa.CheckConstraint('length(dataset) = 64'),
+                        nullable=False)
+
+    value = sa.Column(sa.Text, sa.CheckConstraint("value != ''"), nullable=False)
+
+    @staticmethod
+    def dataset_digest(*, bind) -> str | None:
+        """Return the sha256 hexdigest over the __dataset__ row (None if missing)."""
+        dataset = Dataset.get_dataset(bind=bind, strict=False)
+        if dataset is None:
+            return None
+        dataset = json.dumps(dict(dataset), sort_keys=True)
+        return hashlib.sha256(dataset.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _where_key(cls, *, source: str, order_by: str,
+                   limit: int | None, offset: int | None, hash_name: str):
+        return (cls.source == source, cls.order_by == order_by,
+                cls.limit.is_(limit) if limit is None else cls.limit == limit,
+                cls.offset == (offset or 0), cls.hash_name == hash_name)
+
+    @classmethod
+    def get_checksum(cls, /, *, bind, **key) -> str | None:
+        """Return the cached checksum value for key and the current __dataset__."""
+        with _backend.connect(bind=bind) as conn:
+            dataset = cls.dataset_digest(bind=conn)
+            if dataset is None:
+                return None
+            select_value = (sa.select(cls.value)
+                            .where(*cls._where_key(**key), cls.dataset == dataset))
+            try:
+                result = conn.scalar(select_value)
+            except sa.exc.OperationalError as e:
+                if 'no such table' in e.orig.args[0]:
+                    log.debug('no %r table in %r', cls.__tablename__, bind)
+                    return None
+                raise  # pragma: no cover
+        log.debug('%s %s: %r', cls.__tablename__, 'hit' if result else 'miss', key)
+        return result
+
+    @classmethod
+    def set_checksum(cls, value: str, /, *, bind, **key) -> bool:
+        """Store value for key and the current __dataset__, drop stale rows."""
+        commit = not isinstance(bind, sa.engine.base.Connection)
+        with _backend.connect(bind=bind) as conn:
+            dataset = cls.dataset_digest(bind=conn)
+            if dataset is None:
+                return False
+            params = dict(key, offset=key.get('offset') or 0)
+            try:
+                conn.execute(sa.delete(cls)
+                             .where(sa.or_(sa.and_(*cls._where_key(**key)),
+                                           cls.dataset != dataset)))
+                conn.execute(sa.insert(cls), {'dataset': dataset, 'value': value, **params})
+            except sa.exc.OperationalError as e:
+                log.warning('cannot cache checksum in %r: %s', bind, e.orig)
+                if commit:
+                    conn.rollback()
+                return False
+            if commit:
+                conn.commit()
+        return True
+
+    @classmethod
+    def clear(cls, /, *, conn) -> int:
+        """Delete all cached checksums (after updating tables), return their number."""
+        try:
+            result = conn.execute(sa.delete(cls))
+        except sa.exc.OperationalError as e:
+            if 'no such table' in e.orig.args[0]:
+                return 0
+            raise  # pragma: no cover
+        log.debug('deleted %d %r rows', result.rowcount, cls.__tablename__)
+        return result.rowcount
@@ -6,17 +6,22 @@ import io
 import logging
 import warnings
 
+import sqlalchemy as sa
+
 from .. import _globals
 from .. import _tools
 from .. import backend as _backend
 
 __all__ = ['pd_read_sql',
-           'pd_read_json_lines']
+           'pd_read_json_lines',
+           'pd_optimize_dtypes']
 
 PANDAS = None
 
 JSON_BUFLINES = 5_000
 
+CATEGORY_MAX_RATIO = 0.5
+
 
 log = logging.getLogger(__name__)
 
@@ -33,7 +38,14 @@ def _import_pandas():
             log.info('pandas version: %s', PANDAS.__version__)
 
 
-def pd_read_sql(sql=None, /, *args, con=_globals.ENGINE, **kwargs):
+def pd_read_sql(sql=None, /, *args, con=_globals.ENGINE,
+                optimize_dtypes: bool = False,
+                string_storage: str | None = None,
+                **kwargs):
+    """Return a DataFrame from sql (default: ``get_example_query()``).
+
+    With ``optimize_dtypes`` apply ``pd_optimize_dtypes()`` to the result.
+    """
     _import_pandas()
 
     if PANDAS is None:
@@ -45,26 +57,137 @@ def pd_read_sql(sql=None, /, *args, con=_globals.ENGINE, **kwargs):
         sql = queries.get_example_query()
 
     with _backend.connect(bind=con) as conn:
-        return PANDAS.read_sql_query(sql, *args, con=conn, **kwargs)
+        df = PANDAS.read_sql_query(sql, *args, con=conn, **kwargs)
+        if optimize_dtypes and isinstance(sql, sa.sql.Select):
+            df = pd_optimize_dtypes(df, sql.selected_columns,
+                                    string_storage=string_storage,
+                                    bind=conn)
+    return df
+
+
+def pd_optimize_dtypes(df, columns, /, *,
+                       string_storage: str | None = None,
+                       bind=_globals.ENGINE):
+    """Return df with memory-saving dtypes for the sqlalchemy columns.
+
+    Use ordered categoricals for levels and endangerment statuses,
+    categoricals for macroareas and enumerated columns, and nullable ``Int64``
+    for integer columns with missing values. Make other non-key string columns
+    ``category`` if their non-null values repeat (``CATEGORY_MAX_RATIO``),
+    else ``pandas.StringDtype(string_storage)`` if given (e.g. ``'pyarrow'``).
+    """
+    _import_pandas()
+
+    if PANDAS is None:
+        return None
+
+    categories = _schema_categories(bind=bind)
+
+    dtypes = {}
+    for column in columns:
+        name = column.name
+        if name not in df.columns:  # index_col
+            continue
+        values = df[name]
+
+        base = _table_column(column)
+        if base is not None:
+            dtype = categories.get(base)
+            if dtype is None:
+                dtype = next((categories[fk.column] for fk in base.foreign_keys
+                              if fk.column in categories), None)
+            if dtype is None and isinstance(base.type, sa.Enum):
+                dtype = PANDAS.CategoricalDtype(base.type.enums)
+            if dtype is not None:
+                dtypes[name] = dtype
+                continue
+
+        if isinstance(column.type, sa.Integer):
+            if values.dtype.kind != 'i':
+                dtypes[name] = 'Int64'
+        elif (values.dtype.kind in ('O', 'T')
+              or isinstance(values.dtype, PANDAS.StringDtype)):
+            repeating = values.nunique() <= values.count() * CATEGORY_MAX_RATIO
+            if repeating and not _is_key(base):
+                dtypes[name] = 'category'
+            elif string_storage is not None:
+                dtypes[name] = PANDAS.StringDtype(string_storage)
+
+    log.debug('optimize dtypes: %r', dtypes)
+    return df.astype(dtypes)
+
+
+def _table_column(column, /):
+    """Return the table column underlying a (labeled) column or None."""
+    for c in column.proxy_set:
+        if isinstance(c, sa.Column) and isinstance(c.table, sa.Table):
+            return c
+    return None
+
+
+def _is_key(column, /) -> bool:
+    return column is not None and bool(column.primary_key or column.foreign_keys)
+
+
+def _schema_categories(*, bind) -> dict:
+    """Return {<lookup table name column>: <pandas.CategoricalDtype>}."""
+    from .. import models
+
+    select_status = (sa.select(models.EndangermentStatus.name)
+                     .order_by(models.EndangermentStatus.ordinal))
+    select_macroarea = (sa.select(models.Macroarea.name)
+                        .order_by(models.Macroarea.name))
+
+    with _backend.connect(bind=bind) as conn:
+        try:
+            statuses = conn.execute(select_status).scalars().all()
+            macroareas = conn.execute(select_macroarea).scalars().all()
+        except sa.exc.OperationalError:  # pragma: no cover
+            statuses = macroareas = []
+
+    level = models.LanguoidLevel.__table__.c.name
+    status = models.EndangermentStatus.__table__.c.name
+    macroarea = models.Macroarea.__table__.c.name
+    return {level: PANDAS.CategoricalDtype(models.LEVEL, ordered=True),
+            status: PANDAS.CategoricalDtype(statuses, ordered=True),
+            macroarea: PANDAS.CategoricalDtype(macroareas)}
 
 
 def pd_read_json_lines(query, /, *,
                        buflines: int = JSON_BUFLINES,
+                       chunksize: int | None = None,
                        bind=_globals.ENGINE,
                        **kwargs):
+    """Return a DataFrame from a query of JSON lines.
+
+    With ``chunksize`` return an iterator of DataFrames of ``chunksize`` lines.
+    """
     _import_pandas()
 
     if PANDAS is None:
         return None
 
+    if chunksize is not None:
+        return _iterquery_json_lines(query, chunksize=chunksize,
+                                     bind=bind, **kwargs)
+
+    with _backend.connect(bind=bind) as conn:
+        result = conn.execute(query)
+        json_lines = result.scalars()
+        return _pd_read_json_lines(json_lines, buflines=buflines, **kwargs)
+
+
+def _iterquery_json_lines(query, /, *, chunksize: int, bind, **kwargs):
     with _backend.connect(bind=bind) as conn:
         result = conn.execute(query)
         json_lines = result.scalars()
-        return _pd_read_json_lines(json_lines, **kwargs)
+        yield from _iter_pd_read_json_lines(json_lines, chunksize=chunksize,
+                                            **kwargs)
 
 
 def _pd_read_json_lines(json_lines: Iterable[str], /, *,
                         buflines: int = JSON_BUFLINES,
+                        chunksize: int | None = None,
                         concat_ignore_index: bool = False,
                         **kwargs):
     _import_pandas()
@@ -72,23 +195,29 @@ def _pd_read_json_lines(json_lines: Iterable[str], /, *,
     if PANDAS is None:
         return None
 
+    if chunksize is not None:
+        return _iter_pd_read_json_lines(json_lines, chunksize=chunksize,
+                                        **kwargs)
+
+    dfs = list(_iter_pd_read_json_lines(json_lines, chunksize=buflines,
+                                        **kwargs))
+    if not dfs:
+        return None
+    elif len(dfs) == 1:
+        return dfs[0]
+    return PANDAS.concat(dfs, ignore_index=concat_ignore_index)
+
+
+def _iter_pd_read_json_lines(json_lines: Iterable[str], /, *,
+                             chunksize: int, **kwargs):
+    """Yield one DataFrame per chunk of ``chunksize`` JSON lines."""
     with io.StringIO() as buf:
         print_line = functools.partial(print, file=buf)
-        df = None
-        for chunk in _tools.iterslices(json_lines, size=buflines):
+        for chunk in _tools.iterslices(json_lines, size=chunksize):
             for line in chunk:
                 print_line(line)
             buf.seek(0)
 
-            lines_df = PANDAS.read_json(buf, lines=True, **kwargs)
+            yield PANDAS.read_json(buf, lines=True, **kwargs)
             buf.seek(0)
             buf.truncate()
-
-            if df is None:
-                df = lines_df
-            else:
-                df = PANDAS.concat([df, lines_df],
-                                   ignore_index=concat_ignore_index,
-                                   copy=False)
-
-    return df
@@ -12,7 +12,8 @@ from . import _globals
 from ._globals import SESSION as Session  # noqa: N811
 from .backend.models import Dataset
 from .models import (FAMILY, LANGUAGE, DIALECT,
-                     Languoid, PseudoFamily, Altname, AltnameProvider)
+                     Languoid, LanguoidPath, languoid_closure, PseudoFamily,
+                     Altname, AltnameProvider)
 
 __all__ = ['check',
            'compare_languoids']
@@ -242,6 +243,76 @@ def family_languages():
                    .scalar_subquery() < 2))
 
 
+@check
+def valid_languoidpath():
+    """Materialized languoid path, family, and language match the tree."""
+    path, family, language = Languoid.path_family_language()
+
+    root = sa.case((LanguoidPath.depth == 0, Languoid.id),
+                   else_=LanguoidPath.family_id)
+
+    return (sa.select(Languoid)
+            .outerjoin(LanguoidPath, LanguoidPath.languoid_id == Languoid.id)
+            .order_by('id')
+            .where(sa.or_(LanguoidPath.path.is_distinct_from(path),
+                          LanguoidPath.family_id.is_distinct_from(family),
+                          LanguoidPath.language_id.is_distinct_from(language),
+                          LanguoidPath.root_id.is_distinct_from(root))))
+
+
+@check
+def valid_languoid_closure():
+    """Closure has one row per languoidpath ancestor with matching steps."""
+    descendant, ancestor = (sa.orm.aliased(LanguoidPath, name=n)  # noqa: N806
+                            for n in ('descendant', 'ancestor'))
+
+    n_ancestors = (sa.select(sa.func.count())
+                   .select_from(languoid_closure)
+                   .where(languoid_closure.c.descendant_id == Languoid.id)
+                   .scalar_subquery())
+
+    prefix = sa.func.substr(descendant.path, 1, sa.func.length(ancestor.path))
+
+    return (sa.select(Languoid)
+            .join(descendant, descendant.languoid_id == Languoid.id)
+            .order_by('id')
+            .where(sa.or_(n_ancestors != descendant.depth + 1,
+                          sa.select(languoid_closure)
+                          .join(ancestor,
+                                ancestor.languoid_id == languoid_closure.c.ancestor_id)
+                          .where(languoid_closure.c.descendant_id == Languoid.id)
+                          .where(sa.or_(prefix != ancestor.path,
+                                        descendant.depth - ancestor.depth
+                                        != languoid_closure.c.steps))
+                          .exists())))
+
+
+@check
+def valid_languoid_interval():
+    """Languoidpath lft/rgt interval is unique, nested, and spans the descendants."""
+    node, parent, other = (sa.orm.aliased(LanguoidPath, name=n)  # noqa: N806
+                           for n in ('node', 'parent', 'other'))
+
+    n_descendants = (sa.select(sa.func.count())
+                     .select_from(languoid_closure)
+                     .where(languoid_closure.c.ancestor_id == Languoid.id)
+                     .where(languoid_closure.c.steps > 0)
+                     .scalar_subquery())
+
+    return (sa.select(Languoid)
+            .join(node, node.languoid_id == Languoid.id)
+            .order_by('id')
+            .where(sa.or_(node.rgt - node.lft != n_descendants,
+                          sa.select(parent)
+                          .where(parent.languoid_id == Languoid.parent_id)
+                          .where(~node.in_subtree(parent))
+                          .exists(),
+                          sa.select(other)
+                          .where(other.lft == node.lft)
+                          .where(other.languoid_id != node.languoid_id)
+                          .exists())))
+
+
 def bookkeeping_no_children():
     """Bookkeeping languoids lack children (book1242 is flat).
 
@@ -266,15 +337,17 @@ def no_empty_files(*, exclude_raw: bool):
         pytest.skip('skipped from exclude_raw=True')
         return sa.select(sa.true()).where(sa.false())
 
-    from .raw import File, Value
+    from .raw import File, Value, ValueLines
 
     return (sa.select(File)
             .select_from(File)
-            .where(~sa.exists().where(Value.file_id == File.id)))
+            .where(~sa.exists().where(Value.file_id == File.id))
+            .where(~sa.exists().where(ValueLines.file_id == File.id)))
 
 
 def compare_languoids(left_source: str = 'files', right_source: str = 'raw', /,
-                      *, order_by: str = _globals.LANGUOID_ORDER):  # pragma: no cover
+                      *, order_by: str = _globals.LANGUOID_ORDER,
+                      jobs: int | None = None):  # pragma: no cover
     from . import export
 
     def compare(left, right):
@@ -286,7 +359,7 @@ def compare_languoids(left_source: str = 'files', right_source: str = 'raw', /,
 
         return same
 
-    left, right = (export.iterlanguoids(source, order_by=order_by)
+    left, right = (export.iterlanguoids(source, order_by=order_by, jobs=jobs)
                    for source in (left_source, right_source))
 
     return compare(left, right)
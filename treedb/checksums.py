@@ -0,0 +1,277 @@
+"""Merkle tree of languoid content and subtree hashes."""
+
+from collections.abc import Iterable, Iterator, Mapping
+import hashlib
+import logging
+from typing import NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy import select
+
+from . import _globals
+from . import _tools
+from . import backend as _backend
+from .models import Languoid, LanguoidHash
+
+__all__ = ['tree_checksum',
+           'compare_hashes',
+           'update_languoid_hashes']
+
+CHECKSUM_NAME = 'languoid_tree'
+
+HASH_NAME = 'sha256'
+
+ADDED, REMOVED, CHANGED = 'added', 'removed', 'changed'
+
+
+log = logging.getLogger(__name__)
+
+
+class Node(NamedTuple):
+    """Languoid parent_id, content hash, and subtree hash."""
+
+    parent_id: str | None
+
+    hash: str
+
+    subtree_hash: str | None = None
+
+
+def hash_content(json_line: str, /) -> str:
+    """Return the hexdigest of a languoid JSON string.
+
+    >>> hash_content('{}')
+    '44136fa355b3678a1146ad16f7e8649e94fb4fc21fe77e8310c060f61caaff8a'
+    """
+    return hashlib.new(HASH_NAME, json_line.encode('utf-8')).hexdigest()
+
+
+def hash_subtree(content_hash: str,
+                 children: Iterable[tuple[str, str]], /) -> str:
+    """Return the hexdigest over content_hash and (<child_id>, <subtree_hash>) pairs.
+
+    >>> hash_subtree('', [])
+    'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+
+    >>> hash_subtree('', [('spam1234', 'f00'), ('eggs1234', 'ba4')])
+    'cd0730c6f3f0d049a5b31c52b3d49f25a51dfe4ae564ac1ce4969b06b895e24c'
+    """
+    hashobj = hashlib.new(HASH_NAME, content_hash.encode('ascii'))
+    for child_id, subtree_hash in sorted(children):
+        hashobj.update(f'\n{child_id}:{subtree_hash}'.encode('ascii'))
+    return hashobj.hexdigest()
+
+
+def make_tree(nodes: Mapping[str, Node], /) -> dict[str, Node]:
+    """Return nodes with subtree_hash computed bottom-up."""
+    children = {}
+    for id_, node in nodes.items():
+        children.setdefault(node.parent_id, []).append(id_)
+
+    result = {}
+    # iterative post-order: push parent again after its children
+    stack = [(id_, False) for id_ in children.get(None, ())]
+    while stack:
+        id_, children_done = stack.pop()
+        if children_done:
+            node = nodes[id_]
+            subtree = [(c, result[c].subtree_hash) for c in children.get(id_, ())]
+            result[id_] = node._replace(subtree_hash=hash_subtree(node.hash, subtree))
+        else:
+            stack.append((id_, True))
+            stack.extend((c, False) for c in children.get(id_, ()))
+
+    if len(result) != len(nodes):  # pragma: no cover
+        raise ValueError(f'{len(nodes) - len(result):d} nodes unreachable from roots')
+    return result
+
+
+def iterlanguoid_json(*, bind=_globals.ENGINE,
+                      languoid_ids: Iterable[str] | None = None
+                      ) -> Iterator[tuple[str, str | None, str]]:
+    """Yield (<id>, <parent_id>, <languoid JSON string>) triples from tables."""
+    from . import queries
+
+    query = queries.get_json_query(as_rows=True, load_json=False,
+                                   sort_keys=True)
+    languoid_json = query.selected_columns[_globals.LANGUOID_LABEL]
+
+    select_json = (select(Languoid.id, Languoid.parent_id, languoid_json)
+                   .select_from(Languoid)
+                   .order_by(Languoid.id))
+    if languoid_ids is not None:
+        select_json = select_json.where(Languoid.id.in_(languoid_ids))
+
+    with _backend.connect(bind=bind) as conn:
+        yield from conn.execute(select_json)
+
+
+def compute_hashes(source: str = 'tables', /, *,
+                   root=_globals.ROOT,
+                   bind=_globals.ENGINE) -> dict[str, Node]:
+    """Return {<id>: (<parent_id>, <hash>, <subtree_hash>)} computed from source."""
+    log.info('compute languoid hashes from %r', source)
+    if source == 'tables':
+        triples = iterlanguoid_json(bind=bind)
+    elif source in ('files', 'raw'):
+        from . import export
+
+        items = export.iterlanguoids(source, order_by='path', root=root, bind=bind)
+        items = list(items)
+        lines = _tools.pipe_json((languoid for _, languoid in items), dump=True,
+                                 sort_keys=True, compact=True)
+        triples = ((languoid['id'], languoid['parent_id'], line)
+                   for (_, languoid), line in zip(items, lines))
+    else:  # pragma: no cover
+        raise ValueError(f'unknown source: {source!r}')
+
+    nodes = {id_: Node(parent_id, hash_content(line))
+             for id_, parent_id, line in triples}
+    return make_tree(nodes)
+
+
+def write_languoid_hashes(*, conn) -> int:
+    """Insert LanguoidHash rows for all languoids, return their number."""
+    nodes = compute_hashes('tables', bind=conn)
+
+    params = [{'languoid_id': id_, 'hash': node.hash,
+               'subtree_hash': node.subtree_hash}
+              for id_, node in nodes.items()]
+    log.info('insert %d languoid hashes', len(params))
+    if params:
+        conn.execute(sa.insert(LanguoidHash), params)
+    return len(params)
+
+
+def update_languoid_hashes(languoid_ids: Iterable[str], /, *, conn) -> str:
+    """Recompute the hashes of languoid_ids and their ancestors, return tree_checksum().
+
+    Pass the ids of added, changed, moved, and removed languoids
+    plus the former parent_id of moved and removed ones.
+    Use ``import_models.update_languoids()`` to also refresh the other derived tables.
+    """
+    languoid_ids = set(languoid_ids)
+    log.info('update hashes of %d changed languoids', len(languoid_ids))
+
+    nodes = {id_: Node(parent_id, hash_content(line))
+             for id_, parent_id, line in iterlanguoid_json(languoid_ids=languoid_ids,
+                                                           bind=conn)}
+    removed = languoid_ids - nodes.keys()
+
+    select_parents = (select(Languoid.id, Languoid.parent_id)
+                      .where(Languoid.id.in_(sa.bindparam('ids', expanding=True))))
+
+    # steps from the deepest changed descendant: ancestors after descendants
+    height, ids, step = {}, set(nodes), 0
+    while ids:
+        height.update(dict.fromkeys(ids, step))
+        parents = conn.execute(select_parents, {'ids': list(ids)}).all()
+        ids = {parent_id for _, parent_id in parents if parent_id is not None}
+        step += 1
+
+    select_children = (select(Languoid.id, LanguoidHash.subtree_hash)
+                       .outerjoin_from(Languoid, LanguoidHash)
+                       .where(Languoid.parent_id == sa.bindparam('parent_id')))
+    select_hash = (select(LanguoidHash.hash)
+                   .where(LanguoidHash.languoid_id == sa.bindparam('languoid_id')))
+
+    updated = {}
+    for id_ in sorted(height, key=height.__getitem__):
+        children = conn.execute(select_children, {'parent_id': id_}).all()
+        children = [(c, updated[c].subtree_hash if c in updated else h)
+                    for c, h in children]
+        if id_ in nodes:
+            node = nodes[id_]
+        else:
+            node = Node(None, conn.execute(select_hash, {'languoid_id': id_}).scalar_one())
+        updated[id_] = node._replace(subtree_hash=hash_subtree(node.hash, children))
+
+    conn.execute(sa.delete(LanguoidHash)
+                 .where(LanguoidHash.languoid_id.in_(removed | updated.keys())))
+    if updated:
+        conn.execute(sa.insert(LanguoidHash),
+                     [{'languoid_id': id_, 'hash': node.hash,
+                       'subtree_hash': node.subtree_hash}
+                      for id_, node in updated.items()])
+
+    return tree_checksum(bind=conn)
+
+
+def tree_checksum(*, bind=_globals.ENGINE) -> str:
+    """Return the top-level digest over the subtree hashes of all roots."""
+    roots = TableHashes(bind=bind).children(None)
+    digest = hash_subtree('', roots.items())
+    return f'{CHECKSUM_NAME}:{HASH_NAME}:{digest}'
+
+
+class TableHashes:
+    """Fetch hashes from the LanguoidHash table on demand."""
+
+    def __init__(self, *, bind=_globals.ENGINE):
+        self.bind = bind
+
+    def children(self, parent_id: str | None, /) -> dict[str, str]:
+        select_children = (select(LanguoidHash.languoid_id, LanguoidHash.subtree_hash)
+                           .join_from(LanguoidHash, Languoid)
+                           .where(Languoid.parent_id.is_(parent_id)
+                                  if parent_id is None else
+                                  Languoid.parent_id == parent_id))
+        with _backend.connect(bind=self.bind) as conn:
+            return dict(conn.execute(select_children).all())
+
+    def hash(self, languoid_id: str, /) -> str:
+        select_hash = (select(LanguoidHash.hash)
+                       .filter_by(languoid_id=languoid_id))
+        with _backend.connect(bind=self.bind) as conn:
+            return conn.execute(select_hash).scalar_one()
+
+
+class MemoryHashes:
+    """Serve hashes from a compute_hashes() result."""
+
+    def __init__(self, nodes: Mapping[str, Node], /):
+        self.nodes = nodes
+        self._children = {}
+        for id_, node in nodes.items():
+            self._children.setdefault(node.parent_id, {})[id_] = node.subtree_hash
+
+    def children(self, parent_id: str | None, /) -> dict[str, str]:
+        return self._children.get(parent_id, {})
+
+    def hash(self, languoid_id: str, /) -> str:
+        return self.nodes[languoid_id].hash
+
+
+def compare_hashes(left=_globals.ENGINE, right='files', /, *,
+                   root=_globals.ROOT,
+                   bind=_globals.ENGINE) -> list[tuple[str, str]]:
+    """Return (<languoid_id>, 'added'|'removed'|'changed') pairs from left to right.
+
+    Sides are engines/connections (using their LanguoidHash table)
+    or sources (computing the hashes in memory from root or bind).
+    Descend only into subtrees with differing subtree hashes.
+    """
+    def get_hashes(side):
+        if isinstance(side, str):
+            return MemoryHashes(compute_hashes(side, root=root, bind=bind))
+        return TableHashes(bind=side)
+
+    left, right = map(get_hashes, (left, right))
+
+    result = []
+    stack = [None]
+    while stack:
+        parent_id = stack.pop()
+        lt, rt = left.children(parent_id), right.children(parent_id)
+        for id_ in sorted(lt.keys() | rt.keys(), reverse=True):
+            if id_ not in rt:
+                result.append((id_, REMOVED))
+            elif id_ not in lt:
+                result.append((id_, ADDED))
+            elif lt[id_] != rt[id_]:
+                if left.hash(id_) != right.hash(id_):
+                    result.append((id_, CHANGED))
+                stack.append(id_)
+
+    log.info('%d differing languoids', len(result))
+    return sorted(result)
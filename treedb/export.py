@@ -1,20 +1,24 @@
 """Yield languoids, write information to stdout, .csv, .jsonl, etc."""
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 import datetime
+import functools
 import itertools
 import hashlib
 import logging
 import operator
 import warnings
 
+import sqlalchemy as sa
+
 from . import _globals
 from . import _tools
 from . import backend as _backend
 from .backend import export as _backend_export
+from .backend import models as _backend_models
 from .backend import pandas as _backend_pandas
 from .languoids import records as _records
-from .models import SPECIAL_FAMILIES, BOOKKEEPING
+from .models import SPECIAL_FAMILIES, BOOKKEEPING, Languoid, LanguoidPath
 from . import queries as _queries
 
 __all__ = ['print_languoid_stats',
@@ -22,6 +26,7 @@ __all__ = ['print_languoid_stats',
            'checksum',
            'write_json_lines',
            'pd_read_languoids',
+           'pd_read_tables',
            'fetch_languoids',
            'write_files']
 
@@ -29,6 +34,8 @@ CHECKSUM_NAME = 'path_languoid'
 
 FALLBACK_ENGINE_PATH = _tools.path_from_filename('treedb.sqlite3')
 
+JSON_LINES_CHUNKSIZE = 2_000
+
 
 log = logging.getLogger(__name__)
 
@@ -62,9 +69,13 @@ def iterlanguoids(source: str = 'files', /, *,
                   offset: int | None = 0,
                   order_by: str = _globals.LANGUOID_ORDER,
                   progress_after: int = _tools.PROGRESS_AFTER,
+                  jobs: int | None = None,
                   root=_globals.ROOT, bind=_globals.ENGINE,
                   ) -> Iterable[_globals.LanguoidItem]:
-    """Yield (path, languoid) pairs from diffferent sources."""
+    """Yield (path, languoid) pairs from diffferent sources.
+
+    With ``jobs`` fetch and parse ``'raw'`` windows in worker processes.
+    """
     log.info('generate languoids from %r', source)
     if source in ('files', 'raw'):
         log.info('extract languoids from %r', source)
@@ -78,15 +89,17 @@ def iterlanguoids(source: str = 'files', /, *,
             from . import languoids
 
             records = languoids.iterrecords(root=root, progress_after=progress_after)
+            items = _records.pipe(records, dump=False, convert_lines=True)
         elif source == 'raw':
             from . import raw
 
-            records = raw.fetch_records(order_by=order_by,
-                                        progress_after=progress_after,
-                                        bind=bind)
+            pipe = functools.partial(_records.pipe, dump=False,
+                                     convert_lines=False)
+            items = raw.fetch_records(order_by=order_by,
+                                      progress_after=progress_after,
+                                      jobs=jobs, pipe=pipe,
+                                      bind=bind)
 
-        items = _records.pipe(records, dump=False,
-                              convert_lines=(source == 'files'))
         return _tools.islice_limit(items,
                                    limit=limit,
                                    offset=offset)
@@ -104,29 +117,105 @@ def checksum(source: str = 'tables', *,
              limit: int | None = None,
              offset: int | None = 0,
              order_by: str = _globals.LANGUOID_ORDER,
-             hash_name: str = _globals.DEFAULT_HASH,
+             hash_name: str | Sequence[str] = _globals.DEFAULT_HASH,
+             format_: str = 'jsonl',
+             jobs: int | None = None,
+             cache: bool = False,
              bind=_globals.ENGINE):
-    """Return checksum over source."""
-    log.info('hash languoids json lines from %r ordered by %r with %r',
-             source, order_by, hash_name)
-    hashobj = hashlib.new(hash_name)
-    assert hasattr(hashobj, 'hexdigest')
-    hashobj, total_lines = write_json_lines(hashobj,
-                                            source=source,
-                                            limit=limit,
-                                            offset=offset,
-                                            order_by=order_by,
-                                            sort_keys=True, bind=bind)
-    log.info('%s json lines written', f'{total_lines:_d}')
+    """Return checksum over source.
+
+    With ``format_=ROWS_FORMAT`` hash the binary row encoding of
+    (path, languoid JSON) rows instead of JSON lines.
+    With a sequence of hash names return a list with one checksum per name.
+
+    With ``cache=True`` reuse/store the result for ``'tables'`` and ``'raw'`` in the
+    ``__checksum__`` table (keyed by the arguments and the ``__dataset__`` row,
+    not stored for read-only databases).
+    """
+    hash_names = [hash_name] if isinstance(hash_name, str) else list(hash_name)
+
+    cache_keys = [{'source': source if format_ == 'jsonl' else f'{source}_{format_}',
+                   'order_by': f'{order_by}', 'limit': limit, 'offset': offset,
+                   'hash_name': name} for name in hash_names]
+    if cache and source != 'files':
+        results = [_backend_models.Checksum.get_checksum(bind=bind, **key)
+                   for key in cache_keys]
+        if None not in results:
+            log.info('cached checksum: %r', results)
+            return results[0] if isinstance(hash_name, str) else results
+    else:
+        cache = False
+
+    log.info('hash languoids %s from %r ordered by %r with %r',
+             format_, source, order_by, hash_names)
+    hashobjs = [hashlib.new(name) for name in hash_names]
+    assert all(hasattr(h, 'hexdigest') for h in hashobjs)
+    if format_ == 'jsonl':
+        hashobj = hashobjs[0] if len(hashobjs) == 1 else _backend_export.MultiHash(hashobjs)
+        _, total_lines = write_json_lines(hashobj,
+                                          source=source,
+                                          limit=limit,
+                                          offset=offset,
+                                          order_by=order_by,
+                                          sort_keys=True,
+                                          jobs=jobs, bind=bind)
+        log.info('%s json lines written', f'{total_lines:_d}')
+    elif format_ == _backend_export.ROWS_FORMAT:
+        rows = iterlanguoid_json_rows(source, limit=limit, offset=offset,
+                                      order_by=order_by, bind=bind)
+        for data in _backend_export.iterencode_rows(rows):
+            for h in hashobjs:
+                h.update(data)
+    else:  # pragma: no cover
+        raise ValueError(f'unknown format_: {format_!r}')
 
     offset = f'{offset=!r}' if offset else ''
     limit = f'{limit=!r}' if limit is not None else ''
     sliced = ','.join(s for s in (offset, limit) if s)
     sliced = f'[{sliced}]' if sliced else ''
-    result = (f'{CHECKSUM_NAME}:{order_by}{sliced}'
-              f':{hashobj.name}:{hashobj.hexdigest()}')
-    log.info('%s: %r', hashobj.name, result)
-    return result
+    prefix = f'{CHECKSUM_NAME}:{order_by}{sliced}'
+    if format_ != 'jsonl':
+        prefix += f':{format_}'
+
+    results = []
+    for hashobj, key in zip(hashobjs, cache_keys):
+        result = f'{prefix}:{hashobj.name}:{hashobj.hexdigest()}'
+        log.info('%s: %r', hashobj.name, result)
+        if cache:
+            _backend_models.Checksum.set_checksum(result, bind=bind, **key)
+        results.append(result)
+    return results[0] if isinstance(hash_name, str) else results
+
+
+def iterlanguoid_json_rows(source: str = 'tables', /, *,
+                           limit: int | None = None,
+                           offset: int | None = 0,
+                           order_by: str = _globals.LANGUOID_ORDER,
+                           bind=_globals.ENGINE) -> Iterator[tuple[str, str]]:
+    """Yield (<path string>, <key-sorted compact languoid JSON>) pairs from source."""
+    if source in ('files', 'raw'):
+        items = list(iterlanguoids(source, limit=limit, offset=offset,
+                                   order_by=order_by, bind=bind))
+        lines = _tools.pipe_json((languoid for _, languoid in items), dump=True,
+                                 sort_keys=True, compact=True)
+        yield from ((_globals.FILE_PATH_SEP.join(path), line)
+                    for (path, _), line in zip(items, lines))
+    elif source == 'tables':
+        with _backend.connect(bind=bind) as conn:
+            if _queries.has_languoid_json(complete=True, bind=conn):
+                query = _queries.get_languoid_json_query(as_rows=True, load_json=False,
+                                                         limit=limit, offset=offset,
+                                                         order_by=order_by)
+            else:
+                query = _queries.get_json_query(as_rows=True, load_json=False,
+                                                sort_keys=True,
+                                                limit=limit, offset=offset,
+                                                order_by=order_by)
+            result = conn.execute(query)
+            fetchmany = functools.partial(result.cursor.fetchmany, 1_000)
+            yield from itertools.chain.from_iterable(iter(fetchmany, []))
+    else:  # pragma: no cover
+        raise ValueError(f'unknown source: {source!r}')
 
 
 def write_json_lines(file=None, /, *, suffix: str = '.jsonl',
@@ -141,9 +230,14 @@ def write_json_lines(file=None, /, *, suffix: str = '.jsonl',
                      ensure_ascii: bool = False,
                      path_label: str = _globals.PATH_LABEL,
                      languoid_label: str = _globals.LANGUOID_LABEL,
+                     jobs: int | None = None,
+                     chunksize: int = JSON_LINES_CHUNKSIZE,
                      bind=_globals.ENGINE):
     r"""Write languoids as newline delimited JSON.
 
+    With ``jobs`` evaluate ``'tables'`` JSON for chunks of ``chunksize`` languoids
+    in worker processes over read-only connections, writing them in order.
+
     $ python -c "import sys, treedb; treedb.load('treedb.sqlite3'); treedb.write_json_lines(sys.stdout)" \
     | jq -s "group_by(.languoid.level)[]| {level: .[0].languoid.level, n: length}"
 
@@ -166,20 +260,18 @@ def write_json_lines(file=None, /, *, suffix: str = '.jsonl',
     if source in ('files', 'raw'):
         items = iterlanguoids(source,
                               limit=limit, offset=offset,
-                              order_by=order_by, bind=bind)
+                              order_by=order_by, jobs=jobs, bind=bind)
         items = ({path_label: path, languoid_label: languoid}
                  for path, languoid in items)
         return _tools.pipe_json_lines(file, items, **pipe_kwargs)
     elif source == 'tables':
         sqlite_format = not pretty and not ensure_ascii
-        query = _queries.get_json_query(limit=limit,
-                                        offset=offset,
-                                        as_rows=False,
-                                        load_json=not sqlite_format,
-                                        order_by=order_by,
-                                        sort_keys=sort_keys,
-                                        path_label=path_label,
-                                        languoid_label=languoid_label)
+        query_kwargs = {'as_rows': False,
+                        'load_json': not sqlite_format,
+                        'order_by': order_by,
+                        'sort_keys': sort_keys,
+                        'path_label': path_label,
+                        'languoid_label': languoid_label}
         if sqlite_format:  # fast path
             log.debug('use raw SQLite JSON format string')
             pipe_func = _tools.pipe_lines
@@ -189,14 +281,61 @@ def write_json_lines(file=None, /, *, suffix: str = '.jsonl',
             log.info('roundtrip SQLite JSON for reformatting')
             pipe_func = _tools.pipe_json_lines
 
+        if jobs is not None and jobs > 1:
+            database = _backend.get_database(bind)
+            if not database:
+                log.warning('ignore jobs=%r for %r', jobs, bind)
+                jobs = None
+
         with _backend.connect(bind=bind) as conn:
-            lines = conn.execute(query).scalars()
+            if sort_keys and _queries.has_languoid_json(complete=True, bind=conn):
+                if jobs is not None and jobs > 1:
+                    log.info('ignore jobs=%r for materialized languoidjson', jobs)
+                log.debug('read materialized languoidjson')
+                query = _queries.get_languoid_json_query(limit=limit, offset=offset,
+                                                         order_by=order_by,
+                                                         load_json=not sqlite_format,
+                                                         path_label=path_label,
+                                                         languoid_label=languoid_label)
+                lines = conn.execute(query).scalars()
+            elif jobs is not None and jobs > 1:
+                select_ids = (sa.select(Languoid.id)
+                              .join_from(Languoid, LanguoidPath,
+                                         LanguoidPath.languoid_id == Languoid.id))
+                select_ids = _queries.add_order_by(select_ids,
+                                                   order_by=order_by,
+                                                   column_for_path_order=LanguoidPath.path)
+                if offset:
+                    select_ids = select_ids.offset(offset)
+                if limit is not None:
+                    select_ids = select_ids.limit(limit)
+                ids = conn.execute(select_ids).scalars()
+
+                fetch_chunk = functools.partial(_fetch_json_lines,
+                                                database=database,
+                                                query_kwargs=query_kwargs)
+                log.info('fetch chunks of %d with %d jobs from %r',
+                         chunksize, jobs, database)
+                chunks = _tools.pool_map(fetch_chunk,
+                                         _tools.iterslices(ids, size=chunksize),
+                                         jobs=jobs)
+                lines = itertools.chain.from_iterable(chunks)
+            else:
+                query = _queries.get_json_query(limit=limit, offset=offset,
+                                                **query_kwargs)
+                lines = conn.execute(query).scalars()
             result = pipe_func(file, lines, **pipe_kwargs)
         return result
     else:  # pragma: no cover
         raise ValueError(f'unknown source: {source!r}')
 
 
+def _fetch_json_lines(languoid_ids, /, *, database: str, query_kwargs) -> list:
+    query = _queries.get_json_query(languoid_ids=languoid_ids, **query_kwargs)
+    with _backend.readonly_engine(database).connect() as conn:
+        return conn.execute(query).scalars().all()
+
+
 def pd_read_languoids(*, source: str = 'tables',
                       limit: int | None = None,
                       offset: int | None = 0,
@@ -204,8 +343,13 @@ def pd_read_languoids(*, source: str = 'tables',
                       sort_keys: bool = True,
                       path_label: str = _globals.PATH_LABEL,
                       languoid_label: str = _globals.LANGUOID_LABEL,
+                      chunksize: int | None = None,
                       bind=_globals.ENGINE,
                       **kwargs):
+    """Return a DataFrame of path and languoid dicts indexed by id.
+
+    With ``chunksize`` return an iterator of DataFrames of ``chunksize`` rows.
+    """
     log.info('read json lines with pd.read_json(lines=True)')
     if source in ('files', 'raw'):
         items = iterlanguoids(source,
@@ -218,6 +362,7 @@ def pd_read_languoids(*, source: str = 'tables',
         json_lines = _tools.pipe_json(items, dump=True)
         df = _backend_pandas._pd_read_json_lines(json_lines,
                                                  orient='record',
+                                                 chunksize=chunksize,
                                                  **kwargs)
     elif source == 'tables':
         query = _queries.get_json_query(limit=limit,
@@ -231,15 +376,52 @@ def pd_read_languoids(*, source: str = 'tables',
 
         df = _backend_pandas.pd_read_json_lines(query,
                                                 orient='record',
+                                                chunksize=chunksize,
                                                 bind=bind,
                                                 **kwargs)
     if df is not None:
-        df.rename(columns={_globals.PATH_LABEL: 'path'}, inplace=True)
-        index = df['languoid'].map(operator.itemgetter('id')).rename('id')
-        df.set_index(index, inplace=True, verify_integrity=True)
+        if chunksize is not None:
+            return map(_set_languoid_index, df)
+        _set_languoid_index(df)
     return df
 
 
+def _set_languoid_index(df, /):
+    df.rename(columns={_globals.PATH_LABEL: 'path'}, inplace=True)
+    index = df['languoid'].map(operator.itemgetter('id')).rename('id')
+    df.set_index(index, inplace=True, verify_integrity=True)
+    return df
+
+
+def pd_read_tables(names: Iterable[str] | None = None, /, *,
+                   bind=_globals.ENGINE,
+                   **kwargs):
+    """Return {<name>: <DataFrame>} with one typed, normalized frame per table.
+
+    Read each frame with one query from ``queries.get_tables_queries()``
+    (no JSON round trip), indexed by ``id`` (languoids) or ``languoid_id``.
+    """
+    queries = _queries.get_tables_queries()
+    if names is not None:
+        queries = {n: queries[n] for n in names}
+
+    result = {}
+    with _backend.connect(bind=bind) as conn:
+        for name, query in queries.items():
+            log.debug('read %r with pd.read_sql_query()', name)
+            columns = list(query.selected_columns)
+            parse_dates = [c.name for c in columns
+                           if isinstance(c.type, (sa.DateTime, sa.Date))]
+            df = _backend_pandas.pd_read_sql(query, con=conn,
+                                             index_col=columns[0].name,
+                                             parse_dates=parse_dates or None,
+                                             **kwargs)
+            if df is None:
+                return None
+            result[name] = df
+    return result
+
+
 def fetch_languoids(*, limit: int | None = None,
                     offset: int | None = 0,
                     order_by: str = _globals.LANGUOID_ORDER,
@@ -280,6 +462,9 @@ def write_files(root=_globals.ROOT, /, *, replace: bool = False,
                 limit: int | None = None,
                 offset: int | None = 0,
                 progress_after: int = _tools.PROGRESS_AFTER,
+                jobs: int | None = None,
+                fresh: bool = False,
+                skip_unchanged: bool = False,
                 bind=_globals.ENGINE) -> int:
     log.info('write from %r to tree %r', source, root)
     if source == 'raw_lines':
@@ -291,15 +476,22 @@ def write_files(root=_globals.ROOT, /, *, replace: bool = False,
                                limit=limit,
                                offset=offset,
                                progress_after=progress_after,
+                               jobs=jobs, fresh=fresh,
+                               skip_unchanged=skip_unchanged,
                                bind=bind)
 
+    from . import raw
     from .languoids import files
 
+    file_checksums = (raw.fetch_file_checksums(bind=bind)
+                      if skip_unchanged else None)
+
     languoids = iterlanguoids(source,
                               limit=limit,
                               offset=offset,
                               order_by='path',
                               progress_after=progress_after,
+                              jobs=jobs,
                               bind=bind)
 
     records = _records.pipe(languoids, dump=True, convert_lines=False)
@@ -307,4 +499,6 @@ def write_files(root=_globals.ROOT, /, *, replace: bool = False,
     return files.write_files(records, root=root, replace=replace,
                              dry_run=dry_run,
                              require_nwritten=require_nwritten,
-                             progress_after=progress_after)
+                             progress_after=progress_after,
+                             jobs=jobs, fresh=fresh,
+                             file_checksums=file_checksums)
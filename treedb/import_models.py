@@ -1,15 +1,22 @@
 """Load Glottolog languoid model tables."""
 
+from collections.abc import Iterable
 import functools
 import logging
 import warnings
 
 import sqlalchemy as sa
 
-from .backend.models import Config
+from . import _globals
+from . import checksums as _checksums
+from . import queries as _queries
+from . import search as _search
+from . import spatial as _spatial
+from .backend.models import Checksum, Config
 from .models import (LEVEL, SPECIAL_FAMILIES, BOOKKEEPING,
                      CLASSIFICATION,
-                     Languoid, LanguoidLevel, PseudoFamily,
+                     Languoid, LanguoidPath, LanguoidJson, languoid_closure,
+                     LanguoidLevel, PseudoFamily,
                      languoid_macroarea, Macroarea,
                      languoid_country, Country,
                      Link, Timespan,
@@ -22,7 +29,8 @@ from .models import (LEVEL, SPECIAL_FAMILIES, BOOKKEEPING,
                      EthnologueComment,
                      IsoRetirement, IsoRetirementChangeTo)
 
-__all__ = ['main']
+__all__ = ['main',
+           'update_languoids']
 
 
 log = logging.getLogger(__name__)
@@ -62,7 +70,8 @@ class ModelMap(dict):
         return pk
 
 
-def main(languoids, /, *, conn):
+def main(languoids, /, *, conn, materialize_json: bool = False,
+         index_names: bool = False, index_coordinates: bool = False):
 
     bibfile_ids = ModelMap(conn=conn, model=Bibfile)
 
@@ -112,6 +121,43 @@ def main(languoids, /, *, conn):
 
     insert_pseudofamilies(conn)
 
+    insert_languoid_tree(conn)
+
+    if materialize_json:
+        insert_languoid_json(conn)
+
+    if index_names:
+        _search.create_name_index(conn=conn)
+
+    if index_coordinates:
+        _spatial.create_coordinate_index(conn=conn)
+
+    _checksums.write_languoid_hashes(conn=conn)
+
+
+def update_languoids(languoid_ids: Iterable[str], /, *, conn) -> str:
+    """Refresh the tables derived from changed languoids, return tree_checksum().
+
+    Pass the ids of added, changed, moved, and removed languoids
+    plus the former parent_id of moved and removed ones.
+    Update the languoidpath, languoid_closure, and languoidjson rows,
+    the name and coordinate indexes (if any), and the languoid hashes,
+    and clear the __checksum__ cache.
+    """
+    languoid_ids = set(languoid_ids)
+
+    Checksum.clear(conn=conn)
+
+    moved = update_languoid_tree(conn=conn)
+
+    update_languoid_json(languoid_ids | moved, conn=conn)
+
+    _search.update_name_index(languoid_ids, conn=conn)
+
+    _spatial.update_coordinate_index(languoid_ids, conn=conn)
+
+    return _checksums.update_languoid_hashes(languoid_ids, conn=conn)
+
 
 def insert_languoid_levels(conn, /, *, config_file='languoid_levels.ini'):
     log.info('insert languoid levels from: %r', config_file)
@@ -132,6 +178,101 @@ def insert_languoid_levels(conn, /, *, config_file='languoid_levels.ini'):
     conn.execute(sa.insert(LanguoidLevel), params)
 
 
+def iterlanguoid_paths(conn, /):
+    select_languoids = sa.select(Languoid.id, Languoid.parent_id, Languoid.level)
+    return LanguoidPath.iterparams(conn.execute(select_languoids))
+
+
+def iterclosure_params(path_params, /, *,
+                       delimiter: str = _globals.FILE_PATH_SEP):
+    """Yield languoid_closure params (including steps=0) from LanguoidPath params.
+
+    >>> list(iterclosure_params([{'languoid_id': 'abcd1235', 'path': 'abcd1234/abcd1235'}]))
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [{'ancestor_id': 'abcd1235', 'descendant_id': 'abcd1235', 'steps': 0},
+     {'ancestor_id': 'abcd1234', 'descendant_id': 'abcd1235', 'steps': 1}]
+    """
+    for params in path_params:
+        ancestor_ids = reversed(params['path'].split(delimiter))
+        for steps, ancestor_id in enumerate(ancestor_ids):
+            yield {'ancestor_id': ancestor_id,
+                   'descendant_id': params['languoid_id'],
+                   'steps': steps}
+
+
+def insert_languoid_tree(conn, /, *, path_params=None, closure_ids=None):
+    if path_params is None:
+        path_params = list(iterlanguoid_paths(conn))
+    log.info('insert %d languoid paths', len(path_params))
+    if path_params:
+        conn.execute(sa.insert(LanguoidPath), path_params)
+
+    if closure_ids is not None:
+        path_params = [p for p in path_params if p['languoid_id'] in closure_ids]
+    closure_params = list(iterclosure_params(path_params))
+    log.info('insert %d languoid closure rows', len(closure_params))
+    if closure_params:
+        conn.execute(sa.insert(languoid_closure), closure_params)
+
+
+def update_languoid_tree(*, conn) -> set[str]:
+    """Recompute languoidpath and languoid_closure, return the ids of moved languoids.
+
+    Moved languoids are added, removed, or have a changed path.
+    """
+    path_params = {p['languoid_id']: p for p in iterlanguoid_paths(conn)}
+    present = {p['languoid_id']: dict(p)
+               for p in conn.execute(sa.select(LanguoidPath)).mappings()}
+
+    def get_path(params):
+        return params['path'] if params is not None else None
+
+    changed, moved = set(), set()
+    for id_ in path_params.keys() | present.keys():
+        new, old = path_params.get(id_), present.get(id_)
+        if new != old:
+            changed.add(id_)
+            if get_path(new) != get_path(old):
+                moved.add(id_)
+    log.info('update tree of %d changed (%d moved) languoids', len(changed), len(moved))
+
+    if changed:
+        conn.execute(sa.delete(languoid_closure)
+                     .where(languoid_closure.c.descendant_id.in_(moved)))
+        conn.execute(sa.delete(LanguoidPath)
+                     .where(LanguoidPath.languoid_id.in_(changed)))
+        insert_languoid_tree(conn, path_params=[path_params[id_]
+                                                for id_ in sorted(changed)
+                                                if id_ in path_params],
+                             closure_ids=moved)
+    return moved
+
+
+def insert_languoid_json(conn, /, *, languoid_ids=None) -> int:
+    query = _queries.get_json_query(as_rows=True, load_json=False, sort_keys=True,
+                                    order_by=False, languoid_ids=languoid_ids)
+    languoid_json = query.selected_columns[_globals.LANGUOID_LABEL]
+    query = query.with_only_columns(Languoid.id, LanguoidPath.path, languoid_json)
+
+    insert_json = (sa.insert(LanguoidJson)
+                   .from_select(['languoid_id', 'path', 'json'], query))
+    rowcount = conn.execute(insert_json).rowcount
+    log.info('inserted %d languoid json documents', rowcount)
+    return rowcount
+
+
+def update_languoid_json(languoid_ids, /, *, conn) -> int:
+    """Recompute the materialized languoidjson rows of languoid_ids (if any)."""
+    if not _queries.has_languoid_json(bind=conn):
+        return 0
+
+    languoid_ids = set(languoid_ids)
+    log.info('update json documents of %d languoids', len(languoid_ids))
+    conn.execute(sa.delete(LanguoidJson)
+                 .where(LanguoidJson.languoid_id.in_(languoid_ids)))
+    return insert_languoid_json(conn, languoid_ids=languoid_ids)
+
+
 def insert_pseudofamilies(conn, /, *, config_file='language_types.ini'):
     log.info('insert pseudofamilies from: %r', config_file)
     languagetypes = Config.load(config_file, bind=conn)
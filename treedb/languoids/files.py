@@ -1,7 +1,8 @@
 """Load and write ``glottolog/languoids/tree/**/md.ini``."""
 
-from collections.abc import Iterable, Iterator
+from collections.abc import Iterable, Iterator, Mapping
 import functools
+import hashlib
 import logging
 import os
 from typing import NamedTuple
@@ -14,6 +15,7 @@ from . import fields as _fields
 
 __all__ = ['iterfiles',
            'roundtrip',
+           'dumps',
            'write_files']
 
 BASENAME = _globals.LANGUOID_FILE_BASENAME
@@ -136,6 +138,14 @@ class FileInfo(NamedTuple):
         return cls(path.parts[path_slice], dentry, config)
 
 
+class FileChecksum(NamedTuple):
+    """Size and sha256 hexdigest of a file as loaded."""
+
+    size: int
+
+    sha256: str
+
+
 def iterfiles(root=_globals.ROOT, /, *,
               progress_after: int = _tools.PROGRESS_AFTER
               ) -> Iterator[FileInfo]:
@@ -162,7 +172,45 @@ def roundtrip(root=_globals.ROOT, /, *,
     """Load/save all config files (drops leading/trailing whitespace)."""
     log.info(f'start roundtripping {BASENAME} files in %r', root)
     for path_tuple, dentry, cfg in iterfiles(root, progress_after=progress_after):
-        cfg.to_file(dentry.path)
+        sections = ((s, cfg.items(s)) for s in cfg.sections())
+        with open(dentry.path, 'wb') as f:
+            f.write(_encode(sections))
+
+
+def dumps(raw_record: _fields.RawRecordType, /, *,
+          encoding: str = _tools.ENCODING) -> bytes:
+    """Return the canonical file content for raw_record (without ConfigParser).
+
+    Same as ``ConfigParser().update_config(raw_record)`` and ``.to_file()``.
+    """
+    return _encode(_itersections(raw_record), encoding=encoding)
+
+
+def _encode(sections, /, *, encoding: str = _tools.ENCODING,
+            header: str = ConfigParser._header,
+            newline: str = ConfigParser._newline) -> bytes:
+    lines = _tools.iterconfiglines(sections)
+    text = header.format(encoding=encoding) + ''.join(lines)
+    return text.replace('\n', newline).encode(encoding)
+
+
+def _itersections(raw_record: _fields.RawRecordType, /, *,
+                  is_lines=_fields.is_lines,
+                  core_sections=_fields.CORE_SECTIONS,
+                  omit_empty_core_options=_fields.OMIT_EMPTY_CORE_OPTIONS,
+                  sorted_sections=_fields.sorted_sections,
+                  sorted_options=_fields.sorted_options):
+    for section in sorted_sections(raw_record):
+        s = raw_record[section]
+        if section in core_sections:
+            s = {o: v for o, v in s.items()
+                 if v or o not in omit_empty_core_options}
+        if not s:
+            continue
+
+        options = [(o, s[o]) for o in sorted_options(section, s)]
+        yield section, [(o, v) for o, v in options
+                        if not (v is None or (not v and is_lines(section, o)))]
 
 
 def write_files(records: Iterable[_globals.RecordItem], /,
@@ -170,8 +218,21 @@ def write_files(records: Iterable[_globals.RecordItem], /,
                 dry_run: bool = False, quiet: bool | None = None,
                 require_nwritten: int | None = None,
                 progress_after: int | None = _tools.PROGRESS_AFTER,
-                basename: str = BASENAME) -> int:
-    """Write ((<path_part>, ...), <dict of dicts>) pairs to root."""
+                basename: str = BASENAME,
+                jobs: int | None = None,
+                chunksize: int = 100,
+                fresh: bool = False,
+                file_checksums: Mapping[_globals.PathType,
+                                        FileChecksum] | None = None) -> int:
+    """Write ((<path_part>, ...), <dict of dicts>) pairs to root.
+
+    Use ``jobs`` worker processes to load, diff, and write the files.
+    With ``fresh=True`` the (empty or missing) root is populated
+    without reading any present files.
+
+    Skip files whose content on disk matches their ``file_checksums`` entry
+    and the serialized record (without parsing the file).
+    """
     if replace:  # pragma: no cover
         if dry_run:
             warnings.warn('replace=True ignored by dry_run=True')
@@ -184,21 +245,39 @@ def write_files(records: Iterable[_globals.RecordItem], /,
     root = _tools.path_from_filename(root)
     log.info(f'start writing {basename} files into %r', root)
 
-    load_config = ConfigParser.from_file
+    if fresh:
+        if root.exists() and any(root.iterdir()):
+            raise ValueError(f'fresh=True requires empty or missing root: {root!r}')
+        log.info('fresh target: skip reading present files')
+        file_checksums = None
+    elif file_checksums is not None:
+        log.info('skip unchanged files from %d file checksums', len(file_checksums))
+
+    def iterpaths(records):
+        for path_tuple, raw_record in map(_fields.join_lines_inplace, records):
+            path = root.joinpath(*path_tuple + (basename,))
+            if fresh and not dry_run:
+                # depth-first path order: create directories in the main process
+                path.parent.mkdir(parents=True, exist_ok=True)
+            checksum = (file_checksums.get(path_tuple)
+                        if file_checksums is not None else None)
+            yield path, raw_record, checksum
+
+    write_file = functools.partial(_write_file,
+                                   replace=replace, dry_run=dry_run,
+                                   quiet=quiet, fresh=fresh)
+
+    if jobs is not None and jobs > 1:
+        log.info('use %d worker processes', jobs)
+
+    results = _tools.pool_map(write_file, iterpaths(records),
+                              jobs=jobs, chunksize=chunksize)
 
     files_written = 0
 
-    for path_tuple, raw_record in map(_fields.join_lines_inplace, records):
-        path = root.joinpath(*path_tuple + (basename,))
-        cfg = load_config(path)
-        changed = cfg.update_config(raw_record, replace=replace, quiet=quiet)
-
+    # results are in record order: counts are deterministic
+    for changed in results:
         if changed:
-            if not dry_run:
-                if not replace:
-                    log.info('write cfg.to_file(%r)', path)
-                cfg.to_file(path)
-
             files_written += 1
 
             if not dry_run and (files_written % progress_after):
@@ -211,3 +290,47 @@ def write_files(records: Iterable[_globals.RecordItem], /,
     if require_nwritten is not None and files_written < require_nwritten:
         raise ValueError(f'{files_written=} under {require_nwritten=}')
     return files_written
+
+
+def _write_file(path_record_checksum: tuple[os.PathLike, _fields.RawRecordType,
+                                            FileChecksum | None], /, *,
+                replace: bool, dry_run: bool, quiet: bool,
+                fresh: bool) -> bool:
+    path, raw_record, checksum = path_record_checksum
+    if checksum is not None and is_unchanged(path, raw_record, checksum=checksum):
+        return False
+
+    if fresh:
+        if not dry_run:
+            if not replace:
+                log.info('write dumps(raw_record) to %r', path)
+            with open(path, 'wb') as f:
+                f.write(dumps(raw_record))
+        return True
+
+    cfg = ConfigParser.from_file(path)
+    changed = cfg.update_config(raw_record, replace=replace, quiet=quiet)
+
+    if changed and not dry_run:
+        if not replace:
+            log.info('write cfg.to_file(%r)', path)
+        cfg.to_file(path)
+
+    return changed
+
+
+def is_unchanged(path, raw_record: _fields.RawRecordType, /, *,
+                 checksum: FileChecksum) -> bool:
+    """Return True if the file at path has checksum and raw_record serializes to it."""
+    try:
+        size = os.stat(path).st_size
+    except FileNotFoundError:
+        return False
+    if size != checksum.size:
+        return False
+
+    with open(path, 'rb') as f:
+        present = f.read()
+    if hashlib.sha256(present).hexdigest() != checksum.sha256:
+        return False
+    return dumps(raw_record) == present
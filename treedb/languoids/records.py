@@ -7,8 +7,6 @@ import operator
 import re
 import warnings
 
-import pycountry
-
 from .. import _globals
 
 from . import fields as _fields
@@ -573,6 +571,8 @@ def splitcountry(name, /, *, _match=_COUNTRY_PATTERN.fullmatch):
     groups = _match(name).groupdict()
     id_only = groups.pop('id_only')
     if id_only:
+        import pycountry
+
         country = pycountry.countries.get(alpha_2=id_only)
         return {'id': id_only, 'name': country.name}
     return groups
@@ -12,7 +12,8 @@ from . import _globals
 from ._globals import REGISTRY as registry  # noqa: N811
 from .backend import json_object, json_datetime
 
-__all__ = ['LEVEL', 'Languoid']
+__all__ = ['LEVEL', 'Languoid', 'LanguoidPath', 'LanguoidJson', 'languoid_closure',
+           'LanguoidHash']
 
 FAMILY, LANGUAGE, DIALECT = LEVEL = ('family', 'language', 'dialect')
 
@@ -52,6 +53,12 @@ EL_COMMENT_TYPE = {'Missing', 'Spurious'}
 ISORETIREMENT_REASON = {'split', 'merge', 'duplicate', 'non-existent', 'change'}
 
 
+def json_path_array(path, /, *, delimiter: str = _globals.FILE_PATH_SEP):
+    """Return the path string as JSON array (glottocodes need no escaping)."""
+    array = '["' + sa.func.replace(path, delimiter, '","') + '"]'
+    return sa.func.json(array)
+
+
 @registry.mapped
 class Languoid:
 
@@ -181,10 +188,24 @@ class Languoid:
               innerjoin=False,
               child_root=None, parent_root=None, node_level=None,
               with_steps: bool = False,
-              with_terminal: bool = False):
+              with_terminal: bool = False,
+              closure: bool = False):
         if innerjoin not in (False, True, 'reflexive'):  # pragma: no cover
             raise ValueError(f'invalid innerjoin: {innerjoin!r}')
 
+        if from_parent and with_terminal:
+            raise ValueError('with_terminal=True requires from_parent=False')
+
+        if closure and (parent_root if not from_parent else child_root) is not None:
+            # root filter on the relative of the non-recursive part
+            closure = False
+
+        if closure:
+            return cls._closure_tree(from_parent=from_parent, innerjoin=innerjoin,
+                                     child_root=child_root, parent_root=parent_root,
+                                     node_level=node_level,
+                                     with_steps=with_steps, with_terminal=with_terminal)
+
         Child, Parent = cls._aliased_child_parent(child_root=child_root,  # noqa: N806
                                                   parent_root=parent_root)
 
@@ -216,8 +237,6 @@ class Languoid:
             tree_1 = tree_1.add_columns(sa.literal(steps).label('steps'))
 
         if with_terminal:
-            if from_parent:  # pragma: no cover
-                raise NotImplementedError
             tree_1_terminal = Node if innerjoin == 'reflexive' else Relative
             terminal = sa.type_coerce(tree_1_terminal.parent_id == sa.null(),
                                       sa.Boolean)
@@ -253,8 +272,6 @@ class Languoid:
             GrandRelative = aliased(cls, name='grand' + ('child'  # noqa: N806
                                                          if from_parent else
                                                          'parent'))
-            if from_parent:  # pragma: no cover
-                raise NotImplementedError
             tree_2 = tree_2.add_columns((GrandRelative.parent_id == sa.null()).label('terminal'))
             tree_2_fromclause = tree_2_fromclause.outerjoin(GrandRelative,
                                                             Relative.parent_id
@@ -266,13 +283,67 @@ class Languoid:
 
         return tree
 
+    @classmethod
+    def _closure_tree(cls, /, *, from_parent: bool = False,
+                      innerjoin=False,
+                      child_root=None, parent_root=None, node_level=None,
+                      with_steps: bool = False,
+                      with_terminal: bool = False):
+        """Return the _tree() columns from the languoid_closure table (node root filter only)."""
+        Child, Parent = cls._aliased_child_parent(child_root=child_root,  # noqa: N806
+                                                  parent_root=parent_root)
+
+        closure = languoid_closure
+        if from_parent:
+            Node, Relative = Parent, Child  # noqa: N806
+            node_label, relative_label = 'parent_id', 'child_id'
+            node_root = parent_root
+            node_column, relative_column = closure.c.ancestor_id, closure.c.descendant_id
+        else:
+            Node, Relative = Child, Parent  # noqa: N806
+            node_label, relative_label = 'child_id', 'parent_id'
+            node_root = child_root
+            node_column, relative_column = closure.c.descendant_id, closure.c.ancestor_id
+
+        onclause = (node_column == Node.id)
+        if innerjoin != 'reflexive':
+            onclause = sa.and_(onclause, closure.c.steps > 0)
+
+        tree = (sa.select(Node.id.label(node_label),
+                          relative_column.label(relative_label))
+                .join_from(Node, closure, onclause, isouter=not innerjoin))
+
+        if with_steps:
+            steps = closure.c.steps
+            if not innerjoin:
+                steps = sa.func.coalesce(steps, 1)
+            tree = tree.add_columns(steps.label('steps'))
+
+        if with_terminal:
+            tree = tree.outerjoin(Relative, Relative.id == relative_column)
+            terminal = sa.type_coerce(Relative.parent_id == sa.null(), sa.Boolean)
+            tree = tree.add_columns(terminal.label('terminal'))
+
+        if node_root is not None:
+            tree = tree.where(Node.parent_id == sa.null() if node_root else
+                              Node.parent_id != sa.null())
+
+        if node_level is not None:
+            if node_level not in LEVEL:  # pragma: no cover
+                raise ValueError(f'invalid node_level: {node_level!r}')
+            tree = tree.where(Node.level == node_level)
+
+        return tree.subquery('tree')
+
     @classmethod
     def tree(cls, /, *, include_self: bool = False,
              with_steps: bool = False,
-             with_terminal: bool = False):
+             with_terminal: bool = False,
+             closure: bool = False):
         return cls._tree(from_parent=False,
                          innerjoin='reflexive' if include_self else True,
-                         with_steps=with_steps, with_terminal=with_terminal)
+                         with_steps=with_steps, with_terminal=with_terminal,
+                         closure=closure)
 
     @classmethod
     def _path_part(cls, /, *, label: str = 'path_part',
@@ -309,11 +380,13 @@ class Languoid:
                       innerjoin=False,
                       child_root=None, parent_root=None, node_level=None,
                       with_steps: bool = False,
-                      with_terminal: bool = False):
+                      with_terminal: bool = False,
+                      closure: bool = False):
         tree = cls._tree(from_parent=from_parent, innerjoin=innerjoin,
                          child_root=child_root, parent_root=parent_root,
                          node_level=node_level,
-                         with_steps=with_steps, with_terminal=with_terminal)
+                         with_steps=with_steps, with_terminal=with_terminal,
+                         closure=closure)
 
         Child, Parent = cls._aliased_child_parent(child_root=child_root,  # noqa: N806
                                                   parent_root=parent_root)
@@ -338,19 +411,23 @@ class Languoid:
 
     @classmethod
     def child_ancestor(cls, /, *, innerjoin=False,
-                       child_level=None):
+                       child_level=None,
+                       closure: bool = False):
         Child, Parent, _, child_parent = cls.node_relative(from_parent=False,  # noqa: N806
                                                            innerjoin=innerjoin,
-                                                           node_level=child_level)
+                                                           node_level=child_level,
+                                                           closure=closure)
         return Child, Parent, _, child_parent
 
     @classmethod
     def parent_descendant(cls, /, *, innerjoin=False,
-                          parent_root=None, parent_level=None):
+                          parent_root=None, parent_level=None,
+                          closure: bool = False):
         Parent, Child, _, parent_child = cls.node_relative(from_parent=True,  # noqa: N806
                                                            innerjoin=innerjoin,
                                                            parent_root=parent_root,
-                                                           node_level=parent_level)
+                                                           node_level=parent_level,
+                                                           closure=closure)
         return Parent, Child, parent_child
 
     @classmethod
@@ -385,6 +462,141 @@ class Languoid:
         return path, family, language
 
 
+@registry.mapped
+class LanguoidPath:
+    """Materialized path, depth, root/family/language ancestor, and nested-set interval."""
+
+    __tablename__ = 'languoidpath'
+
+    languoid_id = Column(ForeignKey('languoid.id'), primary_key=True)
+
+    path = Column(Text, CheckConstraint("path != ''"), nullable=False, unique=True)
+
+    depth = Column(Integer, CheckConstraint('depth >= 0'), nullable=False)
+
+    root_id = Column(ForeignKey('languoid.id', deferrable=True, initially='DEFERRED'),
+                     nullable=False, index=True)
+
+    family_id = Column(ForeignKey('languoid.id', deferrable=True, initially='DEFERRED'),
+                       index=True)
+
+    language_id = Column(ForeignKey('languoid.id', deferrable=True, initially='DEFERRED'),
+                         index=True)
+
+    lft = Column(Integer, CheckConstraint('lft >= 1'), nullable=False)
+
+    rgt = Column(Integer, nullable=False)
+
+    __table_args__ = (CheckConstraint('(depth = 0) = (root_id = languoid_id)'),
+                      CheckConstraint('(depth = 0) = (family_id IS NULL)'),
+                      CheckConstraint('rgt >= lft'),
+                      # covering (includes the languoid_id primary key)
+                      Index('languoidpath_lft_rgt', 'lft', 'rgt'),
+                      {'info': {'without_rowid': True}})
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}'
+                f' languoid_id={self.languoid_id!r}'
+                f' path={self.path!r}>')
+
+    @classmethod
+    def path_array(cls, /, *, delimiter: str = _globals.FILE_PATH_SEP):
+        return json_path_array(cls.path, delimiter=delimiter)
+
+    @classmethod
+    def in_subtree(cls, ancestor, /, *, include_self: bool = False):
+        """Return whereclause for cls rows in the subtree of ancestor (lft/rgt range)."""
+        lower = (cls.lft >= ancestor.lft) if include_self else (cls.lft > ancestor.lft)
+        return sa.and_(lower, cls.lft <= ancestor.rgt)
+
+    @staticmethod
+    def iterparams(languoids, /, *, delimiter: str = _globals.FILE_PATH_SEP):
+        """Yield params from (<id>, <parent_id>, <level>) triples (depth-first by id).
+
+        >>> list(LanguoidPath.iterparams([('abcd1235', 'abcd1234', 'language'),
+        ...                               ('abcd1234', None, 'family')]))  # doctest: +NORMALIZE_WHITESPACE
+        [{'languoid_id': 'abcd1234', 'path': 'abcd1234', 'depth': 0,
+          'root_id': 'abcd1234', 'family_id': None, 'language_id': None,
+          'lft': 1, 'rgt': 2},
+         {'languoid_id': 'abcd1235', 'path': 'abcd1234/abcd1235', 'depth': 1,
+          'root_id': 'abcd1234', 'family_id': 'abcd1234', 'language_id': None,
+          'lft': 2, 'rgt': 2}]
+        """
+        children, levels = {}, {}
+        for id_, parent_id, level in languoids:
+            children.setdefault(parent_id, []).append(id_)
+            levels[id_] = level
+
+        # pre-order (same as walk_scandir()): lft is the position,
+        # rgt the position of the last descendant
+        preorder = []
+        stack = [(id_, None) for id_ in sorted(children.get(None, ()), reverse=True)]
+        while stack:
+            id_, parent = stack.pop()
+            if parent is None:
+                params = {'languoid_id': id_, 'path': id_, 'depth': 0,
+                          'root_id': id_, 'family_id': None, 'language_id': None}
+            else:
+                if levels[id_] != DIALECT:
+                    language_id = None
+                elif levels[parent['languoid_id']] == LANGUAGE:
+                    language_id = parent['languoid_id']
+                else:
+                    language_id = parent['language_id']
+                params = {'languoid_id': id_,
+                          'path': f"{parent['path']}{delimiter}{id_}",
+                          'depth': parent['depth'] + 1,
+                          'root_id': parent['root_id'],
+                          'family_id': parent['root_id'],
+                          'language_id': language_id}
+            params['lft'] = params['rgt'] = len(preorder) + 1
+            preorder.append((params, parent))
+            stack.extend((c, params) for c in sorted(children.get(id_, ()), reverse=True))
+
+        for params, parent in reversed(preorder):
+            if parent is not None:
+                parent['rgt'] = max(parent['rgt'], params['rgt'])
+
+        for params, _ in preorder:
+            yield params
+
+
+@registry.mapped
+class LanguoidJson:
+    """Materialized languoid JSON document (``sort_keys=True``), optional."""
+
+    __tablename__ = 'languoidjson'
+
+    languoid_id = Column(ForeignKey('languoid.id'), primary_key=True)
+
+    path = Column(Text, CheckConstraint("path != ''"), nullable=False, unique=True)
+
+    json = Column(Text, CheckConstraint('json_valid(json)'), nullable=False)
+
+    __table_args__ = {'info': {'without_rowid': True}}
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}'
+                f' languoid_id={self.languoid_id!r}'
+                f' path={self.path!r}>')
+
+
+languoid_closure = Table('languoid_closure', registry.metadata,
+                         Column('ancestor_id',
+                                ForeignKey('languoid.id',
+                                           deferrable=True, initially='DEFERRED'),
+                                primary_key=True),
+                         Column('descendant_id',
+                                ForeignKey('languoid.id',
+                                           deferrable=True, initially='DEFERRED'),
+                                primary_key=True),
+                         Column('steps', Integer, CheckConstraint('steps >= 0'),
+                                nullable=False),
+                         CheckConstraint('(steps = 0) = (ancestor_id = descendant_id)'),
+                         UniqueConstraint('descendant_id', 'steps'),
+                         info={'without_rowid': True})
+
+
 @registry.mapped
 class LanguoidLevel:
 
@@ -1193,3 +1405,24 @@ class IsoRetirementChangeTo:
     iso_retirement = relationship('IsoRetirement',
                                   innerjoin=True,
                                   back_populates='change_to')
+
+
+@registry.mapped
+class LanguoidHash:
+    """Merkle tree hashes of languoid JSON content and of each subtree."""
+
+    __tablename__ = 'languoidhash'
+
+    languoid_id = Column(ForeignKey('languoid.id'), primary_key=True)
+
+    hash = Column(String(64), CheckConstraint('length(hash) = 64'), nullable=False)
+
+    subtree_hash = Column(String(64), CheckConstraint('length(subtree_hash) = 64'),
+                          nullable=False)
+
+    __table_args__ = {'info': {'without_rowid': True}}
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}'
+                f' languoid_id={self.languoid_id!r}'
+                f' subtree_hash={self.subtree_hash!r}>')
@@ -1,6 +1,6 @@
 """Batteries-included ``sqlalchemy`` queries for SQLite3 database."""
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 import functools
 import logging
 
@@ -15,7 +15,7 @@ from .backend import views as _views
 from .models import (LEVEL, FAMILY, LANGUAGE, DIALECT,
                      SPECIAL_FAMILIES, BOOKKEEPING,
                      ALTNAME_PROVIDER, IDENTIFIER_SITE,
-                     Languoid,
+                     Languoid, LanguoidPath, LanguoidJson, json_path_array,
                      languoid_macroarea,
                      languoid_country, Country,
                      Link, Source, SourceProvider, Timespan, Bibfile, Bibitem,
@@ -29,14 +29,31 @@ from .models import (LEVEL, FAMILY, LANGUAGE, DIALECT,
 __all__ = ['get_stats_query',
            'get_example_query',
            'get_json_query',
-           'iterdescendants']
+           'iterdescendants',
+           'select_subtree',
+           'get_subtree_counts_query',
+           'is_descendant']
+
+
+QUERY_CACHE_SIZE = 64
 
 
 log = logging.getLogger(__name__)
 
 
-@_views.register_view('stats')
-def get_stats_query():
+def cache_query(func, /):
+    """Memoize the (keyword-only, hashable arguments) query builder.
+
+    Cached selectables keep their memoized cache key, so executing them
+    (with ``limit`` and ``offset`` added as bound parameters) reuses
+    the compiled SQL string from the ``sqlalchemy`` compiled cache of the engine.
+    """
+    return functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(func)
+
+
+@_views.register_view('stats', closure=True)
+@cache_query
+def get_stats_query(*, closure: bool = False):
     # cf. https://glottolog.org/glottolog/glottologinformation
 
     def languoid_count(kind, cls=Languoid, fromclause=Languoid,
@@ -56,7 +73,8 @@ def get_stats_query():
         return select_nrows
 
     Root, Child, root_child = Languoid.parent_descendant(innerjoin='reflexive',  # noqa: N806
-                                                         parent_root=True)
+                                                         parent_root=True,
+                                                         closure=closure)
 
     language_count = functools.partial(languoid_count,
                                        cls=Child, fromclause=root_child,
@@ -91,17 +109,18 @@ def get_stats_query():
 
 
 @_views.register_view('example')
+@cache_query
 def get_example_query(*, order_by: str = 'id') -> sa.sql.Select:
     """Return example sqlalchemy core query (one denormalized row per languoid)."""
-    path, family, language = Languoid.path_family_language()
+    path = LanguoidPath.path
 
     select_languoid = (select(Languoid.id,
                               Languoid.name,
                               Languoid.level,
                               Languoid.parent_id,
                               path.label('path'),
-                              family.label('family_id'),
-                              language.label('dialect_language_id'),
+                              LanguoidPath.family_id,
+                              LanguoidPath.language_id.label('dialect_language_id'),
                               Languoid.hid,
                               Languoid.iso639_3,
                               Languoid.latitude,
@@ -111,7 +130,8 @@ def get_example_query(*, order_by: str = 'id') -> sa.sql.Select:
                               select_languoid_links(as_json=False),
                               select_languoid_sources(provider_name='glottolog',
                                                       as_json=False))
-                       .select_from(Languoid))
+                       .join_from(Languoid, LanguoidPath,
+                                  LanguoidPath.languoid_id == Languoid.id))
 
     for provider_name in sorted(ALTNAME_PROVIDER):
         altnames = select_languoid_altnames(provider_name=provider_name,
@@ -161,9 +181,10 @@ def get_example_query(*, order_by: str = 'id') -> sa.sql.Select:
 
 
 def add_order_by(select_languoid: sa.sql.Select, /, *,
-                 order_by: str, column_for_path_order) -> sa.sql.Select:
+                 order_by: str, column_for_path_order,
+                 column_for_id_order=Languoid.id) -> sa.sql.Select:
     if order_by in (True, None, 'id'):
-        return select_languoid.order_by(Languoid.id)
+        return select_languoid.order_by(column_for_id_order)
     elif order_by == 'path':
         return select_languoid.order_by(column_for_path_order)
     elif order_by is False:  # pragma: no cover
@@ -256,7 +277,69 @@ group_array = sa.func.json_group_array
 group_object = sa.func.json_group_object
 
 
-@_views.register_view('path_languoid', as_rows=True, load_json=False)
+def has_languoid_json(*, complete: bool = False, bind=_globals.ENGINE) -> bool:
+    """Return whether the languoidjson table has been materialized.
+
+    With ``complete`` require one row for each languoid.
+    """
+    if not complete:
+        return _backend.scalar(select(sa.exists().select_from(LanguoidJson)), bind=bind)
+
+    def count(model):
+        return select(sa.func.count()).select_from(model).scalar_subquery()
+
+    return _backend.scalar(select(sa.and_(count(LanguoidJson) > 0,
+                                          count(LanguoidJson) == count(Languoid))),
+                           bind=bind)
+
+
+def get_languoid_json_query(*, limit: int | None = None,
+                            offset: int | None = 0,
+                            order_by: str = _globals.LANGUOID_ORDER,
+                            as_rows: bool = False,
+                            load_json: bool = True,
+                            path_label: str = _globals.PATH_LABEL,
+                            languoid_label: str = _globals.LANGUOID_LABEL) -> sa.sql.Select:
+    """Return get_json_query(sort_keys=True) equivalent from languoidjson."""
+    if as_rows:
+        columns = [LanguoidJson.path.label(path_label),
+                   (LanguoidJson.json if not load_json else
+                    sa.type_coerce(LanguoidJson.json, sa.JSON)).label(languoid_label)]
+    else:
+        columns = [_backend.json_object(label_=_globals.LANGUOID_FILE_BASENAME,
+                                        sort_keys_=True,
+                                        load_json_=load_json,
+                                        **{path_label: json_path_array(LanguoidJson.path),
+                                           languoid_label: sa.func.json(LanguoidJson.json)})]
+
+    select_json = add_order_by(select(*columns),
+                               order_by=order_by,
+                               column_for_path_order=LanguoidJson.path,
+                               column_for_id_order=LanguoidJson.languoid_id)
+
+    if offset:
+        select_json = select_json.offset(offset)
+    if limit is not None:
+        select_json = select_json.limit(limit)
+    return select_json
+
+
+@_views.register_view('path_languoid')
+def get_path_languoid_query(*, path_label: str = _globals.PATH_LABEL,
+                            languoid_label: str = _globals.LANGUOID_LABEL) -> sa.sql.Select:
+    """Return (path, languoid JSON) rows from languoidjson (computing missing ones)."""
+    materialized = select(LanguoidJson.path.label(path_label),
+                          LanguoidJson.json.label(languoid_label))
+
+    missing = (get_json_query(as_rows=True, load_json=False, sort_keys=True,
+                              order_by=False,
+                              path_label=path_label,
+                              languoid_label=languoid_label)
+               .where(~sa.exists().where(LanguoidJson.languoid_id == Languoid.id)))
+
+    return sa.union_all(materialized, missing).order_by(path_label)
+
+
 def get_json_query(*, limit: int | None = None,
                    offset: int | None = 0,
                    order_by: str = _globals.LANGUOID_ORDER,
@@ -264,7 +347,46 @@ def get_json_query(*, limit: int | None = None,
                    load_json: bool = True,
                    sort_keys: bool = False,
                    path_label: str = _globals.PATH_LABEL,
-                   languoid_label: str = _globals.LANGUOID_LABEL) -> sa.sql.Select:
+                   languoid_label: str = _globals.LANGUOID_LABEL,
+                   languoid_ids: Iterable[str] | None = None) -> sa.sql.Select:
+    kwargs = {'order_by': order_by,
+              'as_rows': as_rows,
+              'load_json': load_json,
+              'sort_keys': sort_keys,
+              'path_label': path_label,
+              'languoid_label': languoid_label}
+
+    if languoid_ids is not None:
+        select_json = _get_json_query(**kwargs)
+        select_json = select_json.where(Languoid.id.in_(languoid_ids))
+        return add_limit_offset(select_json, limit=limit, offset=offset)
+
+    return _get_limited_json_query(limit=limit, offset=offset, **kwargs)
+
+
+def add_limit_offset(select_languoid: sa.sql.Select, /, *,
+                     limit: int | None, offset: int | None) -> sa.sql.Select:
+    if offset:
+        select_languoid = select_languoid.offset(offset)
+    if limit is not None:
+        select_languoid = select_languoid.limit(limit)
+    return select_languoid
+
+
+@cache_query
+def _get_limited_json_query(*, limit: int | None, offset: int | None,
+                            **kwargs) -> sa.sql.Select:
+    # also memoize the cache key of the final statement for repeated calls
+    return add_limit_offset(_get_json_query(**kwargs), limit=limit, offset=offset)
+
+
+@cache_query
+def _get_json_query(*, order_by: str,
+                    as_rows: bool,
+                    load_json: bool,
+                    sort_keys: bool,
+                    path_label: str,
+                    languoid_label: str) -> sa.sql.Select:
     languoid = {'id': Languoid.id,
                 'parent_id': Languoid.parent_id,
                 'name': Languoid.name,
@@ -291,36 +413,114 @@ def get_json_query(*, limit: int | None = None,
                                     load_json_=load_json)
     del sort_keys, load_json
 
+    column_for_path_order = LanguoidPath.path
     if as_rows:
-        path = column_for_path_order = Languoid.path()
-        columns = [path.label(path_label),
+        columns = [LanguoidPath.path.label(path_label),
                    json_object(label_=languoid_label, **languoid)]
     else:
-        subquery = Languoid._path_part(include_self=True, bottomup=False)
-
-        path_array = (sa.func.json_group_array(subquery.c.path_part)
-                     .label('path_array'))
-        path_array = select(path_array).label('path')
-
         columns = [json_object(label_=_globals.LANGUOID_FILE_BASENAME,
-                               **{path_label: path_array,
+                               **{path_label: LanguoidPath.path_array(),
                                   languoid_label: json_object(**languoid)})]
 
-        column_for_path_order = (sa.func.group_concat(subquery.c.path_part,
-                                                      _globals.FILE_PATH_SEP)
-                                 .label('path_string'))
-        column_for_path_order = select(column_for_path_order).label('file_path')
-
-    select_json = select(*columns).select_from(Languoid)
-    select_json = add_order_by(select_json,
-                               order_by=order_by,
-                               column_for_path_order=column_for_path_order)
-
-    if offset:
-        select_json = select_json.offset(offset)
-    if limit is not None:
-        select_json = select_json.limit(limit)
-    return select_json
+    select_json = (select(*columns)
+                   .join_from(Languoid, LanguoidPath,
+                              LanguoidPath.languoid_id == Languoid.id))
+    return add_order_by(select_json,
+                        order_by=order_by,
+                        column_for_path_order=column_for_path_order)
+
+
+def get_tables_queries(*, languoid_label: str = 'languoids'
+                       ) -> dict[str, sa.sql.Select]:
+    """Return {<name>: <query>} for one normalized row set per languoid attribute.
+
+    Each query selects ``languoid_id`` (``id`` for ``languoid_label``) first
+    and resolves provider, site, and bibitem ids into their names.
+    """
+    def columns(model):
+        return [c for c in model.__table__.columns if c.name != 'languoid_id']
+
+    e_bibitem = aliased(Bibitem, name='bibitem_e')
+    e_bibfile = aliased(Bibfile, name='bibfile_e')
+
+    queries = {languoid_label: (select(Languoid)
+                                .order_by(Languoid.id)),
+               'macroareas': (select(languoid_macroarea.c.languoid_id,
+                                     languoid_macroarea.c.macroarea_name.label('macroarea'))
+                              .order_by(languoid_macroarea.c.languoid_id,
+                                        languoid_macroarea.c.macroarea_name)),
+               'countries': (select(languoid_country.c.languoid_id,
+                                    languoid_country.c.country_id,
+                                    Country.name)
+                             .join_from(languoid_country, Country)
+                             .order_by(languoid_country.c.languoid_id,
+                                       languoid_country.c.country_id)),
+               'links': (select(Link.languoid_id, *columns(Link))
+                         .order_by(Link.languoid_id, Link.ord)),
+               'timespans': (select(Timespan.languoid_id, *columns(Timespan))
+                             .order_by(Timespan.languoid_id)),
+               'sources': (select(Source.languoid_id,
+                                  SourceProvider.name.label('provider'),
+                                  Bibfile.name.label('bibfile'), Bibitem.bibkey,
+                                  Source.pages, Source.trigger)
+                           .join_from(Source, SourceProvider)
+                           .join(Bibitem, Source.bibitem_id == Bibitem.id)
+                           .join(Bibfile, Bibitem.bibfile_id == Bibfile.id)
+                           .order_by(Source.languoid_id, SourceProvider.name,
+                                     Bibfile.name, Bibitem.bibkey)),
+               'altnames': (select(Altname.languoid_id,
+                                   AltnameProvider.name.label('provider'),
+                                   Altname.name, Altname.lang)
+                            .join_from(Altname, AltnameProvider)
+                            .order_by(Altname.languoid_id, AltnameProvider.name,
+                                      Altname.name, Altname.lang)),
+               'triggers': (select(Trigger.languoid_id, *columns(Trigger))
+                            .order_by(Trigger.languoid_id, Trigger.field, Trigger.ord)),
+               'identifiers': (select(Identifier.languoid_id,
+                                      IdentifierSite.name.label('site'),
+                                      Identifier.identifier)
+                               .join_from(Identifier, IdentifierSite)
+                               .order_by(Identifier.languoid_id, IdentifierSite.name)),
+               'classificationcomments': (select(ClassificationComment.languoid_id,
+                                                 *columns(ClassificationComment))
+                                          .order_by(ClassificationComment.languoid_id,
+                                                    ClassificationComment.kind)),
+               'classificationrefs': (select(ClassificationRef.languoid_id,
+                                             ClassificationRef.kind,
+                                             ClassificationRef.ord,
+                                             Bibfile.name.label('bibfile'),
+                                             Bibitem.bibkey,
+                                             ClassificationRef.pages)
+                                      .join_from(ClassificationRef, Bibitem)
+                                      .join(Bibfile, Bibitem.bibfile_id == Bibfile.id)
+                                      .order_by(ClassificationRef.languoid_id,
+                                                ClassificationRef.kind,
+                                                ClassificationRef.ord)),
+               'endangerments': (select(Endangerment.languoid_id,
+                                        Endangerment.status,
+                                        EndangermentSource.name.label('source'),
+                                        e_bibfile.name.label('source_bibfile'),
+                                        e_bibitem.bibkey.label('source_bibkey'),
+                                        EndangermentSource.pages.label('source_pages'),
+                                        Endangerment.date,
+                                        Endangerment.comment)
+                                 .join_from(Endangerment, EndangermentSource)
+                                 .outerjoin(e_bibitem,
+                                            EndangermentSource.bibitem_id == e_bibitem.id)
+                                 .outerjoin(e_bibfile,
+                                            e_bibitem.bibfile_id == e_bibfile.id)
+                                 .order_by(Endangerment.languoid_id)),
+               'ethnologuecomments': (select(EthnologueComment.languoid_id,
+                                             *columns(EthnologueComment))
+                                      .order_by(EthnologueComment.languoid_id)),
+               'isoretirements': (select(IsoRetirement.languoid_id,
+                                         *columns(IsoRetirement))
+                                  .order_by(IsoRetirement.languoid_id)),
+               'isoretirement_changeto': (select(IsoRetirementChangeTo.languoid_id,
+                                                 *columns(IsoRetirementChangeTo))
+                                          .order_by(IsoRetirementChangeTo.languoid_id,
+                                                    IsoRetirementChangeTo.ord))}
+    return queries
 
 
 def select_languoid_macroareas(languoid=Languoid, /, *, as_json: bool,
@@ -702,8 +902,12 @@ def select_iso_retirement_change_to(iso_retirement=IsoRetirement, /, *,
 
 def iterdescendants(parent_level: str | None = None,
                     child_level: str | None = None, *,
+                    closure: bool = False,
                     bind=_globals.ENGINE) -> Iterator[tuple[str, list[str]]]:
-    """Yield pairs of (parent id, sorted list of their descendant ids)."""
+    """Yield pairs of (parent id, sorted list of their descendant ids).
+
+    With ``closure`` query the ``languoid_closure`` table instead of recursing.
+    """
     # TODO: implement ancestors/descendants as sa.orm.relationship()
     # see https://bitbucket.org/zzzeek/sqlalchemy/issues/4165
     parent_root = None
@@ -718,7 +922,8 @@ def iterdescendants(parent_level: str | None = None,
         raise ValueError(f'invalid parent_level: {parent_level!r}')
 
     Parent, Child, parent_child = Languoid.parent_descendant(parent_root=parent_root,  # noqa: N806
-                                                             parent_level=parent_level)
+                                                             parent_level=parent_level,
+                                                             closure=closure)
 
     select_pairs = (select(Parent.id.label('parent_id'),
                            Child.id.label('child_id'))
@@ -740,3 +945,75 @@ def iterdescendants(parent_level: str | None = None,
         else:
             descendants = [c] + [c for _, c in grp]
         yield parent_id, descendants
+
+
+def select_subtree(ancestor_id: str, /, *, include_self: bool = False,
+                   level: str | None = None) -> sa.sql.Select:
+    """Return query for the descendant ids of ancestor_id in depth-first order.
+
+    Uses a single languoidpath lft/rgt index range scan.
+    """
+    Ancestor = aliased(LanguoidPath, name='ancestor')  # noqa: N806
+
+    select_ids = (select(LanguoidPath.languoid_id.label('id'))
+                  .join_from(Ancestor, LanguoidPath,
+                             LanguoidPath.in_subtree(Ancestor,
+                                                     include_self=include_self))
+                  .where(Ancestor.languoid_id == ancestor_id)
+                  .order_by(LanguoidPath.lft))
+
+    if level is not None:
+        if level not in LEVEL:  # pragma: no cover
+            raise ValueError(f'invalid level: {level!r}')
+        select_ids = (select_ids.join(Languoid, Languoid.id == LanguoidPath.languoid_id)
+                      .where(Languoid.level == level))
+    return select_ids
+
+
+def get_subtree_counts_query(*, ancestor_level: str | None = FAMILY,
+                             level: str | None = LANGUAGE) -> sa.sql.Select:
+    """Return query for (<id>, <n descendants of level>) of ancestor_level languoids.
+
+    Without level count all descendants from the interval size (rgt - lft).
+    """
+    Ancestor = aliased(LanguoidPath, name='ancestor')  # noqa: N806
+
+    if level is None:
+        n = (Ancestor.rgt - Ancestor.lft).label('n')
+    else:
+        if level not in LEVEL:  # pragma: no cover
+            raise ValueError(f'invalid level: {level!r}')
+        n = (select(sa.func.count())
+             .select_from(LanguoidPath)
+             .join(Languoid, Languoid.id == LanguoidPath.languoid_id)
+             .where(LanguoidPath.in_subtree(Ancestor))
+             .where(Languoid.level == level)
+             .scalar_subquery()
+             .label('n'))
+
+    select_counts = (select(Ancestor.languoid_id.label('id'), n)
+                     .order_by(Ancestor.lft))
+
+    if ancestor_level is not None:
+        if ancestor_level not in LEVEL:  # pragma: no cover
+            raise ValueError(f'invalid ancestor_level: {ancestor_level!r}')
+        AncestorLanguoid = aliased(Languoid, name='ancestor_languoid')  # noqa: N806
+        select_counts = (select_counts
+                         .join(AncestorLanguoid,
+                               AncestorLanguoid.id == Ancestor.languoid_id)
+                         .where(AncestorLanguoid.level == ancestor_level))
+    return select_counts
+
+
+def is_descendant(languoid_id: str, ancestor_id: str, /, *,
+                  include_self: bool = False,
+                  bind=_globals.ENGINE) -> bool:
+    """Return whether languoid_id is in the subtree of ancestor_id."""
+    Ancestor = aliased(LanguoidPath, name='ancestor')  # noqa: N806
+
+    select_exists = (select(sa.exists()
+                            .where(LanguoidPath.languoid_id == languoid_id)
+                            .where(Ancestor.languoid_id == ancestor_id)
+                            .where(LanguoidPath.in_subtree(Ancestor,
+                                                           include_self=include_self))))
+    return _backend.scalar(select_exists, bind=bind)
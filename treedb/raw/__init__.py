@@ -5,12 +5,12 @@ from .export import (print_stats,
                      write_raw_csv,
                      write_files)
 
-from .models import File, Option, Value
-from .records import fetch_records
+from .models import File, Option, Value, ValueLines
+from .records import fetch_records, fetch_file_checksums
 
 __all__ = ['print_stats',
            'checksum',
            'write_raw_csv',
            'write_files',
-           'File', 'Option', 'Value',
-           'fetch_records']
+           'File', 'Option', 'Value', 'ValueLines',
+           'fetch_records', 'fetch_file_checksums']
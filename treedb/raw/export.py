@@ -1,5 +1,6 @@
 """Write information to stdout, csv, files."""
 
+from collections.abc import Sequence
 import logging
 import warnings
 
@@ -10,11 +11,12 @@ import sqlalchemy as sa
 from .. import _globals
 from .. import _tools
 from ..backend import export as _backend_export
+from ..backend.models import Checksum
 from ..languoids import files as _files
 
 from . import records as _records
 
-from .models import File, Option, Value
+from .models import File, Option
 
 __all__ = ['print_stats',
            'checksum',
@@ -27,11 +29,12 @@ log = logging.getLogger(__name__)
 
 def print_stats(*, file=None):
     log.info('fetch statistics')
+    values = _records.get_values()
 
     # order by descending frequency for any_options and undefined options
     select_nvalues = (sa.select(Option.section, Option.option,
                                 sa.func.count().label('n'))
-                      .join_from(Option, Value)
+                      .join_from(Option, values, Option.id == values.c.option_id)
                       .group_by(Option.section, Option.option)
                       .order_by(sa.desc('defined'),
                                 'ord_section', 'ord_option',
@@ -44,36 +47,66 @@ def print_stats(*, file=None):
 
 
 def checksum(*, weak: bool = False,
-             hash_name: str = _globals.DEFAULT_HASH,
+             hash_name: str | Sequence[str] = _globals.DEFAULT_HASH,
              dialect: str = csv23.DIALECT,
-             encoding: str = csv23.ENCODING):
+             encoding: str = csv23.ENCODING,
+             format_: str = 'csv',
+             cache: bool = False):
+    """Return checksum over the raw tables (``cache=True``: for the default CSV format).
+
+    With ``format_=ROWS_FORMAT`` hash the binary row encoding instead of CSV.
+    With a sequence of hash names return a list with one checksum per name.
+    """
     kind = {True: 'weak', False: 'strong', 'unordered': 'unordered'}[weak]
+    hash_names = [hash_name] if isinstance(hash_name, str) else list(hash_name)
+    prefix = kind if format_ == 'csv' else f'{kind}:{format_}'
+
+    cache_keys = [{'source': f'raw_{format_}', 'order_by': kind,
+                   'limit': None, 'offset': 0, 'hash_name': name}
+                  for name in hash_names]
+    cache = cache and (dialect, encoding) == (csv23.DIALECT, csv23.ENCODING)
+    if cache:
+        results = [Checksum.get_checksum(bind=_globals.ENGINE, **key)
+                   for key in cache_keys]
+        if None not in results:
+            log.info('cached raw checksum: %r', results)
+            return results[0] if isinstance(hash_name, str) else results
+
     log.info('calculate %r raw checksum', kind)
 
     if weak:
+        values = _records.get_values()
         select_rows = (sa.select(File.path,
                                  Option.section, Option.option,
-                                 Value.value)
-                       .join_from(File, Value).join(Option))
+                                 values.c.value)
+                       .join_from(File, values, File.id == values.c.file_id)
+                       .join(Option, values.c.option_id == Option.id))
 
         order = ['path', 'section', 'option']
         if weak == 'unordered':
-            order.append(Value.value)
+            order.append(values.c.value)
         else:
-            order.append(Value.line)
+            order.append(values.c.line)
         select_rows = select_rows.order_by(*order)
 
     else:
         select_rows = (sa.select(File.path, File.sha256)
                        .order_by('path'))
 
-    hashobj = _backend_export.hash_csv(select_rows,
-                                       hash_name=hash_name,
-                                       dialect=dialect, encoding=encoding,
-                                       raw=True)
+    hashobjs = _backend_export.hash_csv(select_rows,
+                                        hash_name=hash_names,
+                                        dialect=dialect, encoding=encoding,
+                                        format_=format_,
+                                        raw=True)
 
-    logging.info('%s: %r', hashobj.name, hashobj.hexdigest())
-    return f'{kind}:{hashobj.name}:{hashobj.hexdigest()}'
+    results = []
+    for hashobj, key in zip(hashobjs, cache_keys):
+        logging.info('%s: %r', hashobj.name, hashobj.hexdigest())
+        result = f'{prefix}:{hashobj.name}:{hashobj.hexdigest()}'
+        if cache:
+            Checksum.set_checksum(result, bind=_globals.ENGINE, **key)
+        results.append(result)
+    return results[0] if isinstance(hash_name, str) else results
 
 
 def write_raw_csv(filename=None, /, *,
@@ -89,10 +122,12 @@ def write_raw_csv(filename=None, /, *,
         warnings.warn(f'deltete present file: {path!r}')
         path.unlink()
 
+    values = _records.get_values()
     select_values = (sa.select(File.path,
                                Option.section, Option.option,
-                               Value.line, Value.value)
-                     .join_from(File, Value).join(Option)
+                               values.c.line, values.c.value)
+                     .join_from(File, values, File.id == values.c.file_id)
+                     .join(Option, values.c.option_id == Option.id)
                      .order_by('path', 'section', 'option', 'line'))
 
     return _backend_export.write_csv(select_values, filename,
@@ -105,10 +140,16 @@ def write_files(root=_globals.ROOT, /, *, replace: bool = False,
                 limit: int | None = None,
                 offset: int | None = 0,
                 progress_after: int = _tools.PROGRESS_AFTER,
+                jobs: int | None = None,
+                fresh: bool = False,
+                skip_unchanged: bool = False,
                 bind=_globals.ENGINE):
     """Write (path, section, option, line, value) rows back into config files."""
     log.info('write from raw record lines to tree')
 
+    file_checksums = (_records.fetch_file_checksums(bind=bind)
+                      if skip_unchanged else None)
+
     records = _records.fetch_records(order_by='path',
                                      progress_after=progress_after,
                                      bind=bind)
@@ -120,4 +161,6 @@ def write_files(root=_globals.ROOT, /, *, replace: bool = False,
     return _files.write_files(records, root=root, replace=replace,
                               dry_run=dry_run,
                               require_nwritten=require_nwritten,
-                              progress_after=progress_after)
+                              progress_after=progress_after,
+                              jobs=jobs, fresh=fresh,
+                              file_checksums=file_checksums)
@@ -1,6 +1,8 @@
 """Insert raw model tables."""
 
 import functools
+import itertools
+import json
 import logging
 
 import sqlalchemy as sa
@@ -10,7 +12,7 @@ from .. import _tools
 from .. import languoids as _languoids
 from ..languoids import fields as _fields
 
-from .models import File, Option, Value
+from .models import File, Option, Value, ValueLines
 
 __all__ = ['main']
 
@@ -67,12 +69,30 @@ def itervalues(cfg, file_id, /, *, option_map):
                        'line': get_line(), 'value': v}
 
 
-def main(root, /, *, conn):
+def itervalue_lines(value_params, /):
+    """Yield ValueLines params from consecutive Value params of one file."""
+    groupby_option = _tools.groupby_itemgetter('option_id')
+    for _, params in groupby_option(value_params):
+        first, *rest = params
+        yield {'file_id': first['file_id'], 'option_id': first['option_id'],
+               'line': first['line'],
+               'lines': json.dumps([p['value'] for p in itertools.chain([first], rest)],
+                                   ensure_ascii=False, separators=(',', ':'))}
+
+
+def main(root, /, *, conn, compact: bool = False):
     insert_file = functools.partial(conn.execute, sa.insert(File))
 
     option_id_is_lines = OptionMap(conn=conn)
 
-    insert_value = functools.partial(conn.execute, sa.insert(Value))
+    if compact:
+        log.info('insert compact %r rows', ValueLines.__tablename__)
+        insert_lines = functools.partial(conn.execute, sa.insert(ValueLines))
+
+        def insert_value(value_params):
+            insert_lines(list(itervalue_lines(value_params)))
+    else:
+        insert_value = functools.partial(conn.execute, sa.insert(Value))
 
     for path_tuple, dentry, cfg in _languoids.iterfiles(root):
         sha256 = _tools.sha256sum(dentry.path, raw=True)
@@ -7,7 +7,7 @@ from sqlalchemy import (Column, Integer, String, Text, Boolean,
 
 from .._globals import REGISTRY as registry  # noqa: N811
 
-__all__ = ['File', 'Option', 'Value']
+__all__ = ['File', 'Option', 'Value', 'ValueLines']
 
 PREFIX = '_'
 
@@ -80,3 +80,30 @@ class Value:
 
     __table_args__ = (UniqueConstraint(file_id, line),
                       {'info': {'without_rowid': True}})
+
+
+@registry.mapped
+class ValueLines:
+    """Compact item values: all lines of a (path, section, option) as JSON array."""
+
+    __tablename__ = f'{PREFIX}value_lines'
+
+    file_id = Column(ForeignKey('_file.id'), primary_key=True)
+    option_id = Column(ForeignKey('_option.id'), primary_key=True)
+    line = Column(Integer, CheckConstraint('line > 0'), nullable=False)
+
+    lines = Column(Text, CheckConstraint('json_array_length(lines) > 0'),
+                   nullable=False)
+
+    __table_args__ = (UniqueConstraint(file_id, line),
+                      {'info': {'without_rowid': True}})
+
+    @classmethod
+    def values(cls, /, *, name: str = 'value_lines_value'):
+        """Return subquery with the Value columns (one row per line)."""
+        line = sa.func.json_each(cls.lines).table_valued('key', 'value')
+        return (sa.select(cls.file_id, cls.option_id,
+                          (cls.line + line.c.key).label('line'),
+                          line.c.value.label('value'))
+                .join_from(cls, line, sa.true())
+                .subquery(name))
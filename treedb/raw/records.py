@@ -1,19 +1,25 @@
 """Fetch records from raw tables."""
 
-from collections.abc import Iterator
+from collections.abc import Callable, Iterable, Iterator
 import contextlib
+import functools
 import itertools
+import json
 import logging
+import operator
 
 import sqlalchemy as sa
 
 from .. import _globals
 from .. import _tools
 from .. import backend as _backend
+from ..languoids import files as _files
 
-from .models import File, Option, Value
+from .models import File, Option, Value, ValueLines
 
-__all__ = ['fetch_records']
+__all__ = ['fetch_records',
+           'get_values',
+           'fetch_file_checksums']
 
 WINDOWSIZE = 1_000
 
@@ -23,41 +29,123 @@ log = logging.getLogger(__name__)
 
 def fetch_records(*, order_by: str = _globals.LANGUOID_ORDER,
                   progress_after: int = _tools.PROGRESS_AFTER,
-                  windowsize: int = WINDOWSIZE,
+                  windowsize: int | None = WINDOWSIZE,
                   skip_unknown: bool = True,
+                  jobs: int | None = None,
+                  pipe: Callable[[Iterable[_globals.RecordItem]], Iterable] | None = None,
                   bind=_globals.ENGINE) -> Iterator[_globals.RecordItem]:
-    """Yield (<path_part>, ...), <dict of <dicts of strings/string_lists>>) pairs."""
+    """Yield (<path_part>, ...), <dict of <dicts of strings/string_lists>>) pairs.
+
+    With ``windowsize=None`` stream a single ordered query over the values
+    (holding only the options table in memory) instead of fetching windows.
+
+    With ``jobs`` fetch the windows in worker processes over separate
+    read-only connections, yielding them in key order. Apply ``pipe`` to
+    the records of each window (in the workers with ``jobs``).
+    """
     try:
         dbapi_conn = bind.connection.driver_connection
     except AttributeError:
         dbapi_conn = None
     log.info('start generating raw records from %r', dbapi_conn or bind)
 
-    # depend on no empty value files (save sa.outerjoin(File, Value) below)
-    select_values = (sa.select(Value.file_id,
-                               Option.section, Option.option, Option.is_lines,
-                               Value.value)
-                     .join_from(Value, Option))
+    key_column = get_key_column(order_by)
+    log.info('order_by: %r', order_by)
 
-    if order_by in ('file', True, None, False):
-        key_column = File.id
-        value_key = Value.file_id
-    elif order_by in ('path', 'id'):
-        select_values = select_values.join(File)
-        if order_by == 'path':
-            key_column = File.path
+    if jobs is not None and jobs > 1:
+        database = _backend.get_database(bind)
+        if windowsize is None or not database:
+            log.warning('ignore jobs=%r for %r and windowsize=%r',
+                        jobs, database, windowsize)
+            jobs = None
+
+    n = 0
+    make_item = _globals.RecordItem.from_filepath_record
+    with _backend.connect(bind=bind) as conn:
+        if jobs is not None and jobs > 1:
+            fetch_window = functools.partial(_fetch_window,
+                                             database=database,
+                                             order_by=order_by,
+                                             skip_unknown=skip_unknown,
+                                             pipe=pipe)
+            windows = window_bounds(key_column, size=windowsize, bind=conn)
+            log.info('fetch windows with %d jobs from %r', jobs, database)
+            items = itertools.chain.from_iterable(_tools.pool_map(fetch_window,
+                                                                  windows,
+                                                                  jobs=jobs))
         else:
-            key_column = File.glottocode
-        value_key = key_column
+            if windowsize is None:
+                path_records = iterrecords_streamed(key_column,
+                                                    skip_unknown=skip_unknown,
+                                                    bind=conn)
+            else:
+                path_records = iterrecords_windowed(key_column,
+                                                    windowsize=windowsize,
+                                                    skip_unknown=skip_unknown,
+                                                    bind=conn)
+            items = itertools.starmap(make_item, path_records)
+            if pipe is not None:
+                items = pipe(items)
+
+        for n, item in enumerate(items, start=1):
+            yield item
+
+            if not (n % progress_after):
+                log.info('%s raw records generated', f'{n:_d}')
+
+    log.info('%s raw records total', f'{n:_d}')
+
+
+def get_key_column(order_by: str, /):
+    if order_by in ('file', True, None, False):
+        return File.id
+    elif order_by == 'path':
+        return File.path
+    elif order_by == 'id':
+        return File.glottocode
     else:  # pragma: no cover
         raise ValueError(f'{order_by=!r} not implememted')
 
-    log.info('order_by: %r', order_by)
+
+def _fetch_window(bounds, /, *, database: str, order_by: str,
+                  skip_unknown: bool, pipe) -> list:
+    key_column = get_key_column(order_by)
+    windows = [window_slice(*bounds)]
+    with _backend.readonly_engine(database).connect() as conn:
+        path_records = iterrecords_windowed(key_column, windows=windows,
+                                            skip_unknown=skip_unknown,
+                                            bind=conn)
+        items = itertools.starmap(_globals.RecordItem.from_filepath_record,
+                                  path_records)
+        if pipe is not None:
+            items = pipe(items)
+        return list(items)
+
+
+def iterrecords_windowed(key_column, /, *, windowsize: int = WINDOWSIZE,
+                         windows=None,
+                         skip_unknown: bool = True,
+                         bind=_globals.ENGINE):
+    """Yield (<path>, <record>) pairs fetching two queries per key window."""
+    values = get_values(bind=bind)
+
+    # depend on no empty value files (save sa.outerjoin(File, Value) below)
+    select_values = (sa.select(values.c.file_id,
+                               Option.section, Option.option, Option.is_lines,
+                               values.c.value)
+                     .join_from(values, Option, values.c.option_id == Option.id))
+
+    if key_column is File.id:
+        value_key = values.c.file_id
+    else:
+        select_values = select_values.join(File, values.c.file_id == File.id)
+        value_key = key_column
+
     select_files = (sa.select(File.path)
                     .order_by(key_column))
     select_values = (select_values
                      .order_by(value_key,
-                               'section', Value.line, 'option'))
+                               'section', values.c.line, 'option'))
 
     if skip_unknown:
         select_values = select_values.where(Option.is_lines != sa.null())
@@ -66,10 +154,11 @@ def fetch_records(*, order_by: str = _globals.LANGUOID_ORDER,
     groupby = itertools.starmap(_tools.groupby_attrgetter, groupby)
     groupby_file, groupby_section, groupby_option = groupby
 
-    n = 0
-    make_item = _globals.RecordItem.from_filepath_record
     with _backend.connect(bind=bind) as conn:
-        for in_slice in window_slices(key_column, size=windowsize, bind=conn):
+        if windows is None:
+            windows = window_slices(key_column, size=windowsize, bind=conn)
+
+        for in_slice in windows:
             if log.level <= logging.DEBUG:
                 where = _backend.expression_compile(in_slice(key_column))
                 log.debug('fetch rows %r', where.string)
@@ -86,14 +175,80 @@ def fetch_records(*, order_by: str = _globals.LANGUOID_ORDER,
                     s: {o: [ln.value for ln in lines] if is_lines else next(lines).value
                        for (o, is_lines), lines in groupby_option(sections)}
                     for s, sections in groupby_section(values)}
-                yield make_item(path, record)
+                yield path, record
 
             assert count
-            n += count
-            if not (n % progress_after):
-                log.info('%s raw records generated', f'{n:_d}')
 
-    log.info('%s raw records total', f'{n:_d}')
+
+def iterrecords_streamed(key_column, /, *, skip_unknown: bool = True,
+                         bind=_globals.ENGINE):
+    """Yield (<path>, <record>) pairs from one query ordered by key_column."""
+    select_options = sa.select(Option.id, Option.section, Option.option,
+                               Option.is_lines)
+    if skip_unknown:
+        select_options = select_options.where(Option.is_lines != sa.null())
+
+    # compact: decode ValueLines JSON here instead of with json_each()
+    compact = is_compact(bind=bind)
+    model = ValueLines if compact else Value
+
+    # depend on no empty value files (save sa.outerjoin(File, Value) below)
+    select_values = (sa.select(File.path, model.line, model.option_id,
+                               model.lines if compact else model.value)
+                     .join_from(model, File)
+                     .order_by(key_column, model.line))
+
+    groupby_path = _tools.groupby_itemgetter(0)
+    groupby_section = _tools.groupby_itemgetter(0)
+    groupby_option = _tools.groupby_itemgetter(1, 2)
+    section_line = operator.itemgetter(0, 3)
+
+    with _backend.connect(bind=bind) as conn:
+        options = {id_: (section, option, is_lines)
+                   for id_, section, option, is_lines in conn.execute(select_options)}
+        log.debug('hold %d options in memory', len(options))
+
+        with contextlib.closing(conn.execute(select_values)) as result:
+            for path, rows in groupby_path(result):
+                if compact:
+                    rows = ((path, line + i, option_id, value)
+                            for _, line, option_id, lines in rows
+                            for i, value in enumerate(json.loads(lines)))
+
+                # (section, option, is_lines, line, value) in (section, line) order
+                values = sorted(((*options[option_id], line, value)
+                                 for _, line, option_id, value in rows
+                                 if option_id in options),
+                                key=section_line)
+
+                record = {
+                    s: {o: [ln[-1] for ln in lines] if is_lines else next(lines)[-1]
+                        for (o, is_lines), lines in groupby_option(sections)}
+                    for s, sections in groupby_section(values)}
+                yield path, record
+
+
+def is_compact(*, bind=_globals.ENGINE) -> bool:
+    """Return True if the raw values are stored as ValueLines."""
+    select_compact = sa.select(sa.exists(sa.select(ValueLines.file_id)))
+    with _backend.connect(bind=bind) as conn:
+        compact = conn.execute(select_compact).scalar_one()
+    log.debug('raw layout: %s', 'compact' if compact else 'lines')
+    return compact
+
+
+def get_values(*, bind=_globals.ENGINE):
+    """Return Value table or ValueLines.values() for a compact raw layout."""
+    return ValueLines.values() if is_compact(bind=bind) else Value.__table__
+
+
+def fetch_file_checksums(*, bind=_globals.ENGINE
+                         ) -> dict[_globals.PathType, _files.FileChecksum]:
+    """Return {(<path_part>, ...): (<size>, <sha256>)} for the loaded files."""
+    select_files = sa.select(File.path, File.size, File.sha256)
+    with _backend.connect(bind=bind) as conn:
+        return {tuple(path.split('/')): _files.FileChecksum(size, sha256)
+                for path, size, sha256 in conn.execute(select_files)}
 
 
 def window_slices(key_column, /, *, size: int = WINDOWSIZE,
@@ -103,23 +258,29 @@ def window_slices(key_column, /, *, size: int = WINDOWSIZE,
     adapted from https://github.com/sqlalchemy/sqlalchemy/wiki/RangeQuery-and-WindowedRangeQuery
     """
     log.info('fetch %r slices for window of %d', str(key_column.expression), size)
-    keys = iterkeys(key_column, size=size, bind=bind)
+    for start, end in window_bounds(key_column, size=size, bind=bind):
+        yield window_slice(start, end)
 
-    try:
-        end = next(keys)
-    except StopIteration:
-        yield lambda c: sa.and_()
-        return
 
-    # right-inclusive indexes for windows of given size for continuous keys
-    yield lambda c, end=end: (c <= end)
-    last = end
+def window_slice(start, end, /):
+    """Return where clause making function for the key window (start, end]."""
+    def in_slice(c):
+        return sa.and_(*([] if start is None else [c > start]),
+                       *([] if end is None else [c <= end]))
+
+    return in_slice
 
-    for end in keys:
-        yield lambda c, last=last, end=end: sa.and_(c > last, c <= end)
-        last = end
 
-    yield lambda c, end=end: (c > end)
+def window_bounds(key_column, /, *, size: int = WINDOWSIZE,
+                  bind=_globals.ENGINE):
+    """Yield (start, end) pairs of key_column windows of size (None: unbounded)."""
+    start = None
+    # right-inclusive indexes for windows of given size for continuous keys
+    for end in iterkeys(key_column, size=size, bind=bind):
+        yield start, end
+        start = end
+
+    yield start, None
 
 
 def iterkeys(key_column, /, *, size: int = WINDOWSIZE,
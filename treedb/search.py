@@ -0,0 +1,174 @@
+"""Optional SQLite3 FTS5 full-text index over languoid names and altnames."""
+
+from collections.abc import Iterable
+import logging
+import warnings
+
+import sqlalchemy as sa
+from sqlalchemy import select
+
+from . import _globals
+from . import backend as _backend
+from .backend.sqlite_master import sqlite_master
+from .models import Languoid, Altname, AltnameProvider
+
+__all__ = ['search_names']
+
+NAME_INDEX = 'languoid_name_fts'
+
+NAME_TOKENIZE = 'unicode61 remove_diacritics 2'
+
+NAME_PREFIX = '2 3'
+
+SEARCH_LIMIT = 10
+
+
+log = logging.getLogger(__name__)
+
+
+def has_name_index(*, bind=_globals.ENGINE) -> bool:
+    """Return whether the languoid name FTS5 table has been created."""
+    select_index = (select(sa.exists()
+                           .where(sqlite_master.c.type == 'table',
+                                  sqlite_master.c.name == NAME_INDEX)))
+    return _backend.scalar(select_index, bind=bind)
+
+
+def create_name_index(*, conn,
+                      tokenize: str = NAME_TOKENIZE,
+                      prefix: str = NAME_PREFIX) -> int:
+    """(Re)create the FTS5 table over Languoid.name and Altname rows, return rowcount.
+
+    Languoid names have provider and lang NULL.
+    """
+    log.info('create FTS5 name index %r (tokenize=%r)', NAME_INDEX, tokenize)
+    conn.execute(sa.text(f'DROP TABLE IF EXISTS {NAME_INDEX}'))
+    conn.execute(sa.text(f'CREATE VIRTUAL TABLE {NAME_INDEX} USING fts5('
+                         'name, languoid_id UNINDEXED,'
+                         ' provider UNINDEXED, lang UNINDEXED,'
+                         f" tokenize = '{tokenize}', prefix = '{prefix}')"))
+    return insert_names(conn)
+
+
+def update_name_index(languoid_ids: Iterable[str], /, *, conn) -> int:
+    """Reinsert the name index rows of languoid_ids (if any), return rowcount."""
+    if not has_name_index(bind=conn):
+        return 0
+
+    languoid_ids = set(languoid_ids)
+    log.info('update name index rows of %d languoids', len(languoid_ids))
+    conn.execute(sa.text(f'DELETE FROM {NAME_INDEX}'
+                         ' WHERE languoid_id IN :languoid_ids')
+                 .bindparams(sa.bindparam('languoid_ids', expanding=True)),
+                 {'languoid_ids': list(languoid_ids)})
+    return insert_names(conn, languoid_ids=languoid_ids)
+
+
+def insert_names(conn, /, *, languoid_ids=None) -> int:
+    select_names = select(Languoid.name,
+                          Languoid.id.label('languoid_id'),
+                          sa.null().label('provider'),
+                          sa.null().label('lang'))
+
+    select_altnames = (select(Altname.name,
+                              Altname.languoid_id,
+                              AltnameProvider.name.label('provider'),
+                              Altname.lang)
+                       .join_from(Altname, AltnameProvider))
+
+    if languoid_ids is not None:
+        select_names = select_names.where(Languoid.id.in_(languoid_ids))
+        select_altnames = select_altnames.where(Altname.languoid_id.in_(languoid_ids))
+
+    name_index = sa.table(NAME_INDEX, *map(sa.column, ['name', 'languoid_id',
+                                                       'provider', 'lang']))
+    rowcount = 0
+    for query in (select_names, select_altnames):
+        insert = (sa.insert(name_index)
+                  .from_select(['name', 'languoid_id', 'provider', 'lang'], query))
+        rowcount += conn.execute(insert).rowcount
+    log.info('inserted %d names into %r', rowcount, NAME_INDEX)
+    return rowcount
+
+
+def match_query(text: str, /, *, prefix: bool = True) -> str:
+    """Return FTS5 MATCH expression requiring all tokens of text.
+
+    >>> match_query('Old High Ger')
+    '"Old" "High" "Ger"*'
+
+    >>> match_query('deu', prefix=False)
+    '"deu"'
+    """
+    terms = ['"{}"'.format(t.replace('"', '""')) for t in text.split()]
+    if prefix and terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_names(text: str, /, *, limit: int | None = SEARCH_LIMIT,
+                 prefix: bool = True,
+                 providers: Iterable[str] | None = None,
+                 bind=_globals.ENGINE) -> list[str]:
+    """Return glottocodes of languoids with (alt)names matching text, best first.
+
+    Match all words of text (diacritic- and case-insensitive),
+    the last one as prefix. Rank languoid name matches before altname matches,
+    then by ``bm25``. Restrict altname matches to providers if given.
+    Without name index (``load(index_names=True)``), fall back to ``LIKE``.
+    """
+    if not text.strip():
+        return []
+
+    if not has_name_index(bind=bind):
+        warnings.warn(f'no {NAME_INDEX!r} table (load with index_names=True),'
+                      ' falling back to slow LIKE search')
+        return _like_search_names(text, limit=limit, providers=providers,
+                                  bind=bind)
+
+    where = f'{NAME_INDEX} MATCH :match'
+    params = {'match': match_query(text, prefix=prefix)}
+    if providers is not None:
+        where += ' AND (provider IS NULL OR provider IN :providers)'
+        params['providers'] = list(providers)
+
+    query = sa.text(f'SELECT languoid_id FROM {NAME_INDEX}'
+                    f' WHERE {where}'
+                    ' GROUP BY languoid_id'
+                    ' ORDER BY max(provider IS NULL) DESC, min(rank), languoid_id'
+                    + (' LIMIT :limit' if limit is not None else ''))
+    if providers is not None:
+        query = query.bindparams(sa.bindparam('providers', expanding=True))
+    if limit is not None:
+        params['limit'] = limit
+
+    with _backend.connect(bind=bind) as conn:
+        return conn.execute(query, params).scalars().all()
+
+
+def _like_search_names(text: str, /, *, limit: int | None,
+                       providers: Iterable[str] | None, bind) -> list[str]:
+    pattern = '%{}%'.format(text.strip().replace('\\', '\\\\')
+                            .replace('%', '\\%').replace('_', '\\_'))
+
+    select_names = (select(Languoid.id.label('languoid_id'),
+                           sa.literal(1).label('primary'))
+                    .where(Languoid.name.like(pattern, escape='\\')))
+
+    select_altnames = (select(Altname.languoid_id,
+                              sa.literal(0).label('primary'))
+                       .where(Altname.name.like(pattern, escape='\\')))
+    if providers is not None:
+        select_altnames = (select_altnames.join_from(Altname, AltnameProvider)
+                           .where(AltnameProvider.name.in_(list(providers))))
+
+    matches = sa.union_all(select_names, select_altnames).subquery('matches')
+
+    query = (select(matches.c.languoid_id)
+             .group_by(matches.c.languoid_id)
+             .order_by(sa.func.max(matches.c.primary).desc(),
+                       matches.c.languoid_id)
+             .limit(limit))
+
+    with _backend.connect(bind=bind) as conn:
+        return conn.execute(query).scalars().all()
@@ -0,0 +1,280 @@
+"""Optional SQLite3 R*Tree index over languoid coordinates and GeoJSON export."""
+
+from collections.abc import Iterable, Iterator, Sequence
+import logging
+import math
+
+import sqlalchemy as sa
+from sqlalchemy import select
+
+from . import _globals
+from . import _tools
+from . import backend as _backend
+from .backend.sqlite_master import sqlite_master
+from .models import Languoid
+
+__all__ = ['languoids_in_bbox',
+           'languoids_within',
+           'nearest_languoids',
+           'languoids_in_polygon',
+           'write_geojson']
+
+COORDINATE_INDEX = 'languoid_rtree'
+
+EARTH_RADIUS = 6_371.0088  # mean radius in km
+
+NEAREST_START_RADIUS = 100.0
+
+
+log = logging.getLogger(__name__)
+
+
+rtree = sa.table(COORDINATE_INDEX,
+                 *map(sa.column, ['id', 'min_lat', 'max_lat',
+                                  'min_lon', 'max_lon', 'languoid_id']))
+
+
+def has_coordinate_index(*, bind=_globals.ENGINE) -> bool:
+    """Return whether the languoid coordinate R*Tree table has been created."""
+    select_index = (select(sa.exists()
+                           .where(sqlite_master.c.type == 'table',
+                                  sqlite_master.c.name == COORDINATE_INDEX)))
+    return _backend.scalar(select_index, bind=bind)
+
+
+def create_coordinate_index(*, conn) -> int:
+    """(Re)create the R*Tree table over Languoid coordinates, return rowcount."""
+    log.info('create R*Tree coordinate index %r', COORDINATE_INDEX)
+    conn.execute(sa.text(f'DROP TABLE IF EXISTS {COORDINATE_INDEX}'))
+    conn.execute(sa.text(f'CREATE VIRTUAL TABLE {COORDINATE_INDEX} USING rtree('
+                         'id, min_lat, max_lat, min_lon, max_lon, +languoid_id)'))
+    return insert_coordinates(conn)
+
+
+def update_coordinate_index(languoid_ids: Iterable[str], /, *, conn) -> int:
+    """Reinsert the coordinate index rows of languoid_ids (if any), return rowcount."""
+    if not has_coordinate_index(bind=conn):
+        return 0
+
+    languoid_ids = set(languoid_ids)
+    log.info('update coordinate index rows of %d languoids', len(languoid_ids))
+    conn.execute(sa.delete(rtree)
+                 .where(rtree.c.languoid_id.in_(languoid_ids)))
+    return insert_coordinates(conn, languoid_ids=languoid_ids)
+
+
+def insert_coordinates(conn, /, *, languoid_ids=None) -> int:
+    select_coordinates = (select(Languoid.latitude, Languoid.latitude,
+                                 Languoid.longitude, Languoid.longitude,
+                                 Languoid.id)
+                          .where(Languoid.latitude != sa.null()))
+    if languoid_ids is not None:
+        select_coordinates = select_coordinates.where(Languoid.id.in_(languoid_ids))
+
+    insert = (sa.insert(rtree)
+              .from_select(['min_lat', 'max_lat', 'min_lon', 'max_lon', 'languoid_id'],
+                           select_coordinates))
+    rowcount = conn.execute(insert).rowcount
+    log.info('inserted %d coordinates into %r', rowcount, COORDINATE_INDEX)
+    return rowcount
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float, /) -> float:
+    """Return the great-circle distance in km between two points in degrees.
+
+    >>> round(haversine(0, 0, 0, 180))
+    20015
+
+    >>> haversine(52.5, 13.4, 52.5, 13.4)
+    0.0
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = (math.sin(dphi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(latitude: float, longitude: float,
+                radius: float, /) -> tuple[float, float, float, float]:
+    """Return (south, west, north, east) enclosing the radius (in km) around the point.
+
+    West is greater than east if the box crosses the antimeridian.
+
+    >>> [round(x, 1) for x in radius_bbox(0, 179, 222.39)]
+    [-2.0, 177.0, 2.0, -179.0]
+
+    >>> radius_bbox(89, 0, 500)[1:]
+    (-180.0, 90.0, 180.0)
+    """
+    angle = radius / EARTH_RADIUS
+    dlat = math.degrees(angle)
+    south, north = latitude - dlat, latitude + dlat
+    if south <= -90 or north >= 90 or angle >= math.pi / 2:
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angle)
+                                      / math.cos(math.radians(latitude)))))
+    west, east = longitude - dlon, longitude + dlon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def _lon_ranges(west: float, east: float, /) -> list[tuple[float, float]]:
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+def _select_bbox(south: float, west: float, north: float, east: float, /, *,
+                 indexed: bool) -> sa.sql.Select:
+    selects = []
+    for w, e in _lon_ranges(west, east):
+        query = (select(Languoid.id, Languoid.latitude, Languoid.longitude)
+                 .where(Languoid.latitude.between(south, north),
+                        Languoid.longitude.between(w, e)))
+        if indexed:
+            # float32 boxes are rounded outwards: prefilter then compare exactly
+            query = (query.join_from(rtree, Languoid,
+                                     Languoid.id == rtree.c.languoid_id)
+                     .where(rtree.c.max_lat >= south, rtree.c.min_lat <= north,
+                            rtree.c.max_lon >= w, rtree.c.min_lon <= e))
+        selects.append(query)
+
+    if len(selects) == 1:
+        return selects[0].order_by(Languoid.id)
+    return sa.union_all(*selects).order_by(sa.literal_column('1'))
+
+
+def languoids_in_bbox(south: float, west: float, north: float, east: float, /, *,
+                      bind=_globals.ENGINE) -> list[tuple[str, float, float]]:
+    """Return (<id>, <latitude>, <longitude>) triples of languoids in the box.
+
+    West is greater than east for boxes crossing the antimeridian.
+    Use the R*Tree index if present (``load(index_coordinates=True)``).
+    """
+    with _backend.connect(bind=bind) as conn:
+        query = _select_bbox(south, west, north, east,
+                             indexed=has_coordinate_index(bind=conn))
+        return [tuple(row) for row in conn.execute(query)]
+
+
+def languoids_within(latitude: float, longitude: float, radius: float, /, *,
+                     bind=_globals.ENGINE) -> list[tuple[str, float]]:
+    """Return (<id>, <distance>) pairs of languoids within radius km, nearest first."""
+    bbox = radius_bbox(latitude, longitude, radius)
+    result = []
+    for id_, lat, lon in languoids_in_bbox(*bbox, bind=bind):
+        distance = haversine(latitude, longitude, lat, lon)
+        if distance <= radius:
+            result.append((id_, distance))
+    result.sort(key=lambda x: (x[1], x[0]))
+    return result
+
+
+def nearest_languoids(latitude: float, longitude: float, /, k: int = 10, *,
+                      bind=_globals.ENGINE) -> list[tuple[str, float]]:
+    """Return (<id>, <distance>) pairs of the k languoids nearest to the point.
+
+    Query growing radii until k languoids are within the radius.
+    """
+    radius = NEAREST_START_RADIUS
+    while True:
+        result = languoids_within(latitude, longitude, radius, bind=bind)
+        if len(result) >= k or radius >= math.pi * EARTH_RADIUS:
+            return result[:k]
+        radius *= 4
+
+
+def point_in_polygon(longitude: float, latitude: float,
+                     polygon: Sequence[tuple[float, float]], /) -> bool:
+    """Return whether the point lies inside the (<longitude>, <latitude>) ring.
+
+    >>> square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    >>> point_in_polygon(5, 5, square), point_in_polygon(15, 5, square)
+    (True, False)
+    """
+    inside = False
+    j = len(polygon) - 1
+    for i, (xi, yi) in enumerate(polygon):
+        xj, yj = polygon[j]
+        crosses = (yi > latitude) != (yj > latitude)
+        if crosses and longitude < (xj - xi) * (latitude - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def languoids_in_polygon(polygon: Sequence[tuple[float, float]], /, *,
+                         bind=_globals.ENGINE) -> list[tuple[str, float, float]]:
+    """Return (<id>, <latitude>, <longitude>) triples of languoids inside polygon.
+
+    The polygon is a ring of GeoJSON (<longitude>, <latitude>) positions
+    (not crossing the antimeridian), prefiltered by its bounding box.
+    """
+    lons, lats = zip(*polygon)
+    candidates = languoids_in_bbox(min(lats), min(lons), max(lats), max(lons),
+                                   bind=bind)
+    return [(id_, lat, lon) for id_, lat, lon in candidates
+            if point_in_polygon(lon, lat, polygon)]
+
+
+def get_geojson_query(languoid_ids: Iterable[str] | None = None,
+                      /) -> sa.sql.Select:
+    """Return query of GeoJSON Point features of languoids with coordinates."""
+    json_object = _backend.json_object
+    geometry = json_object(type='Point',
+                           coordinates=sa.func.json_array(Languoid.longitude,
+                                                          Languoid.latitude),
+                           sort_keys_=False)
+    properties = json_object(name=Languoid.name,
+                             level=Languoid.level,
+                             sort_keys_=False)
+    feature = json_object(type='Feature',
+                          id=Languoid.id,
+                          geometry=geometry,
+                          properties=properties,
+                          sort_keys_=False)
+
+    query = (select(feature)
+             .where(Languoid.latitude != sa.null())
+             .order_by(Languoid.id))
+    if languoid_ids is not None:
+        query = query.where(Languoid.id.in_(list(languoid_ids)))
+    return query
+
+
+def iterfeaturecollection(features: Iterable[str], /) -> Iterator[str]:
+    """Yield the lines of a GeoJSON FeatureCollection of feature JSON strings.
+
+    >>> list(iterfeaturecollection(['{"a":1}', '{"b":2}']))
+    ['{"type":"FeatureCollection","features":[', '{"a":1}', ',{"b":2}', ']}']
+    """
+    yield '{"type":"FeatureCollection","features":['
+    for i, feature in enumerate(features):
+        yield f',{feature}' if i else feature
+    yield ']}'
+
+
+def write_geojson(file=None, /, *, languoid_ids: Iterable[str] | None = None,
+                  delete_present: bool = True,
+                  autocompress: bool = True,
+                  bind=_globals.ENGINE):
+    """Write languoids (or languoid_ids) with coordinates as GeoJSON FeatureCollection.
+
+    Stream one feature per line as rendered by SQLite ``json_object()``.
+    """
+    if file is None:
+        file = bind.file_with_suffix('.languoids.geojson').name
+
+    log.info('write GeoJSON to %r', file)
+    query = get_geojson_query(languoid_ids)
+    with _backend.connect(bind=bind) as conn:
+        features = conn.execute(query).scalars()
+        return _tools.pipe_lines(file, iterfeaturecollection(features),
+                                 delete_present=delete_present,
+                                 autocompress=autocompress,
+                                 newline='\n')